@@ -0,0 +1,200 @@
+"""
+Micro-batching scheduler untuk inference model.
+
+Request yang datang bersamaan dikumpulkan ke dalam satu antrian, lalu
+dijalankan dalam satu forward pass (maksimal `max_batch_size` gambar atau
+setelah menunggu `max_wait_ms`). Setiap pemanggil mendapat baris hasilnya
+sendiri.
+"""
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class _PendingRequest:
+    """Satu item di antrian: input array dan slot untuk hasilnya"""
+
+    __slots__ = ('array', 'event', 'result', 'error', 'enqueued_at')
+
+    def __init__(self, array):
+        self.array = array
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Gabungkan prediksi yang datang bersamaan menjadi satu batch
+
+    Args:
+        predict_fn: Fungsi yang menerima array (N, H, W, C) dan
+            mengembalikan array hasil (N, num_classes)
+        max_batch_size: Jumlah maksimal gambar per forward pass
+        max_wait_ms: Waktu tunggu maksimal (ms) untuk mengisi batch
+            setelah request pertama masuk
+        assemble_fn: Fungsi yang menyusun list input menjadi satu batch
+            (default: np.stack). Dipanggil di thread worker batcher.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=10, assemble_fn=None):
+        self.predict_fn = predict_fn
+        self.assemble_fn = assemble_fn or np.stack
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._items = 0
+        self._max_batch_seen = 0
+        self._batch_size_hist = {}
+        self._total_wait = 0.0
+        self._total_infer = 0.0
+        self._errors = 0
+
+    def _ensure_worker(self):
+        # Thread tidak ikut ter-copy saat fork (misalnya gunicorn worker),
+        # jadi worker thread dibuat per proses saat pertama kali dipakai.
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+                return
+            if self._worker_pid != pid:
+                self._queue = queue.Queue()
+                with self._stats_lock:
+                    self._reset_stats()
+            self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+
+    def submit(self, array, timeout=None):
+        """
+        Masukkan satu gambar ke antrian dan tunggu hasilnya
+
+        Args:
+            array: Array satu gambar (H, W, C) atau (1, H, W, C)
+            timeout: Batas waktu tunggu dalam detik (None = tanpa batas)
+
+        Returns:
+            Array hasil prediksi untuk gambar tersebut (num_classes,)
+        """
+        array = np.asarray(array)
+        if array.ndim == 4:
+            if array.shape[0] != 1:
+                raise ValueError("submit() hanya menerima satu gambar per panggilan")
+            array = array[0]
+
+        self._ensure_worker()
+        pending = _PendingRequest(array)
+        self._queue.put(pending)
+
+        if not pending.event.wait(timeout):
+            raise TimeoutError("Prediksi melebihi batas waktu")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def submit_many(self, arrays, timeout=None):
+        """
+        Masukkan beberapa gambar sekaligus dan tunggu semua hasilnya
+
+        Gambar masuk antrian berurutan, jadi worker menjalankannya dalam
+        batch sebesar max_batch_size (bisa digabung dengan request lain).
+
+        Returns:
+            List array hasil, urutan sama dengan `arrays`
+
+        Raises:
+            Error pertama dari batch yang gagal
+        """
+        self._ensure_worker()
+        pendings = [_PendingRequest(np.asarray(array)) for array in arrays]
+        for pending in pendings:
+            self._queue.put(pending)
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for pending in pendings:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not pending.event.wait(remaining):
+                raise TimeoutError("Prediksi melebihi batas waktu")
+        for pending in pendings:
+            if pending.error is not None:
+                raise pending.error
+        return [pending.result for pending in pendings]
+
+    def _collect_batch(self):
+        """Ambil request pertama (blocking), lalu isi batch sampai penuh atau timeout"""
+        first = self._queue.get()
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+            try:
+                inputs = self.assemble_fn([item.array for item in batch])
+                outputs = np.asarray(self.predict_fn(inputs))
+                for i, item in enumerate(batch):
+                    item.result = outputs[i]
+            except Exception as e:
+                for item in batch:
+                    item.error = e
+                with self._stats_lock:
+                    self._errors += 1
+            finally:
+                finished = time.perf_counter()
+                with self._stats_lock:
+                    size = len(batch)
+                    self._batches += 1
+                    self._items += size
+                    self._max_batch_seen = max(self._max_batch_seen, size)
+                    self._batch_size_hist[size] = self._batch_size_hist.get(size, 0) + 1
+                    self._total_wait += sum(started - item.enqueued_at for item in batch)
+                    self._total_infer += finished - started
+                for item in batch:
+                    item.event.set()
+
+    def stats(self):
+        """Statistik antrian dan ukuran batch untuk tuning"""
+        with self._stats_lock:
+            batches = self._batches
+            items = self._items
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': self._queue.qsize(),
+                'batches': batches,
+                'items': items,
+                'errors': self._errors,
+                'avg_batch_size': (items / batches) if batches else 0.0,
+                'max_batch_seen': self._max_batch_seen,
+                'batch_size_histogram': {str(k): v for k, v in sorted(self._batch_size_hist.items())},
+                'avg_queue_wait_ms': (self._total_wait / items * 1000.0) if items else 0.0,
+                'avg_inference_ms': (self._total_infer / batches * 1000.0) if batches else 0.0,
+            }
@@ -0,0 +1,187 @@
+"""
+Operasi bulk admin: hapus prediksi, hapus user, ubah role.
+
+Semua operasi berupa DELETE/UPDATE set-based (`WHERE id IN (...)`) per
+chunk, masing-masing di transaksinya sendiri, jadi menghapus jutaan baris
+tidak menahan lock lama dan tidak memuat objek ORM satu per satu. Setiap
+operasi adalah generator yang meng-yield progress setelah setiap chunk
+(dikirim ke browser sebagai NDJSON oleh route admin).
+
+Rollup harian ikut dikurangi di transaksi chunk yang sama (apply_deltas),
+index pencarian users disinkronkan oleh trigger / FULLTEXT database.
+
+Kalau operasi berhenti di tengah (error), chunk yang sudah di-commit tetap
+terhapus; progress terakhir menunjukkan berapa yang sudah diproses.
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+
+from models import db, DailyUserStat, PredictionHistory, User
+from rollups import apply_deltas, count_deltas
+
+DEFAULT_CHUNK_SIZE = 1000
+ROLES = ('user', 'admin')
+
+
+def parse_ids(values):
+    """
+    List ID dari body request (angka atau string angka), tanpa duplikat
+
+    Raises:
+        ValueError: Kalau ada ID yang bukan bilangan bulat positif
+    """
+    ids = []
+    for value in values or []:
+        if isinstance(value, bool):
+            raise ValueError(f"ID tidak valid: {value!r}")
+        row_id = int(value)
+        if row_id <= 0:
+            raise ValueError(f"ID tidak valid: {value!r}")
+        ids.append(row_id)
+    return sorted(set(ids))
+
+
+def prediction_conditions(ids=None, predicted_class=None, older_than=None, user_id=None):
+    """
+    Kondisi WHERE prediction_history untuk operasi bulk
+
+    Args:
+        ids: List ID prediksi
+        predicted_class: Hanya prediksi kelas ini
+        older_than: String tanggal YYYY-MM-DD; hanya prediksi sebelum tanggal ini
+        user_id: Hanya prediksi milik user ini
+
+    Raises:
+        ValueError: Kalau tanggal tidak valid atau tidak ada kriteria sama sekali
+    """
+    conditions = []
+    if ids:
+        conditions.append(PredictionHistory.id.in_(ids))
+    if predicted_class:
+        conditions.append(PredictionHistory.predicted_class == predicted_class)
+    if older_than:
+        try:
+            cutoff = datetime.strptime(older_than, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError(f"Tanggal tidak valid (format YYYY-MM-DD): {older_than}")
+        conditions.append(PredictionHistory.created_at < cutoff)
+    if user_id:
+        conditions.append(PredictionHistory.user_id == user_id)
+    if not conditions:
+        # Jangan sampai body kosong menghapus semua prediksi
+        raise ValueError('Pilih prediksi (ids) atau isi minimal satu filter')
+    return conditions
+
+
+def count_predictions(conditions):
+    with db.engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(PredictionHistory.__table__).where(*conditions)).scalar()
+
+
+def _delete_prediction_chunk(conn, conditions, after_id, chunk_size):
+    """Hapus satu chunk (urut id) di transaksi `conn`, kurangi rollup; return (jumlah, id terakhir)"""
+    table = PredictionHistory.__table__
+    rows = conn.execute(
+        select(table.c.id, table.c.created_at, table.c.predicted_class, table.c.user_id)
+        .where(table.c.id > after_id, *conditions)
+        .order_by(table.c.id)
+        .limit(chunk_size)
+    ).all()
+    if not rows:
+        return 0, after_id
+    conn.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+    apply_deltas(conn, *count_deltas(
+        ((row.created_at, row.predicted_class, row.user_id) for row in rows if row.created_at), sign=-1
+    ))
+    return len(rows), rows[-1].id
+
+
+def delete_predictions(conditions, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Hapus prediksi yang cocok dengan `conditions`, per chunk
+
+    Yields:
+        Dict progress {'done', 'total'} setelah setiap chunk
+    """
+    total = count_predictions(conditions)
+    done = 0
+    last_id = 0
+    yield {'done': done, 'total': total}
+    while True:
+        with db.engine.begin() as conn:
+            deleted, last_id = _delete_prediction_chunk(conn, conditions, last_id, chunk_size)
+        if not deleted:
+            break
+        done += deleted
+        yield {'done': done, 'total': max(total, done)}
+
+
+def _chunks(ids, chunk_size):
+    for start in range(0, len(ids), chunk_size):
+        yield ids[start:start + chunk_size]
+
+
+def delete_users(user_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Hapus user beserta semua prediksinya
+
+    Prediksi dihapus dulu (per chunk, rollup ikut dikurangi), lalu baris
+    users dan rollup per user-nya, per chunk user.
+
+    Yields:
+        Dict progress {'done', 'total', 'predictions_deleted'} (done/total = user)
+    """
+    total = len(user_ids)
+    done = 0
+    predictions_deleted = 0
+    yield {'done': done, 'total': total, 'predictions_deleted': predictions_deleted}
+    for chunk in _chunks(user_ids, chunk_size):
+        owned = [PredictionHistory.user_id.in_(chunk)]
+        last_id = 0
+        while True:
+            with db.engine.begin() as conn:
+                deleted, last_id = _delete_prediction_chunk(conn, owned, last_id, chunk_size)
+            if not deleted:
+                break
+            predictions_deleted += deleted
+            yield {'done': done, 'total': total, 'predictions_deleted': predictions_deleted}
+
+        with db.engine.begin() as conn:
+            conn.execute(delete(DailyUserStat.__table__).where(DailyUserStat.__table__.c.user_id.in_(chunk)))
+            result = conn.execute(delete(User.__table__).where(User.__table__.c.id.in_(chunk)))
+        done += result.rowcount
+        yield {'done': done, 'total': total, 'predictions_deleted': predictions_deleted}
+
+
+def set_role(user_ids, role, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Ubah role banyak user sekaligus
+
+    Yields:
+        Dict progress {'done', 'total'}
+    """
+    if role not in ROLES:
+        raise ValueError(f"Role tidak valid: {role}")
+    table = User.__table__
+    total = len(user_ids)
+    done = 0
+    yield {'done': done, 'total': total}
+    for chunk in _chunks(user_ids, chunk_size):
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.id.in_(chunk))
+                .values(role=role, updated_at=datetime.utcnow())
+            )
+        done += len(chunk)
+        yield {'done': done, 'total': total}
+
+
+def matching_user_ids(conditions, exclude_id=None):
+    """ID user yang cocok dengan `conditions` (kecuali `exclude_id`, mis. admin yang sedang login)"""
+    query = select(User.__table__.c.id).where(*conditions).order_by(User.__table__.c.id)
+    if exclude_id is not None:
+        query = query.where(User.__table__.c.id != exclude_id)
+    with db.engine.connect() as conn:
+        return list(conn.execute(query).scalars())
@@ -0,0 +1,305 @@
+"""
+Perintah CLI operasional, dijalankan dari root project:
+
+    flask create-user USERNAME EMAIL [--admin] [--full-name NAMA]
+    flask create-admin                      # interaktif, untuk admin pertama
+    flask set-role USERNAME admin|user
+    flask migrate [--status]
+    flask rebuild rollups|search-index|model-cache
+    flask migrate-images [--batch-size 200]
+    flask migrate-probabilities [--batch-size 500]
+    flask stats
+
+Tidak ada perintah yang meng-import TensorFlow: create_app() tidak memuat
+model (lihat predictor.py), dan konversi artifact model (`rebuild
+model-cache`) berjalan di proses terpisah.
+"""
+import os
+import shutil
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import func
+
+import bulk_ops
+from models import db, User
+
+
+# ============================================
+# User
+# ============================================
+
+def _validate_user(username, email, password):
+    """Validasi yang sama dengan form register; return list pesan error"""
+    errors = []
+    if not username or len(username) < 3:
+        errors.append('Username harus minimal 3 karakter.')
+    if not email or '@' not in email:
+        errors.append('Email tidak valid.')
+    if not password or len(password) < 6:
+        errors.append('Password harus minimal 6 karakter.')
+    if User.query.filter_by(username=username).first():
+        errors.append(f"Username '{username}' sudah digunakan.")
+    if User.query.filter_by(email=email).first():
+        errors.append(f"Email '{email}' sudah terdaftar.")
+    return errors
+
+
+def add_user(username, email, password, full_name=None, role='user'):
+    """
+    Buat user baru
+
+    Raises:
+        ValueError: Kalau data tidak valid atau username/email sudah dipakai
+    """
+    errors = _validate_user(username, email, password)
+    if role not in bulk_ops.ROLES:
+        errors.append(f"Role tidak valid: {role}")
+    if errors:
+        raise ValueError(' '.join(errors))
+
+    user = User(username=username, email=email, full_name=full_name or None, role=role)
+    user.set_password(password)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@click.command('create-user')
+@click.argument('username')
+@click.argument('email')
+@click.option('--full-name', help='Nama lengkap')
+@click.option('--admin', is_flag=True, help='Buat sebagai admin')
+@click.password_option(help='Password (ditanyakan kalau tidak diisi)')
+@with_appcontext
+def create_user_command(username, email, full_name, admin, password):
+    """Buat user (atau admin dengan --admin)."""
+    try:
+        user = add_user(username.strip(), email.strip(), password, full_name, 'admin' if admin else 'user')
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"✅ User '{user.username}' dibuat (role: {user.role})")
+
+
+def create_admin():
+    """Buat admin pertama secara interaktif (dipakai `flask create-admin` dan create_admin.py)"""
+    if User.query.filter_by(role='admin').first():
+        print("⚠️  Admin sudah ada. Gunakan user yang sudah ada atau ubah role user yang ada.")
+        return None
+
+    print("=" * 50)
+    print("Membuat Admin User")
+    print("=" * 50)
+
+    username = click.prompt('Username').strip()
+    email = click.prompt('Email').strip()
+    password = click.prompt('Password', hide_input=True, confirmation_prompt=True)
+    full_name = click.prompt('Full Name (optional)', default='', show_default=False).strip()
+
+    try:
+        admin = add_user(username, email, password, full_name, role='admin')
+    except ValueError as e:
+        print(f"❌ {e}")
+        return None
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Error: {e}")
+        return None
+
+    print("\n✅ Admin user berhasil dibuat!")
+    print(f"   Username: {admin.username}")
+    print(f"   Email: {admin.email}")
+    print("   Role: admin")
+    print("\n🌐 Login di: http://127.0.0.1:5000/login")
+    print("📊 Admin panel: http://127.0.0.1:5000/admin")
+    return admin
+
+
+@click.command('create-admin')
+@with_appcontext
+def create_admin_command():
+    """Buat admin pertama (interaktif)."""
+    create_admin()
+
+
+@click.command('set-role')
+@click.argument('username')
+@click.argument('role', type=click.Choice(bulk_ops.ROLES))
+@with_appcontext
+def set_role_command(username, role):
+    """Ubah role user (admin / user)."""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f"User '{username}' tidak ditemukan")
+    user.role = role
+    db.session.commit()
+    click.echo(f"✅ User '{username}' sekarang {role}. Logout dan login lagi supaya berlaku.")
+
+
+# ============================================
+# Database
+# ============================================
+
+@click.command('migrate')
+@click.option('--status', is_flag=True, help='Tampilkan versi schema tanpa menjalankan migrasi')
+@with_appcontext
+def migrate_command(status):
+    """Jalankan migrasi schema database yang belum dijalankan."""
+    from migrations import MIGRATIONS, applied_versions, upgrade
+
+    if status:
+        done = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            click.echo(f"{'✅' if version in done else '⏳'} {version:03d} {name}")
+        return
+    ran = upgrade()
+    click.echo(f"✅ {len(ran)} migrasi dijalankan" if ran else "✅ Schema sudah versi terbaru")
+
+
+@click.command('migrate-images')
+@click.option('--batch-size', default=200, show_default=True)
+@with_appcontext
+def migrate_images_command(batch_size):
+    """Pindahkan image_base64 lama ke ImageStore."""
+    from extensions import image_store
+    from migrate_images import migrate_images
+    from migrations import upgrade
+
+    upgrade()  # kolom image_hash (migration 003)
+    click.echo(f"Memindahkan gambar ke {image_store.root}")
+    moved, failed = migrate_images(batch_size=batch_size)
+    click.echo(f"✅ Selesai: {moved} gambar dipindahkan, {failed} gagal")
+
+
+@click.command('migrate-probabilities')
+@click.option('--batch-size', default=500, show_default=True)
+@with_appcontext
+def migrate_probabilities_command(batch_size):
+    """Konversi JSON all_probabilities lama ke vektor float32."""
+    from migrations import convert_probabilities
+
+    converted, skipped = convert_probabilities(batch_size=batch_size)
+    click.echo(f"✅ {converted} baris dikonversi, {skipped} dilewati (JSON tidak cocok dengan class_indices.json)")
+
+
+# ============================================
+# Rebuild
+# ============================================
+
+rebuild = AppGroup('rebuild', help='Bangun ulang data turunan (rollup, index, cache model).')
+
+
+@rebuild.command('rollups')
+def rebuild_rollups_command():
+    """Hitung ulang rollup statistik harian dari prediction_history."""
+    import rollups
+
+    class_count, user_count = rollups.rebuild()
+    click.echo(f"✅ Rollup dibangun ulang: {class_count} baris per kelas, {user_count} baris per user")
+
+
+@rebuild.command('search-index')
+def rebuild_search_index_command():
+    """Buat / isi ulang index pencarian users."""
+    import search_index
+
+    if search_index.install():
+        click.echo('✅ Index pencarian users dibangun ulang')
+
+
+@rebuild.command('model-cache')
+def rebuild_model_cache_command():
+    """Konversi ulang artifact model untuk INFERENCE_BACKEND."""
+    from inference import artifact_path, ensure_artifact
+
+    config = current_app.config
+    backend, model_path = config['INFERENCE_BACKEND'], config['MODEL_PATH']
+    if not os.path.exists(model_path):
+        raise click.ClickException(f"Model file tidak ditemukan: {model_path}")
+    dest = artifact_path(backend, model_path, config['MODEL_ARTIFACT_DIR'])
+    if dest is None:
+        click.echo(f"Backend {backend} memakai file .h5 langsung, tidak ada artifact")
+        return
+    if os.path.isdir(dest):
+        shutil.rmtree(dest)
+    elif os.path.exists(dest):
+        os.remove(dest)
+
+    # Konversi (op TensorFlow) berjalan di proses spawn terpisah
+    click.echo(f"🔄 Mengonversi {model_path} ke {backend}...")
+    path, _, seconds = ensure_artifact(backend, model_path, config['MODEL_ARTIFACT_DIR'], in_subprocess=True)
+    click.echo(f"✅ Artifact {path} dibuat dalam {seconds:.1f}s")
+
+
+# ============================================
+# Stats
+# ============================================
+
+def _model_stats(config):
+    """Info model tanpa memuatnya (file, artifact, kelas, model server)"""
+    from inference import ARTIFACT_SUFFIX, artifact_path
+    import probabilities as prob_codec
+
+    backend, model_path = config['INFERENCE_BACKEND'], config['MODEL_PATH']
+    lines = [f"Backend      : {backend}"]
+    if os.path.exists(model_path):
+        lines.append(f"Model file   : {model_path} ({os.path.getsize(model_path) / 1024 / 1024:.1f} MB)")
+        if backend in ARTIFACT_SUFFIX:
+            artifact = artifact_path(backend, model_path, config['MODEL_ARTIFACT_DIR'])
+            state = 'cached' if os.path.exists(artifact) else 'belum dibuat, jalankan flask rebuild model-cache'
+            lines.append(f"Artifact     : {artifact} ({state})")
+    else:
+        lines.append(f"Model file   : {model_path} (tidak ditemukan)")
+    lines.append(f"Kelas        : {len(prob_codec.class_names())}")
+
+    address = config['MODEL_SERVER_SOCKET']
+    if address:
+        from model_server import ModelClient
+
+        status = ModelClient(address, timeout=5, token=config['MODEL_SERVER_TOKEN']).status()
+        if status.get('error'):
+            lines.append(f"Model server : {address} ❌ {status['error']}")
+        else:
+            lines.append(f"Model server : {address} ✅ {status.get('load_path')} "
+                         f"(loaded: {status['loaded']}, warmed: {status['warmed']})")
+    else:
+        lines.append("Model server : - (inference in-process)")
+    return lines
+
+
+@click.command('stats')
+@with_appcontext
+def stats_command():
+    """Tampilkan statistik database dan model."""
+    from migrations import MIGRATIONS, current_version
+    import rollups
+
+    config = current_app.config
+    total_users = User.query.count()
+    total_admins = User.query.filter_by(role='admin').count()
+    totals = rollups.prediction_totals()
+
+    click.echo("=" * 50)
+    click.echo(f"Database ({db.engine.dialect.name})")
+    click.echo("=" * 50)
+    click.echo(f"Schema       : versi {current_version()} dari {len(MIGRATIONS)}")
+    click.echo(f"Users        : {total_users} ({total_admins} admin)")
+    newest = db.session.query(func.max(User.created_at)).scalar()
+    if newest:
+        click.echo(f"User terbaru : {newest:%Y-%m-%d %H:%M}")
+    click.echo(f"Prediksi     : {totals['total']} total, {totals['this_week']} 7 hari, {totals['today']} hari ini")
+    for predicted_class, count in rollups.top_classes(limit=5):
+        click.echo(f"   {predicted_class:<28} {count}")
+
+    click.echo("=" * 50)
+    click.echo("Model")
+    click.echo("=" * 50)
+    for line in _model_stats(config):
+        click.echo(line)
+
+
+def register_commands(app):
+    for command in (create_user_command, create_admin_command, set_role_command, migrate_command,
+                    migrate_images_command, migrate_probabilities_command, rebuild, stats_command):
+        app.cli.add_command(command)
@@ -15,4 +15,74 @@ class Config:
         # Jika dijalankan di laptop (lokal), otomatis pakai SQLite
         SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
         
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Micro-batching untuk /api/predict
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 16))
+    BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 10))
+
+    # Cache hasil prediksi (0 = nonaktif)
+    PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))
+    PREDICTION_CACHE_MAX_BYTES = int(os.environ.get('PREDICTION_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+    PREDICTION_CACHE_TTL = int(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+
+    # Folder penyimpanan gambar prediksi (content-addressed, lihat image_store.py)
+    IMAGE_STORE_DIR = os.environ.get('IMAGE_STORE_DIR') or os.path.join('uploads', 'images')
+
+    # Backend inference: keras | savedmodel | tflite-fp32 | tflite-fp16 | tflite-int8 (lihat inference.py).
+    # Bobot hanya di-share antar worker gunicorn dengan tflite-* + TFLITE_XNNPACK=0 (lihat gunicorn.conf.py).
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'savedmodel')
+    # Delegate XNNPACK untuk backend TFLite: lebih cepat, tapi bobot disalin ke setiap worker
+    TFLITE_XNNPACK = os.environ.get('TFLITE_XNNPACK', '1') == '1'
+    # Folder cache artifact hasil konversi model (default: di samping file .h5)
+    MODEL_ARTIFACT_DIR = os.environ.get('MODEL_ARTIFACT_DIR') or None
+
+    # Ukuran batch untuk warm-up model sebelum worker menerima traffic.
+    # Default: semua ukuran 1..BATCH_MAX_SIZE. Contoh override: "1,2,4,8,16"
+    WARMUP_BATCH_SIZES = [int(b) for b in os.environ.get('WARMUP_BATCH_SIZES', '').split(',') if b.strip()] \
+        or list(range(1, BATCH_MAX_SIZE + 1))
+
+    # Thread pool TensorFlow per worker (0 = otomatis: jumlah core / jumlah worker gunicorn)
+    TF_INTRA_OP_THREADS = int(os.environ.get('TF_INTRA_OP_THREADS', 0))
+    TF_INTER_OP_THREADS = int(os.environ.get('TF_INTER_OP_THREADS', 0))
+    # XLA JIT untuk compiled inference function (CPU)
+    TF_XLA_JIT = os.environ.get('TF_XLA_JIT', '0') == '1'
+
+    # File model Keras (.h5), sumber untuk semua backend inference
+    MODEL_PATH = os.environ.get('MODEL_PATH', 'skin_disease_mobilenetv2_stage1.h5')
+    # Alamat model server (model_server.py): path Unix socket atau host:port. Kalau di-set, worker
+    # web tidak meng-import TensorFlow dan mengirim prediksi ke model server; kosong = inference in-process.
+    MODEL_SERVER_SOCKET = os.environ.get('MODEL_SERVER_SOCKET') or None
+    MODEL_SERVER_TIMEOUT = float(os.environ.get('MODEL_SERVER_TIMEOUT', 30))  # detik per request
+    # Shared secret model server; wajib kalau model server bind TCP selain 127.0.0.1
+    MODEL_SERVER_TOKEN = os.environ.get('MODEL_SERVER_TOKEN') or None
+
+    # Write-behind history prediksi: response /api/predict tidak menunggu commit DB.
+    # Baris dikumpulkan di antrian lalu di-insert sekaligus (tiap N baris atau T ms).
+    HISTORY_WRITE_BEHIND = os.environ.get('HISTORY_WRITE_BEHIND', '0') == '1'
+    HISTORY_FLUSH_ROWS = int(os.environ.get('HISTORY_FLUSH_ROWS', 50))
+    HISTORY_FLUSH_MS = float(os.environ.get('HISTORY_FLUSH_MS', 200))
+    # Kalau antrian penuh, baris ditulis langsung (synchronous) oleh request
+    HISTORY_QUEUE_SIZE = int(os.environ.get('HISTORY_QUEUE_SIZE', 1000))
+
+    # Job prediksi asynchronous (/api/predict/jobs, lihat jobs.py).
+    # Antrian SQLite lokal + file upload disimpan di JOB_DIR.
+    JOB_DIR = os.environ.get('JOB_DIR') or os.path.join('uploads', 'jobs')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))  # thread inference per worker gunicorn
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 100))
+    JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 600))
+    # Job running tanpa heartbeat selama ini (worker mati) dianggap macet dan diambil ulang
+    JOB_STALE_AFTER = int(os.environ.get('JOB_STALE_AFTER', 120))
+    # Server-Sent Events untuk status job (opt-in). Setiap stream menahan satu worker
+    # gunicorn selama menunggu, jadi nyalakan hanya dengan worker gthread (lihat gunicorn.conf.py)
+    JOB_EVENTS = os.environ.get('JOB_EVENTS', '0') == '1'
+    # Lama maksimal satu koneksi SSE; browser otomatis menyambung ulang
+    JOB_EVENTS_TIMEOUT = int(os.environ.get('JOB_EVENTS_TIMEOUT', 25))
+
+    # Prediksi batch (/api/predict/batch): banyak file atau arsip zip per request
+    BATCH_PREDICT_MAX_IMAGES = int(os.environ.get('BATCH_PREDICT_MAX_IMAGES', 200))
+    BATCH_PREDICT_MAX_IMAGE_BYTES = int(os.environ.get('BATCH_PREDICT_MAX_IMAGE_BYTES', 16 * 1024 * 1024))
+    BATCH_DECODE_WORKERS = int(os.environ.get('BATCH_DECODE_WORKERS', 4))  # thread decode gambar
+
+    # Operasi bulk admin: jumlah baris per DELETE/UPDATE (satu transaksi per chunk)
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 1000))
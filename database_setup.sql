@@ -17,7 +17,9 @@ CREATE TABLE IF NOT EXISTS users (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_username (username),
     INDEX idx_email (email),
-    INDEX idx_role (role)
+    INDEX ix_users_role (role),
+    INDEX ix_users_created_at (created_at),
+    FULLTEXT INDEX ft_users_search (username, email, full_name) WITH PARSER ngram
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Buat tabel prediction_history
@@ -27,12 +29,16 @@ CREATE TABLE IF NOT EXISTS prediction_history (
     predicted_class VARCHAR(100) NOT NULL,
     confidence FLOAT NOT NULL,
     image_path VARCHAR(255) NULL,
+    image_hash VARCHAR(64) NULL,
     image_base64 TEXT NULL,
+    probabilities BLOB NULL,
     all_probabilities TEXT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_user_id (user_id),
-    INDEX idx_created_at (created_at)
+    INDEX ix_prediction_history_user_created (user_id, created_at DESC, id DESC),
+    INDEX ix_prediction_history_created_at (created_at),
+    INDEX ix_prediction_history_class_user (predicted_class, user_id),
+    INDEX ix_prediction_history_image_hash (image_hash)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Tampilkan struktur tabel
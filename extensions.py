@@ -0,0 +1,26 @@
+"""
+Extension dan service bersama aplikasi.
+
+Objek di sini dibuat tanpa app, jadi aman di-import dari mana saja (tidak
+membuat folder, tidak membuka database, tidak meng-import TensorFlow), lalu
+dikonfigurasi oleh create_app() lewat init_app(), sama seperti `db` di models.py.
+"""
+from flask_login import LoginManager
+
+from history_writer import HistoryWriter
+from image_store import ImageStore
+from predictor import Predictor
+
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
+login_manager.login_message = 'Silakan login untuk mengakses halaman ini.'
+login_manager.login_message_category = 'info'
+
+# Gambar preview prediksi disimpan di disk, DB cukup menyimpan hash-nya
+image_store = ImageStore()
+
+# Penyimpanan history prediksi (write-behind kalau HISTORY_WRITE_BEHIND=1)
+history_writer = HistoryWriter()
+
+# Model + batcher + cache hasil prediksi; model di-load saat pertama dipakai
+predictor = Predictor()
@@ -0,0 +1,102 @@
+"""
+Konfigurasi gunicorn (otomatis dibaca oleh `gunicorn app:app` dari root project).
+
+Mode preload (default, PRELOAD_MODEL=1): app.py di-import sekali di master,
+lalu model disiapkan di master (when_ready): artifact model hasil konversi
+dibuat sekali sebelum worker di-fork. Runtime/thread pool TensorFlow dan
+backend baru dibuat di setiap worker setelah fork (post_worker_init), karena
+runtime TF tidak fork-safe.
+
+Backend default (savedmodel) tidak berbagi bobot: setiap worker memuat
+salinannya sendiri, jadi master tidak meng-import TensorFlow. Opt-in untuk
+berbagi bobot antar worker:
+
+    INFERENCE_BACKEND=tflite-fp32 TFLITE_XNNPACK=0
+
+Modul TensorFlow lalu di-import di master dan di-share copy-on-write, dan
+bobot model dibaca dari flatbuffer yang di-mmap (page cache yang sama).
+Tanpa XNNPACK inference lebih lambat dan model yang dipakai adalah hasil
+konversi, jadi jalankan dulu
+`python -m tools.parity_check --backends savedmodel,tflite-fp32 --no-xnnpack`
+dan bandingkan agreement/latency-nya, lalu kolom PSS di log `[memory]`
+setiap worker.
+
+Setiap worker mencetak laporan memori sebelum dan sesudah model di-load,
+dan menjalankan warm-up model sebelum mulai menerima request, lalu ikut
+mengerjakan job prediksi asynchronous. Saat worker berhenti, job yang sedang
+jalan diselesaikan dan antrian write-behind history prediksi di-flush dulu.
+
+Halaman prediksi menunggu hasil job dengan polling status_url, jadi worker
+sync default cukup. Server-Sent Events (JOB_EVENTS=1) menahan worker selama
+stream terbuka; aktifkan hanya bersama worker thread, misalnya
+`GUNICORN_CMD_ARGS="--worker-class gthread --threads 8"`.
+
+Dengan MODEL_SERVER_SOCKET, model dipegang model_server.py (proses terpisah);
+master dan worker tidak meng-import TensorFlow dan tidak ada warm-up per worker.
+"""
+import os
+
+from process_stats import format_memory, memory_usage
+
+# bind/workers memakai default gunicorn ($PORT, $WEB_CONCURRENCY)
+preload_app = os.environ.get('PRELOAD_MODEL', '1') == '1'
+# Load model di worker bisa lebih lama dari timeout default (30 detik)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def when_ready(server):
+    if preload_app:
+        # Model di-load lazy oleh app; siapkan sekali di master sebelum worker di-fork
+        from extensions import predictor
+        runtime = predictor.prepare()
+        if not predictor.remote and not runtime.shares_weights:
+            server.log.info("[memory] backend %s%s tidak berbagi bobot; setiap worker memuat model sendiri",
+                            runtime.backend_name, ' + XNNPACK' if runtime.xnnpack else '')
+    server.log.info("[memory] master pid %s: %s (preload_app=%s)",
+                    os.getpid(), format_memory(memory_usage()), preload_app)
+
+
+def post_fork(server, worker):
+    # Dipakai inference.default_thread_counts() untuk membagi core CPU
+    os.environ['GUNICORN_WORKERS'] = str(server.cfg.workers)
+
+    if not preload_app:
+        return
+    # Koneksi DB yang dibuka master saat import app tidak boleh dipakai
+    # bersama oleh beberapa proses.
+    from app import app
+    from models import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    from extensions import predictor
+    from views.inference import prediction_jobs
+
+    before = memory_usage()
+    try:
+        predictor.warm_up()
+    except Exception as e:
+        # Worker tetap jalan; /readyz akan melaporkan 503
+        worker.log.error("❌ Error loading model in worker %s: %s", os.getpid(), e)
+    after = memory_usage()
+
+    worker.log.info("[memory] worker pid %s before model: %s", os.getpid(), format_memory(before))
+    worker.log.info("[memory] worker pid %s after model:  %s (+%.1f MB RSS)",
+                    os.getpid(), format_memory(after), after['rss'] - before['rss'])
+
+    # Thread worker job prediksi asynchronous (lihat jobs.py)
+    prediction_jobs.start()
+
+
+def worker_exit(server, worker):
+    import sys
+    if 'app' not in sys.modules:
+        return
+    from extensions import history_writer
+    from views.inference import prediction_jobs
+    # Selesaikan job yang sedang jalan, lalu tulis history yang masih di antrian write-behind
+    prediction_jobs.stop()
+    history_writer.close()
+    worker.log.info("[history] worker pid %s: %s", os.getpid(), history_writer.stats())
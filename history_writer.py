@@ -0,0 +1,230 @@
+"""
+Write-behind untuk history prediksi.
+
+Dengan write-behind aktif, request /api/predict hanya memasukkan baris
+history ke antrian (bounded) lalu langsung mengembalikan response. Thread
+writer mengumpulkan baris dan menulisnya dengan satu bulk INSERT (plus delta
+rollup harian) setiap `flush_rows` baris atau setiap `flush_ms` milidetik.
+
+- Antrian penuh: baris ditulis langsung oleh request (synchronous fallback).
+- Worker berhenti: close() menulis semua baris yang tersisa (dipanggil dari
+  atexit dan hook worker_exit gunicorn).
+- Write-behind nonaktif: write() selalu synchronous, lewat jalur insert yang sama.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from models import db, PredictionHistory
+from rollups import apply_deltas, count_deltas
+
+_STOP = object()
+
+HISTORY_COLUMNS = ('user_id', 'predicted_class', 'confidence', 'image_hash', 'probabilities', 'created_at')
+
+
+def history_row(user_id, predicted_class, confidence, image_hash=None, probabilities=None, created_at=None):
+    """Satu baris prediction_history (dict) untuk HistoryWriter"""
+    return {
+        'user_id': user_id,
+        'predicted_class': predicted_class,
+        'confidence': confidence,
+        'image_hash': image_hash,
+        'probabilities': probabilities,
+        'created_at': created_at or datetime.utcnow(),
+    }
+
+
+def insert_history_rows(conn, rows):
+    """Bulk INSERT baris history + update rollup di transaksi milik `conn`"""
+    if not rows:
+        return
+    conn.execute(PredictionHistory.__table__.insert(), [{k: row[k] for k in HISTORY_COLUMNS} for row in rows])
+    apply_deltas(conn, *count_deltas((row['created_at'], row['predicted_class'], row['user_id']) for row in rows))
+
+
+class _Pending:
+    __slots__ = ('row', 'enqueued_at')
+
+    def __init__(self, row):
+        self.row = row
+        self.enqueued_at = time.perf_counter()
+
+
+class HistoryWriter:
+    """
+    Penulis history prediksi (write-behind atau synchronous)
+
+    Args:
+        app: Flask app (untuk app context di thread writer), atau set lewat init_app
+        enabled: Aktifkan write-behind; False = selalu tulis langsung
+        flush_rows: Flush setelah sejumlah baris terkumpul
+        flush_ms: Flush paling lambat setelah sekian ms sejak baris pertama
+        max_queue: Ukuran maksimal antrian
+    """
+
+    def __init__(self, app=None, enabled=False, flush_rows=50, flush_ms=200, max_queue=1000):
+        self.app = app
+        self._configure(enabled, flush_rows, flush_ms, max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _configure(self, enabled, flush_rows, flush_ms, max_queue):
+        self.enabled = enabled
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_wait = max(0.0, float(flush_ms)) / 1000.0
+        self.max_queue = max(1, int(max_queue))
+        self._queue = queue.Queue(maxsize=self.max_queue)
+
+    def init_app(self, app):
+        """Ikat ke app dan ambil pengaturan HISTORY_* dari config"""
+        self.app = app
+        self._configure(app.config['HISTORY_WRITE_BEHIND'], app.config['HISTORY_FLUSH_ROWS'],
+                        app.config['HISTORY_FLUSH_MS'], app.config['HISTORY_QUEUE_SIZE'])
+
+    def _reset_stats(self):
+        self._queued = 0
+        self._written = 0
+        self._batches = 0
+        self._sync_writes = 0
+        self._sync_fallbacks = 0
+        self._dropped = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        self._last_error = None
+
+    def _ensure_worker(self):
+        # Sama seperti MicroBatcher: thread writer dibuat per proses (aman untuk fork gunicorn)
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+                return
+            if self._worker_pid != pid:
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                with self._stats_lock:
+                    self._reset_stats()
+            self._worker = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+            atexit.register(self.close)
+
+    def write(self, row):
+        """
+        Simpan satu baris history (dict dari history_row())
+
+        Returns:
+            True kalau masuk antrian write-behind, False kalau ditulis langsung
+        """
+        if self.enabled:
+            self._ensure_worker()
+            try:
+                self._queue.put_nowait(_Pending(row))
+                with self._stats_lock:
+                    self._queued += 1
+                return True
+            except queue.Full:
+                with self._stats_lock:
+                    self._sync_fallbacks += 1
+
+        self._write_now([row])
+        with self._stats_lock:
+            self._sync_writes += 1
+        return False
+
+    def _write_now(self, rows):
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                insert_history_rows(conn, rows)
+
+    def _collect(self):
+        """Ambil baris pertama (blocking), lalu kumpulkan sampai flush_rows atau flush_ms"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.flush_wait
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if stopping:
+                # Tulis juga sisa antrian sebelum berhenti
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            self._write_now([item.row for item in batch])
+        except Exception as e:
+            print(f"❌ History writer: gagal menulis {len(batch)} baris: {e}")
+            with self._stats_lock:
+                self._dropped += len(batch)
+                self._last_error = str(e)
+            return
+        committed = time.perf_counter()
+        lags = [committed - item.enqueued_at for item in batch]
+        with self._stats_lock:
+            self._written += len(batch)
+            self._batches += 1
+            self._total_lag += sum(lags)
+            self._max_lag = max(self._max_lag, max(lags))
+
+    def close(self, timeout=10.0):
+        """Flush semua baris yang masih di antrian lalu hentikan thread writer"""
+        worker = self._worker
+        if worker is None or self._worker_pid != os.getpid() or not worker.is_alive():
+            return
+        self._queue.put(_STOP)
+        worker.join(timeout)
+        if worker.is_alive():
+            print(f"⚠️  History writer: flush belum selesai setelah {timeout} detik "
+                  f"({self._queue.qsize()} baris tersisa)")
+
+    def stats(self):
+        """Counter write-behind (lag flush, fallback, baris yang gagal ditulis)"""
+        with self._stats_lock:
+            written = self._written
+            return {
+                'enabled': self.enabled,
+                'flush_rows': self.flush_rows,
+                'flush_ms': self.flush_wait * 1000.0,
+                'max_queue': self.max_queue,
+                'queue_depth': self._queue.qsize(),
+                'queued': self._queued,
+                'written': written,
+                'batches': self._batches,
+                'avg_batch_size': (written / self._batches) if self._batches else 0.0,
+                'sync_writes': self._sync_writes,
+                'sync_fallbacks': self._sync_fallbacks,
+                'dropped': self._dropped,
+                'avg_flush_lag_ms': (self._total_lag / written * 1000.0) if written else 0.0,
+                'max_flush_lag_ms': self._max_lag * 1000.0,
+                'last_error': self._last_error,
+            }
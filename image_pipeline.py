@@ -0,0 +1,137 @@
+"""
+Pipeline gambar upload: decode sekali, hasilkan tensor model dan preview.
+
+Sebelumnya file upload dibuka dua kali dengan PIL (sekali untuk tensor
+224x224, sekali lagi untuk preview 800px). Di sini gambar hanya di-decode
+satu kali; untuk JPEG besar dipakai draft mode sehingga decoder langsung
+men-downscale (1/2, 1/4, 1/8) ke ukuran terkecil yang masih cukup.
+
+Pixel disimpan sebagai uint8 dan baru dinormalisasi (/255) saat ditulis ke
+slot buffer batch float32 yang sudah dialokasikan sebelumnya (satu buffer
+per thread, dipakai ulang). Tidak ada array float64 sementara dan tidak ada
+konversi ulang ke float32 di TensorFlow.
+"""
+import base64
+import hashlib
+import threading
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+MODEL_INPUT_SIZE = (224, 224)
+PREVIEW_MAX_SIZE = 800
+
+
+_SCALE = np.float32(255.0)
+_buffers = threading.local()
+
+
+def normalize_into(pixels, out):
+    """
+    Tulis pixel uint8 (H, W, 3) ke `out` float32 sekaligus dinormalisasi ke 0..1
+
+    `out` bisa berupa satu slot di dalam batch buffer yang lebih besar.
+    """
+    np.divide(pixels, _SCALE, out=out)
+    return out
+
+
+def batch_buffer(batch_size, image_shape=MODEL_INPUT_SIZE[::-1] + (3,)):
+    """
+    Buffer batch float32 (batch_size, H, W, 3) milik thread saat ini
+
+    Buffer dialokasikan sekali per thread lalu dipakai ulang; kalau
+    dibutuhkan batch yang lebih besar, buffer diganti dengan yang lebih besar.
+    """
+    shape = (batch_size,) + tuple(image_shape)
+    buf = getattr(_buffers, 'batch', None)
+    if buf is None or buf.shape[0] < batch_size or buf.shape[1:] != shape[1:]:
+        buf = np.empty(shape, dtype=np.float32)
+        _buffers.batch = buf
+    return buf[:batch_size]
+
+
+def assemble_batch(pixel_list):
+    """
+    Susun list pixel uint8 menjadi batch float32 siap inference
+
+    Returns:
+        View (N, H, W, 3) dari buffer thread saat ini. Isinya ditimpa pada
+        pemanggilan berikutnya di thread yang sama.
+    """
+    batch = batch_buffer(len(pixel_list), pixel_list[0].shape)
+    for i, pixels in enumerate(pixel_list):
+        normalize_into(pixels, batch[i])
+    return batch
+
+
+class DecodedImage:
+    """Hasil decode satu upload: pixel uint8 untuk model, preview JPEG dan hash byte upload"""
+
+    __slots__ = ('pixels', 'preview_jpeg', 'source_size', 'digest')
+
+    def __init__(self, pixels, preview_jpeg, source_size, digest):
+        self.pixels = pixels
+        self.preview_jpeg = preview_jpeg
+        self.source_size = source_size
+        self.digest = digest
+
+    @property
+    def tensor(self):
+        """Tensor float32 (1, H, W, 3) baru (untuk tools; jalur request memakai assemble_batch)"""
+        out = np.empty((1,) + self.pixels.shape, dtype=np.float32)
+        normalize_into(self.pixels, out[0])
+        return out
+
+    @property
+    def preview_base64(self):
+        return base64.b64encode(self.preview_jpeg).decode()
+
+
+def _preview_size(size, max_size):
+    """Ukuran preview (maks `max_size` px di sisi terpanjang, tanpa upscale)"""
+    if max(size) <= max_size:
+        return size
+    ratio = max_size / max(size)
+    return (int(size[0] * ratio), int(size[1] * ratio))
+
+
+def decode_upload(image_file, target_size=MODEL_INPUT_SIZE, preview_max=PREVIEW_MAX_SIZE):
+    """
+    Decode file upload satu kali dan buat tensor model + preview
+
+    Args:
+        image_file: File object dari Flask request.files (atau file-like lain)
+        target_size: Ukuran input model (default: 224x224)
+        preview_max: Sisi terpanjang preview dalam pixel (default: 800)
+
+    Returns:
+        DecodedImage dengan `pixels` uint8 (H, W, 3), `preview_jpeg` (bytes)
+        dan `digest` (SHA-256 byte upload, dipakai sebagai key cache)
+    """
+    data = image_file.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    img = Image.open(BytesIO(data))
+    source_size = img.size
+    preview_size = _preview_size(source_size, preview_max)
+
+    # Draft mode (JPEG saja): decoder memilih skala terkecil yang hasilnya
+    # masih >= ukuran yang dibutuhkan preview maupun model
+    needed = (max(preview_size[0], target_size[0]), max(preview_size[1], target_size[1]))
+    if img.format == 'JPEG' and (source_size[0] >= 2 * needed[0] and source_size[1] >= 2 * needed[1]):
+        img.draft('RGB', needed)
+
+    img = img.convert('RGB')
+
+    # Pixel untuk model (uint8, dinormalisasi saat masuk batch buffer)
+    pixels = np.asarray(img.resize(target_size), dtype=np.uint8)
+
+    # Preview (max 800px)
+    if img.size != preview_size:
+        img = img.resize(preview_size, Image.Resampling.LANCZOS)
+    buffered = BytesIO()
+    img.save(buffered, format="JPEG")
+
+    return DecodedImage(pixels, buffered.getvalue(), source_size, digest)
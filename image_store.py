@@ -0,0 +1,75 @@
+"""
+Penyimpanan gambar prediksi berbasis hash isi (content-addressed).
+
+Gambar preview disimpan di disk sebagai `<root>/<ab>/<cd>/<hash>.jpg`
+(di-shard per prefix hash supaya satu folder tidak berisi jutaan file).
+Tabel `prediction_history` cukup menyimpan hash-nya saja; gambar yang sama
+hanya disimpan sekali.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_valid_hash(image_hash):
+    """Cek format hash (64 karakter hex) sebelum dipakai sebagai path"""
+    return bool(image_hash) and bool(_HASH_RE.match(image_hash))
+
+
+class ImageStore:
+    """
+    Blob store sederhana di filesystem
+
+    Args:
+        root: Folder root penyimpanan gambar (atau set lewat init_app)
+        extension: Ekstensi file yang disimpan (default: .jpg)
+    """
+
+    def __init__(self, root=None, extension='.jpg'):
+        self.root = root
+        self.extension = extension
+
+    def init_app(self, app):
+        """Ambil folder root dari config IMAGE_STORE_DIR"""
+        self.root = app.config['IMAGE_STORE_DIR']
+
+    def path_for(self, image_hash):
+        """Path file untuk hash tertentu (ValueError kalau hash tidak valid)"""
+        if not is_valid_hash(image_hash):
+            raise ValueError(f"Hash gambar tidak valid: {image_hash!r}")
+        return os.path.join(self.root, image_hash[:2], image_hash[2:4], image_hash + self.extension)
+
+    def exists(self, image_hash):
+        return is_valid_hash(image_hash) and os.path.exists(self.path_for(image_hash))
+
+    def put(self, data):
+        """
+        Simpan byte gambar dan kembalikan hash SHA-256-nya
+
+        Penulisan atomic (file sementara + rename), dan dilewati kalau
+        gambar dengan hash yang sama sudah ada.
+        """
+        image_hash = hashlib.sha256(data).hexdigest()
+        path = self.path_for(image_hash)
+        if os.path.exists(path):
+            return image_hash
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return image_hash
+
+    def read(self, image_hash):
+        with open(self.path_for(image_hash), 'rb') as f:
+            return f.read()
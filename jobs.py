@@ -0,0 +1,377 @@
+"""
+Job prediksi asynchronous.
+
+POST /api/predict/jobs hanya menyimpan file upload ke folder spool dan
+mencatat job di antrian, lalu langsung mengembalikan job id (202). Decode,
+inference, simpan preview dan history dikerjakan oleh pool thread worker
+inference (`workers` thread per proses), bukan oleh thread request gunicorn.
+
+Antrian adalah file SQLite lokal (`jobs.db` di folder spool), tanpa broker
+eksternal. Semua worker gunicorn di mesin yang sama memakai file yang sama,
+jadi status job bisa dibaca dari worker mana pun, dan job yang di-submit ke
+satu worker bisa dikerjakan worker lain yang sedang kosong.
+
+- Antrian penuh (`max_pending` job menunggu): submit ditolak (503).
+- Selama job berjalan, pool yang mengerjakannya memperbarui `heartbeat_at`
+  setiap `stale_after / 4` detik. Job "running" yang heartbeat-nya lebih tua
+  dari `stale_after` detik (proses mati di tengah job) diambil ulang; setelah
+  `max_attempts` kali dianggap gagal. Inference yang lambat tapi sehat tetap
+  mengirim heartbeat, jadi tidak dijalankan dua kali.
+- Hasil job disimpan `result_ttl` detik, lalu dihapus beserta file upload.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    upload_path TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class Job:
+    """Satu baris tabel jobs"""
+
+    __slots__ = ('id', 'user_id', 'status', 'upload_path', 'result', 'error',
+                 'attempts', 'created_at', 'started_at', 'heartbeat_at', 'finished_at')
+
+    def __init__(self, row):
+        for name in self.__slots__:
+            setattr(self, name, row[name])
+        self.result = json.loads(self.result) if self.result else None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+
+class JobStore:
+    """
+    Antrian job di file SQLite (aman dipakai beberapa thread dan proses)
+
+    Folder spool dan jobs.db baru dibuat saat store pertama dipakai, jadi
+    membuat app (perintah CLI, script, tools) tidak menyentuh filesystem.
+
+    Args:
+        directory: Folder spool untuk jobs.db dan file upload
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, 'jobs.db')
+        self._local = threading.local()
+        self._ready = False
+        self._setup_lock = threading.Lock()
+
+    def _setup(self):
+        """Buat folder spool dan schema (sekali per proses)"""
+        if self._ready:
+            return
+        with self._setup_lock:
+            if self._ready:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(_SCHEMA)
+                # jobs.db dari versi sebelum heartbeat
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+                if 'heartbeat_at' not in columns:
+                    conn.execute('ALTER TABLE jobs ADD COLUMN heartbeat_at REAL')
+            finally:
+                conn.close()
+            self._ready = True
+
+    def _connect(self):
+        self._setup()
+        # Satu koneksi per thread per proses (koneksi sqlite3 tidak boleh ikut fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def spool(self, data):
+        """Simpan byte upload ke folder spool, return path-nya"""
+        self._setup()
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.upload")
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def enqueue(self, user_id, upload_path):
+        """Catat job baru (status queued), return id job"""
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            'INSERT INTO jobs (id, user_id, status, upload_path, created_at) VALUES (?, ?, ?, ?, ?)',
+            (job_id, user_id, QUEUED, upload_path, time.time())
+        )
+        return job_id
+
+    def get(self, job_id):
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return Job(row) if row else None
+
+    def position(self, job):
+        """Jumlah job queued yang masuk lebih dulu dari `job`"""
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?', (QUEUED, job.created_at)
+        ).fetchone()[0]
+
+    def pending_count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (QUEUED,)).fetchone()[0]
+
+    def claim(self, stale_after, max_attempts):
+        """
+        Ambil job tertua yang queued (atau running tapi macet) dan tandai running
+
+        Job running dianggap macet kalau heartbeat terakhirnya lebih tua dari
+        `stale_after` detik (lihat heartbeat()).
+
+        Returns:
+            Job, atau None kalau antrian kosong
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Job macet yang sudah terlalu sering dicoba dianggap gagal
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ? '
+                'WHERE status = ? AND COALESCE(heartbeat_at, started_at) < ? AND attempts >= ?',
+                (FAILED, 'Job tidak selesai (worker berhenti)', now, RUNNING, now - stale_after, max_attempts)
+            )
+            row = conn.execute(
+                'SELECT * FROM jobs WHERE status = ? OR (status = ? AND COALESCE(heartbeat_at, started_at) < ?) '
+                'ORDER BY created_at LIMIT 1',
+                (QUEUED, RUNNING, now - stale_after)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                'UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?, attempts = attempts + 1 WHERE id = ?',
+                (RUNNING, now, now, row['id'])
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return self.get(row['id'])
+
+    def heartbeat(self, job_ids):
+        """Tandai job running milik proses ini masih dikerjakan"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        self._connect().execute(
+            f"UPDATE jobs SET heartbeat_at = ? WHERE status = ? AND id IN ({', '.join('?' * len(job_ids))})",
+            (time.time(), RUNNING, *job_ids)
+        )
+
+    def finish(self, job_id, result):
+        self._connect().execute(
+            'UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?',
+            (DONE, json.dumps(result), time.time(), job_id)
+        )
+
+    def fail(self, job_id, error):
+        self._connect().execute(
+            'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+            (FAILED, error, time.time(), job_id)
+        )
+
+    def purge(self, older_than):
+        """Hapus job selesai yang lebih lama dari `older_than` detik, beserta file upload-nya"""
+        conn = self._connect()
+        cutoff = time.time() - older_than
+        rows = conn.execute(
+            'SELECT id, upload_path FROM jobs WHERE status IN (?, ?) AND finished_at < ?', (DONE, FAILED, cutoff)
+        ).fetchall()
+        for row in rows:
+            _remove(row['upload_path'])
+        conn.execute('DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?', (DONE, FAILED, cutoff))
+        return len(rows)
+
+    def counts(self):
+        """Jumlah job per status"""
+        rows = self._connect().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class JobPool:
+    """
+    Pool thread worker yang mengerjakan job dari JobStore
+
+    Args:
+        store: JobStore (atau dibuat oleh init_app dari JOB_DIR)
+        process_fn: Fungsi (Job, bytes upload) -> dict hasil (JSON-serializable)
+        workers: Jumlah thread worker per proses
+        max_pending: Batas job queued; submit() ditolak kalau penuh
+        result_ttl: Lama hasil job disimpan (detik)
+        stale_after: Job running tanpa heartbeat lebih lama dari ini (detik)
+            dianggap macet
+        max_attempts: Batas percobaan untuk job yang macet
+        poll_interval: Jeda (detik) cek antrian saat kosong, untuk job dari proses lain
+    """
+
+    def __init__(self, store=None, process_fn=None, workers=2, max_pending=100, result_ttl=600,
+                 stale_after=120, max_attempts=2, poll_interval=0.5):
+        self.store = store
+        self.process_fn = process_fn
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._running = set()  # id job yang sedang dikerjakan thread di proses ini
+        self._heartbeat_stop = threading.Event()
+        self._pid = None
+        self._stopping = False
+        self._last_purge = 0.0
+
+    def init_app(self, app):
+        """Siapkan JobStore di JOB_DIR (dibuka saat pertama dipakai) dan pengaturan JOB_*"""
+        self.store = JobStore(app.config['JOB_DIR'])
+        self.workers = max(1, int(app.config['JOB_WORKERS']))
+        self.max_pending = max(1, int(app.config['JOB_MAX_PENDING']))
+        self.result_ttl = app.config['JOB_RESULT_TTL']
+        self.stale_after = app.config['JOB_STALE_AFTER']
+
+    def start(self):
+        """Jalankan thread worker di proses ini (dibuat ulang setelah fork)"""
+        pid = os.getpid()
+        if self._pid == pid and all(t.is_alive() for t in self._threads):
+            return
+        with self._lock:
+            if self._pid == pid and all(t.is_alive() for t in self._threads):
+                return
+            self._stopping = False
+            self._heartbeat_stop.clear()
+            self._running = set()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'prediction-job-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            self._threads.append(threading.Thread(target=self._heartbeat, name='prediction-job-heartbeat',
+                                                  daemon=True))
+            self._pid = pid
+            for thread in self._threads:
+                thread.start()
+
+    def submit(self, user_id, data):
+        """
+        Simpan upload dan masukkan job ke antrian
+
+        Returns:
+            Id job, atau None kalau antrian penuh
+        """
+        self.start()
+        if self.store.pending_count() >= self.max_pending:
+            return None
+        job_id = self.store.enqueue(user_id, self.store.spool(data))
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def stop(self, timeout=10.0):
+        """Hentikan thread worker setelah job yang sedang jalan selesai"""
+        if self._pid != os.getpid():
+            return
+        self._stopping = True
+        self._heartbeat_stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping:
+            job = self.store.claim(self.stale_after, self.max_attempts)
+            if job is None:
+                self._maybe_purge()
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            self._execute(job)
+
+    def _heartbeat(self):
+        interval = max(self.stale_after / 4, 0.05)
+        while not self._heartbeat_stop.wait(interval):
+            with self._lock:
+                job_ids = list(self._running)
+            try:
+                self.store.heartbeat(job_ids)
+            except sqlite3.Error as e:
+                print(f"⚠️  Prediction jobs: heartbeat gagal: {e}")
+
+    def _execute(self, job):
+        with self._lock:
+            self._running.add(job.id)
+        try:
+            with open(job.upload_path, 'rb') as f:
+                data = f.read()
+            result = self.process_fn(job, data)
+        except Exception as e:
+            print(f"❌ Prediction job {job.id} gagal: {e}")
+            self.store.fail(job.id, str(e))
+        else:
+            self.store.finish(job.id, result)
+        finally:
+            with self._lock:
+                self._running.discard(job.id)
+        _remove(job.upload_path)
+
+    def _maybe_purge(self):
+        now = time.monotonic()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        try:
+            self.store.purge(self.result_ttl)
+        except sqlite3.Error as e:
+            print(f"⚠️  Prediction jobs: purge gagal: {e}")
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'running_here': self._pid == os.getpid() and any(t.is_alive() for t in self._threads),
+            'max_pending': self.max_pending,
+            'jobs': self.store.counts(),
+        }
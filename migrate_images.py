@@ -0,0 +1,69 @@
+"""
+Script untuk memindahkan gambar base64 lama dari tabel prediction_history
+ke ImageStore (disk). Setelah dipindah, kolom image_base64 dikosongkan dan
+baris hanya menyimpan image_hash.
+
+Jalankan: flask migrate-images [--batch-size 200]
+     atau: python migrate_images.py [--batch-size 200]
+Aman dijalankan berulang kali (baris yang sudah dipindah dilewati).
+"""
+import argparse
+import base64
+import binascii
+
+from extensions import image_store
+from migrations import create_db_app, upgrade
+from models import db, PredictionHistory
+
+
+def migrate_images(batch_size=200):
+    moved = 0
+    failed = 0
+    last_id = 0
+
+    while True:
+        rows = db.session.query(PredictionHistory.id, PredictionHistory.image_base64)\
+            .filter(PredictionHistory.id > last_id)\
+            .filter(PredictionHistory.image_base64.isnot(None))\
+            .filter(PredictionHistory.image_hash.is_(None))\
+            .order_by(PredictionHistory.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            break
+
+        for row_id, image_b64 in rows:
+            last_id = row_id
+            try:
+                data = base64.b64decode(image_b64, validate=True)
+            except (binascii.Error, ValueError) as e:
+                print(f"❌ Prediction {row_id}: base64 tidak valid ({e}), dilewati")
+                failed += 1
+                continue
+
+            image_hash = image_store.put(data)
+            db.session.query(PredictionHistory)\
+                .filter(PredictionHistory.id == row_id)\
+                .update({'image_hash': image_hash, 'image_base64': None}, synchronize_session=False)
+            moved += 1
+
+        db.session.commit()
+        print(f"   ... {moved} gambar dipindahkan (sampai id {last_id})")
+
+    return moved, failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pindahkan image_base64 ke ImageStore')
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_db_app()
+    image_store.init_app(app)
+    with app.app_context():
+        upgrade()  # kolom image_hash (migration 003)
+        print("=" * 50)
+        print(f"Memindahkan gambar ke {image_store.root}")
+        print("=" * 50)
+        moved, failed = migrate_images(batch_size=args.batch_size)
+        print(f"\n✅ Selesai: {moved} gambar dipindahkan, {failed} gagal")
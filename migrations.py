@@ -0,0 +1,239 @@
+"""
+Migrasi schema database berversi.
+
+Versi schema disimpan di tabel `schema_version`; setiap migrasi di
+MIGRATIONS dijalankan sekali, berurutan, lalu dicatat. Migrasi dijalankan
+satu kali per deploy (Procfile `release:`) atau saat `python app.py`,
+bukan di setiap worker gunicorn.
+
+Migrasi ditulis idempotent (cek kolom / index dulu), karena database lama
+bisa saja sudah punya sebagian perubahan dari create_all() versi sebelumnya.
+
+Jalankan:
+    python migrations.py            # jalankan migrasi yang belum
+    python migrations.py --status   # tampilkan versi schema
+"""
+import argparse
+import json
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy import bindparam, inspect, select, text, update
+
+import probabilities as prob_codec
+import rollups
+import search_index
+from config import Config
+from models import db, User, PredictionHistory, DailyClassStat, DailyUserStat
+
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+
+def create_db_app(database_uri=None):
+    """
+    App Flask minimal (tanpa model TensorFlow) untuk script dan tools database
+
+    Args:
+        database_uri: Override SQLALCHEMY_DATABASE_URI (mis. database benchmark)
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if database_uri:
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    db.init_app(app)
+    rollups.init_app(app)
+    return app
+
+
+def _columns(table_name):
+    return {col['name'] for col in inspect(db.engine).get_columns(table_name)}
+
+
+def _create_model_index(model, name):
+    """Buat index yang didefinisikan di model (dilewati kalau sudah ada)"""
+    for index in model.__table__.indexes:
+        if index.name == name:
+            index.create(bind=db.engine, checkfirst=True)
+            return
+    raise KeyError(f"Index {name} tidak ada di model {model.__name__}")
+
+
+# ============================================
+# Migrations
+# ============================================
+
+def baseline():
+    """Tabel users dan prediction_history"""
+    db.create_all()
+
+
+def add_user_role():
+    """Kolom users.role (database dari sebelum ada admin panel)"""
+    if 'role' in _columns('users'):
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'user'"))
+
+
+def add_image_hash():
+    """Kolom prediction_history.image_hash untuk ImageStore"""
+    if 'image_hash' not in _columns('prediction_history'):
+        with db.engine.begin() as conn:
+            conn.execute(text('ALTER TABLE prediction_history ADD COLUMN image_hash VARCHAR(64) NULL'))
+    _create_model_index(PredictionHistory, 'ix_prediction_history_image_hash')
+
+
+def add_query_indexes():
+    """Index untuk query history, dashboard dan admin"""
+    # History per user (keyset pagination, profile, admin user detail)
+    _create_model_index(PredictionHistory, 'ix_prediction_history_user_created')
+    # Dashboard: hitungan per rentang tanggal dan prediksi terbaru
+    _create_model_index(PredictionHistory, 'ix_prediction_history_created_at')
+    # GROUP BY predicted_class dan filter kelas di admin predictions
+    _create_model_index(PredictionHistory, 'ix_prediction_history_class_user')
+    _create_model_index(User, 'ix_users_role')
+    _create_model_index(User, 'ix_users_created_at')
+
+
+def add_daily_rollups():
+    """Tabel rollup statistik harian, diisi dari history yang sudah ada"""
+    db.metadata.create_all(db.engine, tables=[DailyClassStat.__table__, DailyUserStat.__table__])
+    rollups.rebuild()
+
+
+def convert_probabilities(batch_size=500):
+    """
+    Konversi JSON all_probabilities lama ke vektor float32 (kolom probabilities)
+
+    Baris yang JSON-nya tidak valid atau kelasnya tidak cocok dengan
+    class_indices.json dibiarkan (tetap JSON, probabilities NULL).
+
+    Returns:
+        Tuple (jumlah dikonversi, jumlah dilewati)
+    """
+    table = PredictionHistory.__table__
+    names = prob_codec.load_class_names()
+    converted = skipped = 0
+    last_id = 0
+
+    while True:
+        with db.engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.all_probabilities)
+                .where(table.c.id > last_id,
+                       table.c.all_probabilities.isnot(None),
+                       table.c.probabilities.is_(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            updates = []
+            for row_id, raw in rows:
+                last_id = row_id
+                try:
+                    blob = prob_codec.encode_dict(json.loads(raw), names)
+                except (ValueError, TypeError, KeyError):
+                    skipped += 1
+                    continue
+                updates.append({'row_id': row_id, 'blob': blob})
+
+            if updates:
+                conn.execute(
+                    update(table)
+                    .where(table.c.id == bindparam('row_id'))
+                    .values(probabilities=bindparam('blob'), all_probabilities=None),
+                    updates
+                )
+                converted += len(updates)
+
+    return converted, skipped
+
+
+def add_probability_vectors():
+    """Kolom prediction_history.probabilities (float32 biner), diisi dari JSON lama"""
+    if 'probabilities' not in _columns('prediction_history'):
+        column_type = db.LargeBinary().compile(dialect=db.engine.dialect)
+        with db.engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE prediction_history ADD COLUMN probabilities {column_type} NULL'))
+    converted, skipped = convert_probabilities()
+    print(f"   {converted} baris dikonversi, {skipped} dilewati (JSON tidak cocok dengan class_indices.json)")
+
+
+def add_user_search_index():
+    """Index full-text users untuk search admin (FTS5 di SQLite, FULLTEXT ngram di MySQL)"""
+    search_index.install()
+
+
+MIGRATIONS = [
+    (1, 'baseline', baseline),
+    (2, 'add_user_role', add_user_role),
+    (3, 'add_image_hash', add_image_hash),
+    (4, 'add_query_indexes', add_query_indexes),
+    (5, 'add_daily_rollups', add_daily_rollups),
+    (6, 'add_probability_vectors', add_probability_vectors),
+    (7, 'add_user_search_index', add_user_search_index),
+]
+
+
+def _ensure_version_table():
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ('
+            'version INTEGER NOT NULL PRIMARY KEY, '
+            'name VARCHAR(100) NOT NULL, '
+            'applied_at DATETIME NOT NULL)'
+        ))
+
+
+def applied_versions():
+    """Set versi migrasi yang sudah dijalankan"""
+    _ensure_version_table()
+    with db.engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f'SELECT version FROM {SCHEMA_VERSION_TABLE}'))}
+
+
+def current_version():
+    return max(applied_versions(), default=0)
+
+
+def upgrade():
+    """
+    Jalankan semua migrasi yang belum tercatat, berurutan
+
+    Returns:
+        List nama migrasi yang dijalankan
+    """
+    done = applied_versions()
+    ran = []
+    for version, name, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        print(f"🔄 Migration {version:03d} {name}...")
+        migrate()
+        with db.engine.begin() as conn:
+            conn.execute(
+                text(f'INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (:v, :n, :t)'),
+                {'v': version, 'n': name, 't': datetime.utcnow()}
+            )
+        ran.append(name)
+    return ran
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrasi schema database')
+    parser.add_argument('--status', action='store_true', help='Tampilkan versi schema tanpa menjalankan migrasi')
+    args = parser.parse_args()
+
+    with create_db_app().app_context():
+        if args.status:
+            done = applied_versions()
+            for version, name, _ in MIGRATIONS:
+                print(f"{'✅' if version in done else '⏳'} {version:03d} {name}")
+        else:
+            ran = upgrade()
+            if ran:
+                print(f"✅ {len(ran)} migration dijalankan, schema versi {current_version()}")
+            else:
+                print(f"✅ Schema sudah versi terbaru ({current_version()})")
@@ -0,0 +1,454 @@
+"""
+Model server lokal: satu proses yang memegang TensorFlow dan model.
+
+Tanpa model server, setiap worker gunicorn meng-import TensorFlow dan
+memuat model sendiri (memori dan thread pool TF dikali jumlah worker).
+Dengan MODEL_SERVER_SOCKET di-set, worker web tidak meng-import TensorFlow
+sama sekali; pixel hasil decode dikirim ke proses ini lewat Unix domain
+socket, dan proses ini yang menjalankan micro-batching (request dari semua
+worker digabung ke satu antrian) dan memakai semua core untuk thread TF.
+
+MODEL_SERVER_SOCKET berupa path (Unix domain socket, model server di mesin
+yang sama) atau `host:port` (TCP, misalnya process type `inference` di
+Procfile yang di-scale terpisah dari `web`).
+
+Model server tidak punya autentikasi user dan setiap request bisa berisi
+sampai MAX_IMAGES_PER_REQUEST gambar, jadi TCP hanya untuk jaringan privat:
+- Bind ke loopback (127.0.0.1) tidak butuh apa-apa lagi.
+- Bind ke alamat lain wajib memakai shared secret MODEL_SERVER_TOKEN (server
+  menolak start tanpa token); setiap koneksi harus OP_AUTH dulu. Port ini
+  tetap tidak boleh bisa diakses dari internet.
+
+Protokol (binary, little-endian), satu koneksi bisa dipakai untuk banyak
+request berurutan:
+
+- Request : header `<4sBIHHH` (magic, op, jumlah gambar, tinggi, lebar,
+  channel), lalu untuk OP_PREDICT pixel uint8 (N, H, W, C) apa adanya.
+  OP_AUTH: `jumlah gambar` = panjang token, lalu byte token (UTF-8).
+- Response: header `<4sBII` (magic, status, jumlah baris, panjang payload),
+  lalu payload: probabilitas float32 (N, num_classes) untuk OP_PREDICT,
+  JSON untuk OP_STATUS, atau pesan error UTF-8 kalau status != 0.
+
+Pixel dikirim langsung dari buffer array (tanpa serialisasi) dan diterima
+dengan recv_into ke array tujuan, jadi tidak ada salinan tambahan di kedua
+sisi selain yang dilakukan kernel.
+
+Jalankan: python model_server.py [--socket /tmp/skinalyze-model.sock | --socket 127.0.0.1:7000]
+"""
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+
+import numpy as np
+
+MAGIC = b'SKM1'
+OP_PREDICT = 1
+OP_STATUS = 2
+OP_AUTH = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_REQUEST = struct.Struct('<4sBIHHH')
+_RESPONSE = struct.Struct('<4sBII')
+
+# Batas satu request (mencegah alokasi besar dari header yang rusak)
+MAX_IMAGES_PER_REQUEST = 1024
+MAX_TOKEN_BYTES = 256
+
+
+class ModelServerError(Exception):
+    """Model server tidak bisa dihubungi atau mengembalikan error"""
+
+
+class _InvalidRequest(ValueError):
+    """Header request tidak valid; payload-nya tidak bisa dibaca, koneksi ditutup"""
+
+
+class _ConnectionClosed(ConnectionError):
+    """Pihak lain menutup koneksi (EOF)"""
+
+
+# Error yang berarti koneksi lama sudah diputus server (mis. restart), bukan request yang lambat
+_STALE_CONNECTION_ERRORS = (_ConnectionClosed, ConnectionResetError, ConnectionAbortedError, BrokenPipeError)
+
+
+def parse_address(address):
+    """
+    MODEL_SERVER_SOCKET -> (address family, address)
+
+    `host:port` = TCP, selain itu dianggap path Unix domain socket.
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address:
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+def is_loopback(address):
+    """Alamat dari parse_address() hanya bisa diakses dari mesin ini"""
+    family, address = parse_address(address)
+    if family == socket.AF_UNIX:
+        return True
+    host = address[0]
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _recv_into(sock, view):
+    """Isi `view` (memoryview) penuh dari socket"""
+    while len(view):
+        received = sock.recv_into(view)
+        if not received:
+            raise _ConnectionClosed('Koneksi ditutup')
+        view = view[received:]
+
+
+def _recv_exact(sock, size):
+    buf = bytearray(size)
+    _recv_into(sock, memoryview(buf))
+    return bytes(buf)
+
+
+# ============================================
+# Client (dipakai worker web, tanpa TensorFlow)
+# ============================================
+
+class ModelClient:
+    """
+    Client model server untuk worker web
+
+    Interface-nya mengikuti MicroBatcher (`submit`, `submit_many`, `stats`,
+    `max_batch_size`) dan sebagian ModelRuntime (`available`, `status`),
+    jadi Predictor (predictor.py) bisa memakainya sebagai pengganti keduanya.
+
+    Args:
+        socket_path: Path Unix domain socket atau `host:port` model server
+        timeout: Batas waktu satu request (detik)
+        max_batch_size: Jumlah gambar per request dari endpoint batch
+        token: Shared secret (MODEL_SERVER_TOKEN), dikirim sekali per koneksi
+    """
+
+    def __init__(self, socket_path, timeout=30.0, max_batch_size=16, token=None):
+        self.socket_path = socket_path
+        self.family, self.address = parse_address(socket_path)
+        self.timeout = timeout
+        self.token = token.encode('utf-8') if token else None
+        self.max_batch_size = max(1, int(max_batch_size))
+        self._local = threading.local()
+
+    @property
+    def available(self):
+        # Error koneksi dilaporkan per request; /readyz memakai status()
+        return True
+
+    def _connected(self):
+        """Thread ini sudah punya koneksi dari request sebelumnya"""
+        return getattr(self._local, 'sock', None) is not None and self._local.pid == os.getpid()
+
+    def _connection(self):
+        # Satu koneksi per thread per proses (socket tidak boleh dipakai bersama setelah fork)
+        sock = getattr(self._local, 'sock', None)
+        if not self._connected():
+            sock = socket.socket(self.family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            if self.family == socket.AF_INET:
+                # Header kecil langsung dikirim, tidak ditahan Nagle
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                sock.connect(self.address)
+                if self.token:
+                    self._authenticate(sock)
+            except BaseException:
+                sock.close()
+                raise
+            self._local.sock = sock
+            self._local.pid = os.getpid()
+        return sock
+
+    def _authenticate(self, sock):
+        sock.sendall(_REQUEST.pack(MAGIC, OP_AUTH, len(self.token), 0, 0, 0) + self.token)
+        magic, status, _, length = _RESPONSE.unpack(_recv_exact(sock, _RESPONSE.size))
+        body = _recv_exact(sock, length)
+        if magic != MAGIC:
+            raise ConnectionError('Response model server tidak valid')
+        if status != STATUS_OK:
+            raise ModelServerError(body.decode('utf-8', 'replace'))
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def _exchange(self, header, payload):
+        sock = self._connection()
+        sock.sendall(header)
+        if payload is not None:
+            sock.sendall(payload)
+        magic, status, rows, length = _RESPONSE.unpack(_recv_exact(sock, _RESPONSE.size))
+        if magic != MAGIC:
+            raise ConnectionError('Response model server tidak valid')
+        return status, rows, _recv_exact(sock, length)
+
+    def _request(self, op, batch=None):
+        if batch is None:
+            header, payload = _REQUEST.pack(MAGIC, op, 0, 0, 0, 0), None
+        else:
+            count, height, width, channels = batch.shape
+            header = _REQUEST.pack(MAGIC, op, count, height, width, channels)
+            payload = memoryview(batch).cast('B')
+
+        # Koneksi lama bisa sudah diputus server (restart): coba sekali lagi dengan koneksi baru.
+        # Timeout dan error lain tidak diulang, supaya batch yang lambat tidak dihitung dua kali.
+        for attempt in range(2):
+            reused = self._connected()
+            try:
+                status, rows, body = self._exchange(header, payload)
+                break
+            except _STALE_CONNECTION_ERRORS as e:
+                self._close()
+                if attempt or not reused:
+                    raise ModelServerError(f"Model server tidak bisa dihubungi ({self.socket_path}): {e}")
+            except socket.timeout:
+                self._close()
+                raise ModelServerError(f"Model server tidak merespons dalam {self.timeout:g} detik ({self.socket_path})")
+            except OSError as e:
+                self._close()
+                raise ModelServerError(f"Model server tidak bisa dihubungi ({self.socket_path}): {e}")
+
+        if status != STATUS_OK:
+            raise ModelServerError(body.decode('utf-8', 'replace'))
+        return rows, body
+
+    def predict(self, pixels_batch):
+        """
+        Prediksi batch pixel uint8 (N, H, W, C)
+
+        Returns:
+            Array probabilitas float32 (N, num_classes)
+        """
+        batch = np.ascontiguousarray(pixels_batch, dtype=np.uint8)
+        rows, body = self._request(OP_PREDICT, batch)
+        return np.frombuffer(body, dtype='<f4').reshape(rows, -1)
+
+    def submit(self, pixels, timeout=None):
+        """Prediksi satu gambar (H, W, C), return probabilitas (num_classes,)"""
+        return self.predict(np.asarray(pixels)[np.newaxis])[0]
+
+    def submit_many(self, arrays, timeout=None):
+        """Prediksi beberapa gambar dalam satu request, urutan hasil sama dengan `arrays`"""
+        return list(self.predict(np.stack(arrays)))
+
+    def server_status(self):
+        """Status runtime dan batching dari model server"""
+        _, body = self._request(OP_STATUS)
+        return json.loads(body)
+
+    def status(self):
+        """Status model untuk endpoint readiness"""
+        try:
+            status = self.server_status()['model']
+        except ModelServerError as e:
+            status = {'loaded': False, 'warmed': False, 'error': str(e)}
+        status['server'] = self.socket_path
+        return status
+
+    def stats(self):
+        """Statistik batching model server (sama dengan MicroBatcher.stats())"""
+        try:
+            stats = self.server_status()['batching']
+        except ModelServerError as e:
+            stats = {'error': str(e)}
+        stats['server'] = self.socket_path
+        return stats
+
+
+# ============================================
+# Server
+# ============================================
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Satu koneksi dari worker web; request diproses berurutan sampai koneksi ditutup"""
+
+    def handle(self):
+        sock = self.request
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        authenticated = self.server.token is None
+        while True:
+            try:
+                header = _recv_exact(sock, _REQUEST.size)
+            except (OSError, ConnectionError):
+                return
+            magic, op, count, height, width, channels = _REQUEST.unpack(header)
+            if magic != MAGIC:
+                return
+
+            close = False
+            try:
+                if op == OP_AUTH:
+                    authenticated = self._authenticate(sock, count)
+                    rows, body = 0, b''
+                elif not authenticated:
+                    raise _InvalidRequest('Autentikasi diperlukan (MODEL_SERVER_TOKEN)')
+                elif op == OP_PREDICT:
+                    rows, body = self._predict(sock, count, (height, width, channels))
+                elif op == OP_STATUS:
+                    rows, body = 0, json.dumps(self.server.status()).encode('utf-8')
+                else:
+                    raise ValueError(f"Operasi tidak dikenal: {op}")
+                status = STATUS_OK
+            except (OSError, ConnectionError):
+                return
+            except Exception as e:
+                status, rows, body = STATUS_ERROR, 0, str(e).encode('utf-8')
+                close = isinstance(e, _InvalidRequest)
+
+            try:
+                sock.sendall(_RESPONSE.pack(MAGIC, status, rows, len(body)))
+                sock.sendall(body)
+            except OSError:
+                return
+            if close:
+                return
+
+    def _authenticate(self, sock, length):
+        if length > MAX_TOKEN_BYTES:
+            raise _InvalidRequest('Token terlalu panjang')
+        token = _recv_exact(sock, length)
+        if self.server.token is not None and not hmac.compare_digest(token, self.server.token):
+            raise _InvalidRequest('Token model server salah')
+        return True
+
+    def _predict(self, sock, count, image_shape):
+        if not 0 < count <= MAX_IMAGES_PER_REQUEST or image_shape != self.server.image_shape:
+            raise _InvalidRequest(f"Request tidak valid: {count} gambar {image_shape}, "
+                             f"harus 1..{MAX_IMAGES_PER_REQUEST} gambar {self.server.image_shape}")
+
+        pixels = np.empty((count,) + image_shape, dtype=np.uint8)
+        _recv_into(sock, memoryview(pixels).cast('B'))
+        outputs = self.server.batcher.submit_many(list(pixels), timeout=self.server.timeout)
+        return count, np.ascontiguousarray(outputs, dtype='<f4').tobytes()
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Socket server (Unix atau TCP) di atas ModelRuntime + MicroBatcher
+
+    Args:
+        socket_path: Path Unix domain socket atau `host:port`
+        runtime: ModelRuntime yang sudah di-prepare
+        batcher: MicroBatcher yang menjalankan runtime
+        image_shape: Shape satu gambar (H, W, C) yang diterima
+        timeout: Batas waktu tunggu hasil batcher (detik)
+        token: Shared secret yang wajib dikirim client (OP_AUTH); wajib untuk
+            TCP selain loopback
+
+    Raises:
+        ValueError: Bind TCP ke alamat non-loopback tanpa token
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, socket_path, runtime, batcher, image_shape=(224, 224, 3), timeout=None, token=None):
+        if not token and not is_loopback(socket_path):
+            raise ValueError(f"Bind ke {socket_path} tanpa MODEL_SERVER_TOKEN ditolak; "
+                             f"pakai Unix socket, 127.0.0.1, atau set MODEL_SERVER_TOKEN")
+        self.token = token.encode('utf-8') if token else None
+        self.runtime = runtime
+        self.batcher = batcher
+        self.image_shape = tuple(image_shape)
+        self.timeout = timeout
+        self.address_family, address = parse_address(socket_path)
+        if self.address_family == socket.AF_UNIX and os.path.exists(address):
+            # Socket sisa proses sebelumnya
+            os.remove(address)
+        super().__init__(address, _Handler)
+        if self.address_family == socket.AF_UNIX:
+            os.chmod(address, 0o660)
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'model': self.runtime.status(),
+            'batching': self.batcher.stats(),
+        }
+
+    def server_close(self):
+        super().server_close()
+        if self.address_family == socket.AF_UNIX:
+            try:
+                os.remove(self.server_address)
+            except OSError:
+                pass
+
+
+def main():
+    from batching import MicroBatcher
+    from config import Config
+    from image_pipeline import MODEL_INPUT_SIZE, assemble_batch
+    from inference import ModelRuntime, default_thread_counts
+
+    parser = argparse.ArgumentParser(description='Model server untuk worker web (Unix socket atau TCP)')
+    parser.add_argument('--socket', default=Config.MODEL_SERVER_SOCKET or '/tmp/skinalyze-model.sock',
+                        help='Path Unix domain socket atau host:port (default: MODEL_SERVER_SOCKET)')
+    args = parser.parse_args()
+
+    # Satu proses inference untuk semua worker web: thread TF memakai semua core
+    default_intra, default_inter = default_thread_counts(workers=1)
+    runtime = ModelRuntime(Config.INFERENCE_BACKEND, Config.MODEL_PATH,
+                           artifact_dir=Config.MODEL_ARTIFACT_DIR,
+                           intra_op_threads=Config.TF_INTRA_OP_THREADS or default_intra,
+                           inter_op_threads=Config.TF_INTER_OP_THREADS or default_inter,
+                           jit_compile=Config.TF_XLA_JIT,
+                           xnnpack=Config.TFLITE_XNNPACK)
+    print("🔄 Preparing model...")
+    if not runtime.prepare():
+        print(f"❌ Error preparing model: {runtime.error}")
+        raise SystemExit(1)
+
+    timings = runtime.warm_up(Config.WARMUP_BATCH_SIZES)
+    print(f"⏱️  Time to first prediction [{runtime.load_path}]: {runtime.time_to_first_prediction:.2f}s")
+    print(f"✅ Model warmed up in {runtime.warmup_seconds:.2f}s "
+          f"(batch sizes: {', '.join(str(b) for b in timings)}, threads: {runtime.threads})")
+
+    batcher = MicroBatcher(runtime.predict,
+                           max_batch_size=Config.BATCH_MAX_SIZE,
+                           max_wait_ms=Config.BATCH_MAX_WAIT_MS,
+                           assemble_fn=assemble_batch)
+    try:
+        server = ModelServer(args.socket, runtime, batcher,
+                             image_shape=MODEL_INPUT_SIZE[::-1] + (3,),
+                             timeout=Config.MODEL_SERVER_TIMEOUT,
+                             token=Config.MODEL_SERVER_TOKEN)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(f"🚀 Model server listening on {args.socket} (pid {os.getpid()}"
+          f"{', token required' if server.token else ''})")
+    # SIGTERM (systemd/supervisor stop) -> keluar lewat finally supaya file socket dihapus
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
+from flask import url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy.orm import load_only
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
+import probabilities as prob_codec
+
 db = SQLAlchemy()
 
 class User(UserMixin, db.Model):
@@ -14,8 +18,8 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     full_name = db.Column(db.String(100), nullable=True)
     phone = db.Column(db.String(20), nullable=True)
-    role = db.Column(db.String(20), nullable=False, default='user')  # 'admin' or 'user'
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    role = db.Column(db.String(20), nullable=False, default='user', index=True)  # 'admin' or 'user'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def set_password(self, password):
@@ -54,26 +58,112 @@ class PredictionHistory(db.Model):
     predicted_class = db.Column(db.String(100), nullable=False)
     confidence = db.Column(db.Float, nullable=False)
     image_path = db.Column(db.String(255), nullable=True)  # Path ke gambar yang diupload
-    image_base64 = db.Column(db.Text, nullable=True)  # Base64 image untuk preview
-    all_probabilities = db.Column(db.Text, nullable=True)  # JSON string untuk semua probabilitas
+    image_hash = db.Column(db.String(64), nullable=True, index=True)  # Hash gambar di ImageStore
+    # Legacy: base64 preview lama, dipindahkan ke ImageStore oleh migrate_images.py
+    image_base64 = db.deferred(db.Column(db.Text, nullable=True))
+    # Probabilitas semua kelas: float32 x jumlah kelas, urutan class_indices.json (lihat probabilities.py)
+    probabilities = db.Column(db.LargeBinary, nullable=True)
+    # Legacy: JSON string, dikonversi ke kolom probabilities oleh migration 006
+    all_probabilities = db.deferred(db.Column(db.Text, nullable=True))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship
     user = db.relationship('User', backref=db.backref('predictions', lazy=True))
     
+    # Index dibuat lewat migrations.py (lihat add_query_indexes)
+    __table_args__ = (
+        # Keyset pagination history per user (lihat pagination.py)
+        db.Index('ix_prediction_history_user_created', 'user_id', created_at.desc(), id.desc()),
+        # Dashboard: rentang tanggal dan prediksi terbaru
+        db.Index('ix_prediction_history_created_at', 'created_at'),
+        # GROUP BY kelas dan filter kelas di admin predictions
+        db.Index('ix_prediction_history_class_user', 'predicted_class', 'user_id'),
+    )
+    
     def to_dict(self):
         """Convert prediction history ke dictionary untuk JSON"""
-        import json
-        return {
-            'id': self.id,
-            'predicted_class': self.predicted_class,
-            'confidence': self.confidence,
-            'image_base64': self.image_base64,
-            'all_probabilities': json.loads(self.all_probabilities) if self.all_probabilities else {},
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'created_at_formatted': self.created_at.strftime('%d %B %Y, %H:%M') if self.created_at else '-'
-        }
+        return history_dict(self, vector=getattr(self, 'probability_vector', None))
     
     def __repr__(self):
         return f'<PredictionHistory {self.id} - {self.predicted_class}>'
 
+
+# Field JSON history -> kolom PredictionHistory yang dibutuhkan (untuk ?fields= di API)
+HISTORY_FIELDS = {
+    'id': ('id',),
+    'predicted_class': ('predicted_class',),
+    'confidence': ('confidence',),
+    'image_hash': ('image_hash',),
+    'image_url': ('image_hash',),
+    'all_probabilities': ('probabilities',),
+    'created_at': ('created_at',),
+    'created_at_formatted': ('created_at',),
+}
+
+# Kolom yang dipakai template tabel/list history (tanpa gambar dan probabilitas)
+LIST_COLUMNS = ('id', 'user_id', 'predicted_class', 'confidence', 'image_hash', 'created_at')
+
+
+def history_columns(fields):
+    """Kolom yang perlu di-select untuk field tertentu (id dan created_at selalu ikut, untuk cursor)"""
+    names = ['id', 'created_at']
+    for field in fields:
+        for name in HISTORY_FIELDS[field]:
+            if name not in names:
+                names.append(name)
+    return [getattr(PredictionHistory, name) for name in names]
+
+
+def history_dict(row, fields=HISTORY_FIELDS, vector=None):
+    """
+    Serialize satu baris history (objek PredictionHistory atau Row hasil history_columns())
+
+    Args:
+        row: Objek/Row yang punya kolom untuk `fields`
+        fields: Field yang dikeluarkan (default: semua)
+        vector: Vektor probabilitas yang sudah di-decode (opsional, untuk decode per halaman)
+    """
+    data = {}
+    for field in fields:
+        if field == 'image_url':
+            data[field] = url_for('profile.prediction_image', image_hash=row.image_hash) if row.image_hash else None
+        elif field == 'all_probabilities':
+            if vector is None:
+                vector = prob_codec.decode(row.probabilities)
+            data[field] = dict(prob_codec.named_probabilities(vector))
+        elif field == 'created_at':
+            data[field] = row.created_at.isoformat() if row.created_at else None
+        elif field == 'created_at_formatted':
+            data[field] = row.created_at.strftime('%d %B %Y, %H:%M') if row.created_at else '-'
+        else:
+            data[field] = getattr(row, field)
+    return data
+
+
+def listing_options(*extra_columns):
+    """load_only() untuk halaman list history: hanya LIST_COLUMNS (+ kolom tambahan)"""
+    return load_only(*(getattr(PredictionHistory, name) for name in LIST_COLUMNS + extra_columns))
+
+
+
+class DailyClassStat(db.Model):
+    """Rollup jumlah prediksi per hari per kelas (dikelola oleh rollups.py)"""
+    __tablename__ = 'daily_class_stats'
+    
+    day = db.Column(db.Date, primary_key=True)
+    predicted_class = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyUserStat(db.Model):
+    """Rollup jumlah prediksi per hari per user (dikelola oleh rollups.py)"""
+    __tablename__ = 'daily_user_stats'
+    
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Total per user (admin user detail)
+        db.Index('ix_daily_user_stats_user_day', 'user_id', 'day'),
+    )
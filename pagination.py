@@ -0,0 +1,168 @@
+"""
+Keyset (cursor) pagination untuk prediction history.
+
+Halaman diurutkan `created_at DESC, id DESC` dan dibatasi dengan kondisi
+"lebih lama / lebih baru dari baris terakhir yang sudah dilihat", bukan
+OFFSET. Biaya query sama untuk halaman pertama maupun halaman ke-1000
+(memakai index (user_id, created_at DESC, id)), dan halaman tidak bergeser
+saat ada prediksi baru.
+
+Cursor adalah string URL-safe berisi (created_at, id) dari satu baris.
+
+Halaman bernomor (OFFSET) di panel admin memakai NumberedPage.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at, row_id):
+    """Cursor URL-safe untuk posisi (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Kebalikan dari encode_cursor()
+
+    Returns:
+        Tuple (created_at, id), atau None kalau cursor kosong / tidak valid
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _older_than(model, position):
+    created_at, row_id = position
+    return or_(model.created_at < created_at,
+               and_(model.created_at == created_at, model.id < row_id))
+
+
+def _newer_than(model, position):
+    created_at, row_id = position
+    return or_(model.created_at > created_at,
+               and_(model.created_at == created_at, model.id > row_id))
+
+
+def apply_cursors(query, model, after=None, since=None):
+    """
+    Batasi query dengan cursor tanpa paginasi (untuk streaming)
+
+    Args:
+        after: Cursor; hanya baris yang lebih lama dari posisi ini
+        since: Cursor; hanya baris yang lebih baru dari posisi ini
+    """
+    after = decode_cursor(after)
+    since = decode_cursor(since)
+    if after is not None:
+        query = query.filter(_older_than(model, after))
+    if since is not None:
+        query = query.filter(_newer_than(model, since))
+    return query
+
+
+class KeysetPage:
+    """
+    Satu halaman hasil keyset_paginate()
+
+    Atribut untuk template: items, has_prev, has_next, prev_cursor, next_cursor.
+    """
+
+    def __init__(self, items, has_prev, has_next):
+        self.items = items
+        self.has_prev = has_prev
+        self.has_next = has_next
+
+    @property
+    def prev_cursor(self):
+        """Cursor untuk halaman yang lebih baru (parameter `before`)"""
+        if not self.items:
+            return None
+        first = self.items[0]
+        return encode_cursor(first.created_at, first.id)
+
+    @property
+    def next_cursor(self):
+        """Cursor untuk halaman yang lebih lama (parameter `after`)"""
+        if not self.items:
+            return None
+        last = self.items[-1]
+        return encode_cursor(last.created_at, last.id)
+
+
+def keyset_paginate(query, model, per_page, after=None, before=None):
+    """
+    Ambil satu halaman (terbaru dulu) dengan keyset pagination
+
+    Args:
+        query: Query yang sudah difilter (tanpa order_by)
+        model: Model yang punya kolom created_at dan id
+        per_page: Jumlah baris per halaman
+        after: Cursor; ambil baris yang lebih lama dari posisi ini (halaman berikutnya)
+        before: Cursor; ambil baris yang lebih baru dari posisi ini (halaman sebelumnya)
+
+    Returns:
+        KeysetPage
+    """
+    after = decode_cursor(after)
+    before = decode_cursor(before) if after is None else None
+
+    if before is not None:
+        # Ambil baris tepat di atas cursor (urut naik), lalu dibalik
+        rows = query.filter(_newer_than(model, before))\
+            .order_by(model.created_at.asc(), model.id.asc())\
+            .limit(per_page + 1)\
+            .all()
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        return KeysetPage(items, has_prev=has_prev, has_next=True)
+
+    if after is not None:
+        query = query.filter(_older_than(model, after))
+    rows = query.order_by(model.created_at.desc(), model.id.desc())\
+        .limit(per_page + 1)\
+        .all()
+    return KeysetPage(rows[:per_page], has_prev=after is not None, has_next=len(rows) > per_page)
+
+
+def rows_since(query, model, since, limit):
+    """
+    Baris yang lebih baru dari cursor `since` (untuk polling dari client)
+
+    Yang dikembalikan adalah `limit` baris tepat setelah `since`, terbaru
+    dulu, supaya client bisa melanjutkan tanpa celah kalau `has_more`.
+
+    Returns:
+        Tuple (items, has_more)
+    """
+    page = keyset_paginate(query, model, limit, before=since)
+    return page.items, page.has_prev
+
+
+class NumberedPage:
+    """
+    Halaman bernomor dari Flask-SQLAlchemy `.paginate()` dengan kontrak template admin
+
+    Sama seperti Pagination bawaan, kecuali `pages` minimal 1 untuk hasil
+    kosong (halaman 1 dari 1, bukan 1 dari 0) dan has_prev/has_next dihitung
+    dari nomor halaman yang diminta.
+    """
+
+    def __init__(self, paginated):
+        self.items = paginated.items
+        self.total = paginated.total
+        self.page = paginated.page
+        self.pages = max(paginated.pages, 1)
+        self.has_prev = self.page > 1
+        self.has_next = self.page < self.pages
+        self.prev_num = self.page - 1 if self.has_prev else None
+        self.next_num = self.page + 1 if self.has_next else None
@@ -0,0 +1,164 @@
+"""
+Cache hasil prediksi berbasis hash isi gambar (LRU + TTL).
+
+User sering meng-upload ulang foto yang sama dan frontend melakukan retry
+saat koneksi putus. Dengan cache ini, upload yang identik (hash byte sama)
+tidak perlu menjalankan model lagi.
+
+Setiap entry mencatat fingerprint model yang menghasilkannya (backend, ukuran
+dan mtime file model + class_indices.json). Kalau salah satu file berubah,
+seluruh cache otomatis dikosongkan.
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def _estimate_size(key, value):
+    """Perkiraan kasar pemakaian memori satu entry (bytes)"""
+    predicted_class, confidence, probabilities = value
+    size = sys.getsizeof(key) + sys.getsizeof(predicted_class) + sys.getsizeof(confidence)
+    size += sys.getsizeof(probabilities)
+    for name, prob in probabilities:
+        size += sys.getsizeof(name) + sys.getsizeof(prob)
+    return size + 200  # overhead OrderedDict node + tuple entry
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL untuk hasil Predictor.predict_image()
+
+    Args:
+        max_entries: Jumlah entry maksimal (0 = cache nonaktif)
+        max_bytes: Batas perkiraan memori seluruh entry
+        ttl_seconds: Umur entry sebelum dianggap kadaluarsa
+        watch_paths: File yang menentukan identitas model (model, class indices)
+        model_tag: Nama backend inference yang menghasilkan prediksi
+        check_interval: Jeda minimal (detik) antar pengecekan perubahan file
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=8 * 1024 * 1024, ttl_seconds=3600,
+                 watch_paths=(), model_tag='', check_interval=1.0):
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl = float(ttl_seconds)
+        self.watch_paths = tuple(watch_paths)
+        self.model_tag = model_tag
+        self.check_interval = float(check_interval)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (model_id, expires_at, size, value)
+        self._bytes = 0
+        self._model_id = self._fingerprint()
+        self._last_check = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @property
+    def model_id(self):
+        return self._model_id
+
+    def _fingerprint(self):
+        parts = [self.model_tag]
+        for path in self.watch_paths:
+            try:
+                st = os.stat(path)
+                parts.append(f"{path}:{st.st_size}:{st.st_mtime_ns}")
+            except OSError:
+                parts.append(f"{path}:missing")
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+    def _check_model(self):
+        """Kosongkan cache kalau file model / class indices berubah"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        model_id = self._fingerprint()
+        if model_id != self._model_id:
+            self._model_id = model_id
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def get(self, key):
+        """
+        Ambil hasil prediksi dari cache
+
+        Returns:
+            Tuple (predicted_class, confidence, sorted_probabilities) atau None
+        """
+        if not self.enabled or key is None:
+            return None
+        with self._lock:
+            self._check_model()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            model_id, expires_at, size, value = entry
+            if model_id != self._model_id or expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        predicted_class, confidence, probabilities = value
+        return predicted_class, confidence, dict(probabilities)
+
+    def put(self, key, predicted_class, confidence, sorted_probabilities):
+        """Simpan hasil prediksi untuk key tertentu"""
+        if not self.enabled or key is None:
+            return
+        value = (predicted_class, confidence, tuple(sorted_probabilities.items()))
+        size = _estimate_size(key, value)
+        with self._lock:
+            self._check_model()
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (self._model_id, time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'model_id': self._model_id,
+                'model_tag': self.model_tag,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'approx_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,208 @@
+"""
+Prediksi kelas penyakit kulit: model, micro-batching dan cache hasil.
+
+Predictor dibuat tanpa app dan dikonfigurasi lewat init_app(). Model baru
+disiapkan saat pertama dipakai (prediksi pertama, warm-up, atau prepare()
+di master gunicorn), jadi proses yang tidak pernah memprediksi (script,
+perintah CLI, atau worker web yang memakai model server) tidak
+meng-import TensorFlow.
+
+- MODEL_SERVER_SOCKET di-set: ModelClient ke model_server.py, batching
+  dilakukan di model server untuk semua worker.
+- Tidak di-set: ModelRuntime + MicroBatcher di proses ini.
+"""
+import threading
+
+import numpy as np
+
+from batching import MicroBatcher
+from image_pipeline import assemble_batch
+from inference import ModelRuntime
+from model_server import ModelClient
+from prediction_cache import PredictionCache
+import probabilities as prob_codec
+
+
+class Predictor:
+    """Pemegang model (lazy), batcher dan cache hasil prediksi untuk satu proses"""
+
+    def __init__(self):
+        self.config = None
+        self.runtime = None
+        self.batcher = None
+        self.cache = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.config = app.config
+        # Cache hasil prediksi (key: hash byte upload). Otomatis dikosongkan kalau
+        # file model atau class_indices.json berubah.
+        self.cache = PredictionCache(
+            max_entries=app.config['PREDICTION_CACHE_SIZE'],
+            max_bytes=app.config['PREDICTION_CACHE_MAX_BYTES'],
+            ttl_seconds=app.config['PREDICTION_CACHE_TTL'],
+            watch_paths=(app.config['MODEL_PATH'], prob_codec.CLASS_INDICES_PATH),
+            model_tag=app.config['INFERENCE_BACKEND']
+        )
+
+    @property
+    def remote(self):
+        """Inference dijalankan model server (MODEL_SERVER_SOCKET)"""
+        return bool(self.config['MODEL_SERVER_SOCKET'])
+
+    @property
+    def max_batch_size(self):
+        return self.config['BATCH_MAX_SIZE']
+
+    def prepare(self):
+        """
+        Siapkan model runtime dan batcher (sekali per proses yang memanggil)
+
+        Dengan `preload_app`, dipanggil di master gunicorn sebelum fork;
+        backend TensorFlow sendiri tetap dibuat per worker (ModelRuntime.start).
+
+        Returns:
+            ModelRuntime, atau ModelClient kalau memakai model server
+        """
+        if self.runtime is not None:
+            return self.runtime
+        with self._lock:
+            if self.runtime is None:
+                self.runtime, self.batcher = self._create()
+        return self.runtime
+
+    def _create(self):
+        config = self.config
+        if self.remote:
+            client = ModelClient(config['MODEL_SERVER_SOCKET'],
+                                 timeout=config['MODEL_SERVER_TIMEOUT'],
+                                 max_batch_size=config['BATCH_MAX_SIZE'],
+                                 token=config['MODEL_SERVER_TOKEN'])
+            print(f"✅ Inference via model server at {config['MODEL_SERVER_SOCKET']}")
+            return client, client
+
+        print("🔄 Preparing model...")
+        model_path = config['MODEL_PATH']
+        runtime = ModelRuntime(config['INFERENCE_BACKEND'], model_path,
+                               artifact_dir=config['MODEL_ARTIFACT_DIR'],
+                               intra_op_threads=config['TF_INTRA_OP_THREADS'],
+                               inter_op_threads=config['TF_INTER_OP_THREADS'],
+                               jit_compile=config['TF_XLA_JIT'],
+                               xnnpack=config['TFLITE_XNNPACK'])
+        if runtime.prepare():
+            print(f"✅ Model prepared from {model_path} (backend: {runtime.backend_name})")
+            if runtime.artifact_status == 'converted':
+                print(f"   Converted to {runtime.artifact} in {runtime.conversion_seconds:.2f}s")
+            elif runtime.artifact_status == 'hit':
+                print(f"   Using cached artifact {runtime.artifact}")
+        else:
+            print(f"❌ Error preparing model: {runtime.error}")
+            print(f"   Pastikan file model sudah di-train dan disimpan di {model_path}")
+
+        # Scheduler batching: request bersamaan digabung jadi satu model.predict()
+        batcher = MicroBatcher(
+            runtime.predict,
+            max_batch_size=config['BATCH_MAX_SIZE'],
+            max_wait_ms=config['BATCH_MAX_WAIT_MS'],
+            assemble_fn=assemble_batch  # pixel uint8 -> buffer float32 yang dipakai ulang
+        )
+        return runtime, batcher
+
+    @property
+    def available(self):
+        """Model bisa dipakai (menyiapkan runtime kalau belum)"""
+        return self.prepare().available
+
+    def _interpret_output(self, probabilities):
+        """Output model satu gambar -> (predicted_class, confidence, probabilitas terurut)"""
+        names = prob_codec.class_names()
+        predicted_idx = int(np.argmax(probabilities))
+
+        predicted_class = names[predicted_idx]
+        confidence = float(probabilities[predicted_idx])
+
+        # Probabilitas semua kelas (diurutkan dari tertinggi)
+        all_probabilities = {name: float(probabilities[i]) for i, name in enumerate(names)}
+        sorted_probabilities = dict(sorted(all_probabilities.items(), key=lambda x: x[1], reverse=True))
+
+        return predicted_class, confidence, sorted_probabilities
+
+    def predict_image(self, pixels, cache_key=None):
+        """
+        Prediksi kelas penyakit kulit dari gambar yang sudah di-decode
+
+        Args:
+            pixels: Pixel uint8 (224, 224, 3) dari decode_upload()
+            cache_key: Hash isi gambar (DecodedImage.digest). Kalau ada di cache,
+                hasil dikembalikan tanpa menjalankan model.
+
+        Returns:
+            predicted_class: Nama kelas prediksi
+            confidence: Confidence score (probabilitas)
+            all_probabilities: Dictionary dengan probabilitas semua kelas
+        """
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if not self.available:
+            raise Exception("Model belum di-load")
+
+        # Prediksi lewat batcher (digabung dengan request lain yang bersamaan)
+        result = self._interpret_output(self.batcher.submit(pixels))
+        self.cache.put(cache_key, *result)
+        return result
+
+    def predict_images(self, pixels_list, cache_keys):
+        """
+        Seperti predict_image() untuk banyak gambar sekaligus
+
+        Gambar yang tidak ada di cache dikirim ke batcher bersamaan, jadi
+        dijalankan dalam batch sebesar BATCH_MAX_SIZE.
+
+        Returns:
+            List (predicted_class, confidence, all_probabilities), urutan sama dengan input
+        """
+        results = [self.cache.get(key) for key in cache_keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        if not self.available:
+            raise Exception("Model belum di-load")
+
+        outputs = self.batcher.submit_many([pixels_list[i] for i in missing])
+        for i, probabilities in zip(missing, outputs):
+            results[i] = self._interpret_output(probabilities)
+            self.cache.put(cache_keys[i], *results[i])
+        return results
+
+    def warm_up(self):
+        """Load model di proses ini dan jalankan warm-up untuk semua ukuran batch"""
+        runtime = self.prepare()
+        if self.remote:
+            # Model di-load dan di-warm-up oleh model server
+            status = runtime.status()
+            if status.get('error'):
+                print(f"⚠️  Model server belum siap: {status['error']}")
+            return None
+        if not runtime.available:
+            return None
+        timings = runtime.warm_up(self.config['WARMUP_BATCH_SIZES'])
+        print(f"⏱️  Time to first prediction [{runtime.load_path}]: "
+              f"{runtime.time_to_first_prediction:.2f}s "
+              f"(convert {runtime.conversion_seconds:.2f}s + load {runtime.load_seconds:.2f}s "
+              f"+ first predict {runtime.first_prediction_seconds:.2f}s)")
+        print(f"✅ Model warmed up in {runtime.warmup_seconds:.2f}s "
+              f"(batch sizes: {', '.join(str(b) for b in timings)})")
+        return timings
+
+    def status(self):
+        """Status model untuk endpoint readiness (tidak memuat model)"""
+        if self.runtime is None:
+            return {'prepared': False, 'loaded': False, 'warmed': False, 'error': None}
+        return self.runtime.status()
+
+    def stats(self):
+        """Statistik batching (None kalau model belum pernah dipakai di proses ini)"""
+        return self.batcher.stats() if self.batcher is not None else None
@@ -0,0 +1,116 @@
+"""
+Penyimpanan probabilitas prediksi dalam bentuk biner.
+
+Probabilitas semua kelas disimpan sebagai vektor float32 little-endian
+(4 byte x jumlah kelas) dengan urutan index di class_indices.json, sama
+dengan urutan output model. Nama kelas baru dipasangkan saat render
+(filter template `class_probabilities` / to_dict()).
+
+Satu halaman history di-decode sekaligus dengan np.frombuffer, tanpa
+json.loads per baris.
+
+Catatan: kalau urutan class_indices.json berubah, vektor lama ikut
+terbaca dengan urutan baru.
+"""
+import json
+
+import numpy as np
+
+CLASS_INDICES_PATH = "class_indices.json"
+DTYPE = np.dtype('<f4')
+
+_class_names = None
+
+
+def load_class_names(path=CLASS_INDICES_PATH):
+    """List nama kelas diurutkan berdasarkan index di class_indices.json"""
+    with open(path, 'r') as f:
+        class_indices = json.load(f)
+    return [name for name, _ in sorted(class_indices.items(), key=lambda item: item[1])]
+
+
+def class_names():
+    """Nama kelas (di-load sekali per proses, list kosong kalau file tidak ada)"""
+    global _class_names
+    if _class_names is None:
+        try:
+            _class_names = load_class_names()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Class indices tidak bisa di-load untuk probabilitas: {e}")
+            return []
+    return _class_names
+
+
+def encode(vector):
+    """Vektor probabilitas (urutan class index) -> bytes float32"""
+    return np.asarray(vector, dtype=DTYPE).tobytes()
+
+
+def encode_dict(probabilities, names=None):
+    """
+    Dict {nama kelas: probabilitas} -> bytes float32 urutan class index
+
+    Raises:
+        KeyError: Kalau ada kelas di class_indices yang tidak ada di dict
+    """
+    names = class_names() if names is None else names
+    return encode([probabilities[name] for name in names])
+
+
+def decode_page(blobs, num_classes=None):
+    """
+    Decode banyak vektor sekaligus
+
+    Args:
+        blobs: List bytes (atau None untuk baris tanpa probabilitas)
+        num_classes: Jumlah kelas (default: dari class_indices.json)
+
+    Returns:
+        Array float32 (N, num_classes); baris tanpa data / ukuran salah berisi NaN
+    """
+    num_classes = num_classes or len(class_names())
+    width = num_classes * DTYPE.itemsize
+    out = np.full((len(blobs), num_classes), np.nan, dtype=DTYPE)
+    valid = [i for i, blob in enumerate(blobs) if blob is not None and len(blob) == width]
+    if valid and num_classes:
+        out[valid] = np.frombuffer(b''.join(blobs[i] for i in valid), dtype=DTYPE).reshape(len(valid), num_classes)
+    return out
+
+
+def decode(blob):
+    """Satu vektor (array float32), atau None kalau tidak ada / tidak valid"""
+    vector = decode_page([blob])[0]
+    return None if np.isnan(vector).any() else vector
+
+
+def decode_rows(blobs):
+    """Seperti decode_page(), tapi per baris: array float32 atau None kalau tidak valid"""
+    vectors = decode_page(blobs)
+    invalid = np.isnan(vectors).any(axis=1)
+    return [None if bad else vector for vector, bad in zip(vectors, invalid)]
+
+
+def attach_vectors(predictions):
+    """
+    Decode kolom `probabilities` satu halaman prediksi sekaligus
+
+    Setiap objek mendapat atribut `probability_vector` (array float32, atau
+    None kalau tidak ada data) untuk dipakai template.
+    """
+    vectors = decode_rows([pred.probabilities for pred in predictions])
+    for pred, vector in zip(predictions, vectors):
+        pred.probability_vector = vector
+    return predictions
+
+
+def named_probabilities(vector, names=None):
+    """
+    Vektor -> list (nama kelas, probabilitas) diurutkan dari tertinggi
+
+    Dipakai sebagai filter template `class_probabilities`.
+    """
+    if vector is None:
+        return []
+    names = class_names() if names is None else names
+    order = np.argsort(vector)[::-1]
+    return [(names[i], float(vector[i])) for i in order if i < len(names)]
@@ -0,0 +1,56 @@
+"""
+Statistik memori proses (dipakai oleh gunicorn.conf.py dan tools/).
+
+PSS (proportional set size) menghitung halaman yang di-share antar proses
+secara proporsional, jadi lebih tepat untuk melihat efek copy-on-write
+dibanding RSS saja.
+"""
+import os
+import resource
+
+
+def _read_kb(path, keys):
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in keys:
+                    values[name] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+
+def memory_usage():
+    """
+    Pemakaian memori proses saat ini dalam MB
+
+    Returns:
+        dict dengan `rss`, `pss` dan `shared` (None kalau tidak tersedia,
+        misalnya di luar Linux)
+    """
+    status = _read_kb('/proc/self/status', {'VmRSS'})
+    rollup = _read_kb('/proc/self/smaps_rollup', {'Pss', 'Shared_Clean', 'Shared_Dirty'})
+
+    if 'VmRSS' in status:
+        rss = status['VmRSS'] / 1024.0
+    else:
+        # Fallback (macOS/BSD): peak RSS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+    pss = rollup['Pss'] / 1024.0 if 'Pss' in rollup else None
+    shared = None
+    if 'Shared_Clean' in rollup:
+        shared = (rollup['Shared_Clean'] + rollup.get('Shared_Dirty', 0)) / 1024.0
+
+    return {'pid': os.getpid(), 'rss': rss, 'pss': pss, 'shared': shared}
+
+
+def format_memory(usage):
+    parts = [f"RSS {usage['rss']:.1f} MB"]
+    if usage['pss'] is not None:
+        parts.append(f"PSS {usage['pss']:.1f} MB")
+    if usage['shared'] is not None:
+        parts.append(f"shared {usage['shared']:.1f} MB")
+    return ', '.join(parts)
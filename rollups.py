@@ -0,0 +1,217 @@
+"""
+Rollup statistik prediksi harian untuk dashboard admin.
+
+Tabel `daily_class_stats` (hari, kelas) dan `daily_user_stats` (hari, user)
+menyimpan jumlah prediksi. Keduanya di-update di transaksi yang sama dengan
+setiap insert/delete PredictionHistory lewat session (event before_flush,
+dipasang oleh init_app() dari create_app() dan create_db_app()), jadi
+dashboard cukup membaca beberapa ratus baris rollup, bukan menghitung ulang
+seluruh history.
+
+Jalur bulk yang tidak lewat session (query.delete(), bulk insert) harus
+memanggil apply_deltas() sendiri dengan hasil count_deltas().
+
+Backfill / perbaiki rollup dari data history:
+    python rollups.py --rebuild
+"""
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, event, func, insert, select, update
+from sqlalchemy.dialects import mysql, sqlite
+
+from models import db, DailyClassStat, DailyUserStat, PredictionHistory
+
+
+def count_deltas(rows, sign=1):
+    """
+    Hitung perubahan rollup dari kumpulan prediksi
+
+    Args:
+        rows: Iterable (created_at, predicted_class, user_id)
+        sign: 1 untuk insert, -1 untuk delete
+
+    Returns:
+        Tuple (class_deltas, user_deltas): Counter {(day, kelas): n} dan {(day, user_id): n}
+    """
+    class_deltas = Counter()
+    user_deltas = Counter()
+    for created_at, predicted_class, user_id in rows:
+        day = created_at.date()
+        class_deltas[(day, predicted_class)] += sign
+        user_deltas[(day, user_id)] += sign
+    return class_deltas, user_deltas
+
+
+def _upsert_counts(conn, model, key_name, deltas):
+    table = model.__table__
+    values = [{'day': day, key_name: key, 'count': n} for (day, key), n in deltas.items() if n]
+    if not values:
+        return
+
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        stmt = sqlite.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day', key_name],
+            set_={'count': table.c['count'] + stmt.excluded['count']}
+        )
+        conn.execute(stmt, values)
+    elif dialect in ('mysql', 'mariadb'):
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update(count=table.c['count'] + stmt.inserted['count'])
+        conn.execute(stmt, values)
+    else:
+        for row in values:
+            result = conn.execute(
+                update(table)
+                .where(table.c.day == row['day'], table.c[key_name] == row[key_name])
+                .values(count=table.c['count'] + row['count'])
+            )
+            if result.rowcount == 0:
+                conn.execute(insert(table).values(**row))
+
+
+def apply_deltas(conn, class_deltas, user_deltas):
+    """Tambahkan delta ke tabel rollup (di transaksi milik `conn`)"""
+    _upsert_counts(conn, DailyClassStat, 'predicted_class', class_deltas)
+    _upsert_counts(conn, DailyUserStat, 'user_id', user_deltas)
+
+
+def _track_prediction_changes(session, flush_context, instances):
+    added = [obj for obj in session.new if isinstance(obj, PredictionHistory)]
+    removed = [obj for obj in session.deleted if isinstance(obj, PredictionHistory)]
+    if not added and not removed:
+        return
+
+    for obj in added:
+        # Isi created_at sekarang supaya hari di rollup sama dengan yang tersimpan
+        if obj.created_at is None:
+            obj.created_at = datetime.utcnow()
+
+    class_deltas, user_deltas = count_deltas(
+        (obj.created_at, obj.predicted_class, obj.user_id) for obj in added
+    )
+    removed_class, removed_user = count_deltas(
+        ((obj.created_at, obj.predicted_class, obj.user_id) for obj in removed), sign=-1
+    )
+    class_deltas.update(removed_class)
+    user_deltas.update(removed_user)
+    apply_deltas(session.connection(), class_deltas, user_deltas)
+
+
+def init_app(app):
+    """
+    Pasang listener before_flush di db.session
+
+    Semua entry point yang menulis PredictionHistory lewat session harus
+    memanggil ini, kalau tidak tabel rollup diam-diam tidak ter-update.
+    Aman dipanggil berkali-kali (listener hanya dipasang sekali).
+    """
+    if not event.contains(db.session, 'before_flush', _track_prediction_changes):
+        event.listen(db.session, 'before_flush', _track_prediction_changes)
+
+
+# ============================================
+# Query untuk dashboard
+# ============================================
+
+def _since_day(days):
+    """Hari pertama dari rentang `days` hari terakhir (termasuk hari ini, UTC)"""
+    return datetime.utcnow().date() - timedelta(days=days - 1)
+
+
+def _sum_since(model, day):
+    return func.coalesce(func.sum(case((model.day >= day, model.count), else_=0)), 0)
+
+
+def prediction_totals():
+    """
+    Total prediksi: semua, 7 hari terakhir, dan hari ini
+
+    Returns:
+        Dict {'total', 'this_week', 'today'}
+    """
+    week_start = _since_day(7)
+    today = _since_day(1)
+    row = db.session.query(
+        func.coalesce(func.sum(DailyClassStat.count), 0),
+        _sum_since(DailyClassStat, week_start),
+        _sum_since(DailyClassStat, today),
+    ).one()
+    return {'total': int(row[0]), 'this_week': int(row[1]), 'today': int(row[2])}
+
+
+def top_classes(limit=5):
+    """List (kelas, jumlah) terbanyak sepanjang waktu"""
+    total = func.sum(DailyClassStat.count).label('count')
+    rows = db.session.query(DailyClassStat.predicted_class, total)\
+        .group_by(DailyClassStat.predicted_class)\
+        .having(total > 0)\
+        .order_by(total.desc())\
+        .limit(limit)\
+        .all()
+    return [(predicted_class, int(count)) for predicted_class, count in rows]
+
+
+def user_totals(user_id):
+    """
+    Total prediksi satu user: semua dan 7 hari terakhir
+
+    Returns:
+        Dict {'total', 'this_week'}
+    """
+    week_start = _since_day(7)
+    row = db.session.query(
+        func.coalesce(func.sum(DailyUserStat.count), 0),
+        _sum_since(DailyUserStat, week_start),
+    ).filter(DailyUserStat.user_id == user_id).one()
+    return {'total': int(row[0]), 'this_week': int(row[1])}
+
+
+# ============================================
+# Rebuild
+# ============================================
+
+def rebuild():
+    """
+    Hitung ulang semua rollup dari tabel prediction_history
+
+    Returns:
+        Tuple (jumlah baris daily_class_stats, jumlah baris daily_user_stats)
+    """
+    day = func.date(PredictionHistory.created_at)
+    class_rows = select(day, PredictionHistory.predicted_class, func.count())\
+        .where(PredictionHistory.created_at.isnot(None))\
+        .group_by(day, PredictionHistory.predicted_class)
+    user_rows = select(day, PredictionHistory.user_id, func.count())\
+        .where(PredictionHistory.created_at.isnot(None))\
+        .group_by(day, PredictionHistory.user_id)
+
+    with db.engine.begin() as conn:
+        conn.execute(DailyClassStat.__table__.delete())
+        conn.execute(DailyUserStat.__table__.delete())
+        conn.execute(DailyClassStat.__table__.insert().from_select(['day', 'predicted_class', 'count'], class_rows))
+        conn.execute(DailyUserStat.__table__.insert().from_select(['day', 'user_id', 'count'], user_rows))
+        class_count = conn.execute(select(func.count()).select_from(DailyClassStat.__table__)).scalar()
+        user_count = conn.execute(select(func.count()).select_from(DailyUserStat.__table__)).scalar()
+    return class_count, user_count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rollup statistik prediksi harian')
+    parser.add_argument('--rebuild', action='store_true', help='Hitung ulang rollup dari prediction_history')
+    args = parser.parse_args()
+
+    from migrations import create_db_app
+
+    with create_db_app().app_context():
+        if args.rebuild:
+            class_count, user_count = rebuild()
+            print(f"✅ Rollup dibangun ulang: {class_count} baris per kelas, {user_count} baris per user")
+        else:
+            totals = prediction_totals()
+            print(f"Total: {totals['total']}, 7 hari: {totals['this_week']}, hari ini: {totals['today']}")
+            for predicted_class, count in top_classes():
+                print(f"   {predicted_class}: {count}")
@@ -0,0 +1,190 @@
+"""
+Index pencarian untuk halaman admin (users dan predictions).
+
+Pencarian admin mencocokkan substring di username, email dan full_name.
+`LIKE '%x%'` tidak bisa memakai index biasa (full scan tabel users), jadi
+dipakai index full-text:
+
+- SQLite: tabel virtual FTS5 `users_fts` (tokenizer trigram, external
+  content dari tabel users) yang disinkronkan trigger INSERT/UPDATE/DELETE
+  di tabel users. Query trigram menemukan substring dan prefix di kolom
+  mana pun dengan lookup index.
+- MySQL: FULLTEXT index `ft_users_search` dengan parser ngram, dicari
+  dengan MATCH ... AGAINST (frasa, boolean mode). InnoDB memelihara index
+  ini sendiri.
+
+Search yang lebih pendek dari satu n-gram (1-2 karakter di SQLite trigram,
+1 karakter di MySQL dengan ngram_token_size=2) dan database tanpa index (migrasi belum jalan, SQLite
+tanpa FTS5) memakai LIKE seperti sebelumnya.
+
+Search kelas prediksi tidak butuh index full-text: nilai predicted_class
+hanya beberapa nama penyakit, jadi substring dicocokkan di Python terhadap
+daftar kelas (dari rollup harian) lalu difilter dengan `IN`, yang memakai
+index (predicted_class, user_id).
+
+Bangun ulang index dari tabel users:
+    python search_index.py --rebuild
+"""
+import argparse
+
+from sqlalchemy import column, inspect, select, table, text
+from sqlalchemy.dialects.mysql import match
+
+from models import db, DailyClassStat, User
+
+USERS_FTS = 'users_fts'
+MYSQL_FULLTEXT = 'ft_users_search'
+SEARCH_COLUMNS = ('username', 'email', 'full_name')
+
+# Panjang minimal search yang bisa dicari lewat index
+MIN_INDEXED_LENGTH = {'sqlite': 3, 'mysql': 2, 'mariadb': 2}
+
+_fts = table(USERS_FTS, column('rowid'), column(USERS_FTS))
+
+# Trigger external content FTS5: baris lama dihapus dari index dengan
+# perintah 'delete' (nilai lama harus sama persis), baris baru di-insert.
+_SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {USERS_FTS} USING fts5("
+    "username, email, full_name, content='users', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {USERS_FTS}_ai AFTER INSERT ON users BEGIN "
+    f"INSERT INTO {USERS_FTS}(rowid, username, email, full_name) "
+    "VALUES (new.id, new.username, new.email, new.full_name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {USERS_FTS}_ad AFTER DELETE ON users BEGIN "
+    f"INSERT INTO {USERS_FTS}({USERS_FTS}, rowid, username, email, full_name) "
+    "VALUES ('delete', old.id, old.username, old.email, old.full_name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {USERS_FTS}_au AFTER UPDATE OF username, email, full_name ON users BEGIN "
+    f"INSERT INTO {USERS_FTS}({USERS_FTS}, rowid, username, email, full_name) "
+    "VALUES ('delete', old.id, old.username, old.email, old.full_name); "
+    f"INSERT INTO {USERS_FTS}(rowid, username, email, full_name) "
+    "VALUES (new.id, new.username, new.email, new.full_name); END",
+]
+
+_available = {}
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def install():
+    """
+    Buat index pencarian users (dan trigger sinkronisasi di SQLite), lalu isi
+
+    Returns:
+        True kalau index tersedia, False kalau database tidak mendukung
+    """
+    dialect = _dialect()
+    _available.pop(str(db.engine.url), None)
+
+    if dialect == 'sqlite':
+        try:
+            with db.engine.begin() as conn:
+                for statement in _SQLITE_DDL:
+                    conn.execute(text(statement))
+        except Exception as e:
+            print(f"⚠️  FTS5 trigram tidak tersedia di SQLite ini, search admin tetap memakai LIKE: {e}")
+            return False
+        rebuild()
+        return True
+
+    if dialect in ('mysql', 'mariadb'):
+        existing = {index['name'] for index in inspect(db.engine).get_indexes('users')}
+        if MYSQL_FULLTEXT not in existing:
+            with db.engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE users ADD FULLTEXT INDEX {MYSQL_FULLTEXT} "
+                    f"({', '.join(SEARCH_COLUMNS)}) WITH PARSER ngram"
+                ))
+        return True
+
+    print(f"⚠️  Index pencarian belum didukung untuk {dialect}, search admin memakai LIKE")
+    return False
+
+
+def rebuild():
+    """Isi ulang index pencarian dari tabel users"""
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        with db.engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {USERS_FTS}({USERS_FTS}) VALUES ('rebuild')"))
+    elif dialect in ('mysql', 'mariadb'):
+        with db.engine.begin() as conn:
+            conn.execute(text('OPTIMIZE TABLE users'))
+
+
+def is_available():
+    """Apakah index pencarian sudah ada (dicek sekali per proses per database)"""
+    key = str(db.engine.url)
+    if key not in _available:
+        dialect = _dialect()
+        if dialect == 'sqlite':
+            _available[key] = inspect(db.engine).has_table(USERS_FTS)
+        elif dialect in ('mysql', 'mariadb'):
+            existing = {index['name'] for index in inspect(db.engine).get_indexes('users')}
+            _available[key] = MYSQL_FULLTEXT in existing
+        else:
+            _available[key] = False
+    return _available[key]
+
+
+def _quote_phrase(search, dialect):
+    # Seluruh search dicari sebagai satu frasa (substring), bukan sintaks query.
+    # FTS5 meng-escape " dengan "", boolean mode MySQL tidak punya escape.
+    if dialect == 'sqlite':
+        return '"' + search.replace('"', '""') + '"'
+    return '"' + search.replace('"', ' ') + '"'
+
+
+def like_condition(search):
+    """Kondisi LIKE '%search%' di username/email/full_name (jalur tanpa index)"""
+    return (
+        (User.username.contains(search)) |
+        (User.email.contains(search)) |
+        (User.full_name.contains(search))
+    )
+
+
+def user_condition(search):
+    """
+    Kondisi SQL untuk User yang username, email, atau full_name-nya
+    mengandung `search`
+
+    Memakai index full-text kalau tersedia dan search cukup panjang,
+    selain itu LIKE.
+    """
+    dialect = _dialect()
+    min_length = MIN_INDEXED_LENGTH.get(dialect)
+    if min_length is None or len(search) < min_length or not is_available():
+        return like_condition(search)
+
+    phrase = _quote_phrase(search, dialect)
+    if dialect == 'sqlite':
+        return User.id.in_(select(_fts.c.rowid).where(_fts.c[USERS_FTS].op('MATCH')(phrase)))
+    return match(User.username, User.email, User.full_name, against=phrase).in_boolean_mode()
+
+
+def matching_classes(search):
+    """
+    Nama kelas (yang pernah diprediksi) yang mengandung `search`, case-insensitive
+
+    Daftar kelas diambil dari rollup harian (beberapa ratus baris), bukan
+    dari prediction_history.
+    """
+    needle = search.lower()
+    classes = db.session.query(DailyClassStat.predicted_class).distinct()
+    return sorted(name for name, in classes if name and needle in name.lower())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Index pencarian admin')
+    parser.add_argument('--rebuild', action='store_true', help='Buat / isi ulang index dari tabel users')
+    args = parser.parse_args()
+
+    from migrations import create_db_app
+
+    with create_db_app().app_context():
+        if args.rebuild:
+            if install():
+                print('✅ Index pencarian users dibangun ulang')
+        else:
+            print(f"Index pencarian: {'tersedia' if is_available() else 'tidak tersedia (LIKE)'} ({_dialect()})")
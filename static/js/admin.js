@@ -6,4 +6,109 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log('Admin panel loaded');
 });
 
+// ============================================
+// Bulk operations
+// ============================================
 
+// ID dari checkbox yang dicentang (value = id)
+function getSelectedIds(selector) {
+    return Array.from(document.querySelectorAll(selector + ':checked'))
+        .map(checkbox => parseInt(checkbox.value, 10));
+}
+
+// Checkbox "pilih semua"
+function toggleSelectAll(source, selector) {
+    document.querySelectorAll(selector).forEach(checkbox => {
+        checkbox.checked = source.checked;
+    });
+}
+
+function showBulkProgress(statusEl, progress) {
+    if (!statusEl) {
+        return;
+    }
+    statusEl.hidden = false;
+    const bar = statusEl.querySelector('progress');
+    const label = statusEl.querySelector('.bulk-progress-label');
+    if (bar) {
+        bar.max = Math.max(progress.total || 0, 1);
+        bar.value = progress.done || 0;
+    }
+    if (label) {
+        let text = `${progress.done || 0} / ${progress.total || 0}`;
+        if (progress.predictions_deleted !== undefined) {
+            text += ` (${progress.predictions_deleted} prediksi)`;
+        }
+        label.textContent = progress.message || progress.error || text;
+    }
+}
+
+// POST operasi bulk; response berupa NDJSON progress, baris terakhir berisi
+// success/message atau error. Resolve dengan baris terakhir.
+function runBulkOperation(url, payload, statusEl) {
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(payload)
+    })
+    .then(response => {
+        if (!response.ok) {
+            return response.json().then(data => {
+                throw new Error(data.error || response.statusText);
+            });
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let last = null;
+
+        const handleLine = line => {
+            if (!line.trim()) {
+                return;
+            }
+            last = JSON.parse(line);
+            showBulkProgress(statusEl, last);
+        };
+
+        const read = () => reader.read().then(({ done, value }) => {
+            if (value) {
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(handleLine);
+            }
+            if (!done) {
+                return read();
+            }
+            handleLine(buffer);
+            if (!last) {
+                throw new Error('Response kosong');
+            }
+            if (last.error) {
+                throw new Error(last.error);
+            }
+            return last;
+        });
+        return read();
+    });
+}
+
+// Jalankan operasi bulk setelah konfirmasi, lalu reload halaman
+function confirmBulkOperation(message, url, payload, statusEl) {
+    if (!confirm(message)) {
+        return;
+    }
+    runBulkOperation(url, payload, statusEl)
+    .then(result => {
+        alert(result.message);
+        location.reload();
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Error: ' + error.message);
+        location.reload();
+    });
+}
@@ -35,3 +35,74 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 });
+
+/* Prediksi asynchronous (job) */
+// Kirim gambar ke /api/predict/jobs lalu polling status job sampai selesai.
+// Kalau server mengaktifkan SSE (JOB_EVENTS=1, response berisi events_url),
+// status diterima lewat Server-Sent Events. Resolve dengan data hasil
+// prediksi (format sama dengan /api/predict).
+function predictAsync(file, onStatus) {
+    const formData = new FormData();
+    formData.append('file', file);
+
+    return fetch('/api/predict/jobs', {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json().then(data => {
+        if (!response.ok || data.error) {
+            throw new Error(data.error || response.statusText);
+        }
+        return data;
+    }))
+    .then(job => new Promise((resolve, reject) => {
+        if (onStatus) onStatus(job);
+
+        const finish = data => {
+            if (data.status === 'done') {
+                resolve(data);
+            } else {
+                reject(new Error(data.error || 'Prediksi gagal'));
+            }
+        };
+
+        const poll = () => {
+            fetch(job.status_url)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.status === 'done' || data.status === 'failed') {
+                        finish(data);
+                        return;
+                    }
+                    if (onStatus) onStatus(data);
+                    setTimeout(poll, 1000);
+                })
+                .catch(reject);
+        };
+
+        if (!job.events_url || !window.EventSource) {
+            poll();
+            return;
+        }
+
+        const source = new EventSource(job.events_url);
+        source.addEventListener('status', e => {
+            if (onStatus) onStatus(JSON.parse(e.data));
+        });
+        source.addEventListener('result', e => {
+            source.close();
+            finish(JSON.parse(e.data));
+        });
+        source.addEventListener('failed', e => {
+            source.close();
+            finish(JSON.parse(e.data));
+        });
+        source.onerror = () => {
+            // Server menutup stream secara berkala dan browser menyambung ulang;
+            // hanya kalau koneksi benar-benar ditutup, lanjut dengan polling
+            if (source.readyState === EventSource.CLOSED) {
+                poll();
+            }
+        };
+    }));
+}
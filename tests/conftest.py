@@ -0,0 +1,42 @@
+"""
+Fixture bersama: app database minimal (tanpa TensorFlow) di file SQLite sementara.
+"""
+from datetime import datetime
+
+import pytest
+
+from migrations import create_db_app, upgrade
+from models import db, PredictionHistory, User
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App dari migrations.create_db_app() dengan schema versi terbaru"""
+    app = create_db_app(f"sqlite:///{tmp_path / 'test.db'}")
+    with app.app_context():
+        upgrade()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(username='alice', role='user'):
+        user = User(username=username, email=f'{username}@example.com', role=role)
+        user.set_password('secret1')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_prediction(app):
+    def make(user, predicted_class='Melanoma', created_at=None, confidence=0.9):
+        prediction = PredictionHistory(user_id=user.id, predicted_class=predicted_class,
+                                       confidence=confidence, created_at=created_at or datetime.utcnow())
+        db.session.add(prediction)
+        db.session.commit()
+        return prediction
+    return make
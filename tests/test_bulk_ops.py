@@ -0,0 +1,73 @@
+from datetime import date, datetime
+
+import pytest
+
+import bulk_ops
+from models import db, DailyClassStat, PredictionHistory, User
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'ids': []}, {'predicted_class': ''}, {'older_than': None, 'user_id': None}])
+def test_prediction_conditions_requires_a_criterion(kwargs):
+    # Body kosong tidak boleh berarti "hapus semua prediksi"
+    with pytest.raises(ValueError):
+        bulk_ops.prediction_conditions(**kwargs)
+
+
+def test_prediction_conditions_rejects_invalid_date():
+    with pytest.raises(ValueError, match='YYYY-MM-DD'):
+        bulk_ops.prediction_conditions(older_than='17-01-2024')
+
+
+def test_prediction_conditions_combines_filters(make_user, make_prediction):
+    alice, bob = make_user('alice'), make_user('bob')
+    old = make_prediction(alice, 'Melanoma', created_at=datetime(2023, 12, 31))
+    make_prediction(alice, 'Melanoma', created_at=datetime(2024, 1, 2))
+    make_prediction(alice, 'Dermatofibroma', created_at=datetime(2023, 12, 1))
+    make_prediction(bob, 'Melanoma', created_at=datetime(2023, 12, 1))
+
+    conditions = bulk_ops.prediction_conditions(predicted_class='Melanoma', older_than='2024-01-01', user_id=alice.id)
+    assert [p.id for p in PredictionHistory.query.filter(*conditions)] == [old.id]
+    assert bulk_ops.count_predictions(conditions) == 1
+
+
+@pytest.mark.parametrize('values, expected', [(None, []), ([3, '1', 3, 2], [1, 2, 3])])
+def test_parse_ids(values, expected):
+    assert bulk_ops.parse_ids(values) == expected
+
+
+@pytest.mark.parametrize('value', [0, -1, True, 'abc', 1.5j])
+def test_parse_ids_rejects_invalid(value):
+    with pytest.raises((ValueError, TypeError)):
+        bulk_ops.parse_ids([value])
+
+
+def test_delete_predictions_in_chunks_updates_rollups(make_user, make_prediction):
+    user = make_user()
+    for hour in range(5):
+        make_prediction(user, 'Melanoma', created_at=datetime(2024, 2, 1, hour))
+    keep = make_prediction(user, 'Dermatofibroma', created_at=datetime(2024, 2, 1))
+
+    progress = list(bulk_ops.delete_predictions(bulk_ops.prediction_conditions(predicted_class='Melanoma'),
+                                                chunk_size=2))
+    assert progress[0] == {'done': 0, 'total': 5}
+    assert progress[-1] == {'done': 5, 'total': 5}
+    assert [p.id for p in PredictionHistory.query.all()] == [keep.id]
+    counts = {row.predicted_class: row.count for row in DailyClassStat.query.filter_by(day=date(2024, 2, 1))}
+    assert counts == {'Melanoma': 0, 'Dermatofibroma': 1}
+
+
+def test_delete_users_removes_their_predictions(make_user, make_prediction):
+    alice, bob = make_user('alice'), make_user('bob')
+    make_prediction(alice)
+    make_prediction(bob)
+
+    progress = list(bulk_ops.delete_users([alice.id]))
+    assert progress[-1] == {'done': 1, 'total': 1, 'predictions_deleted': 1}
+    db.session.expire_all()
+    assert [u.username for u in User.query.all()] == ['bob']
+    assert [p.user_id for p in PredictionHistory.query.all()] == [bob.id]
+
+
+def test_set_role_rejects_unknown_role():
+    with pytest.raises(ValueError):
+        list(bulk_ops.set_role([1], 'root'))
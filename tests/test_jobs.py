@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from jobs import DONE, FAILED, QUEUED, RUNNING, JobPool, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs'))
+
+
+def test_store_is_created_on_first_use(store):
+    assert not os.path.exists(store.directory)
+    assert store.pending_count() == 0
+    assert os.path.exists(store.path)
+
+
+def test_claim_takes_oldest_queued_job(store):
+    first = store.enqueue(1, store.spool(b'first'))
+    second = store.enqueue(1, store.spool(b'second'))
+    assert store.position(store.get(second)) == 1
+
+    job = store.claim(stale_after=60, max_attempts=2)
+    assert (job.id, job.status, job.attempts) == (first, RUNNING, 1)
+    assert store.claim(stale_after=60, max_attempts=2).id == second
+    assert store.claim(stale_after=60, max_attempts=2) is None
+
+    store.finish(first, {'predicted_class': 'Melanoma'})
+    job = store.get(first)
+    assert job.finished and job.result == {'predicted_class': 'Melanoma'}
+    assert store.counts() == {DONE: 1, RUNNING: 1}
+
+
+def test_stale_job_is_reclaimed_then_failed(store):
+    job_id = store.enqueue(1, store.spool(b'data'))
+    assert store.claim(stale_after=0.01, max_attempts=2).attempts == 1
+    time.sleep(0.02)
+
+    # Worker yang mengambil job berhenti: job diambil ulang sekali lagi
+    assert store.claim(stale_after=0.01, max_attempts=2).attempts == 2
+    time.sleep(0.02)
+
+    assert store.claim(stale_after=0.01, max_attempts=2) is None
+    job = store.get(job_id)
+    assert job.status == FAILED and 'worker berhenti' in job.error
+
+
+def test_job_with_heartbeat_is_not_reclaimed(store):
+    job_id = store.enqueue(1, store.spool(b'data'))
+    store.claim(stale_after=0.05, max_attempts=2)
+    time.sleep(0.06)
+    store.heartbeat([job_id])
+
+    assert store.claim(stale_after=0.05, max_attempts=2) is None
+    assert store.get(job_id).status == RUNNING
+
+
+def test_heartbeat_column_is_added_to_old_database(tmp_path):
+    directory = tmp_path / 'jobs'
+    directory.mkdir()
+    conn = sqlite3.connect(directory / 'jobs.db')
+    conn.execute(
+        'CREATE TABLE jobs (id TEXT PRIMARY KEY, user_id INTEGER NOT NULL, status TEXT NOT NULL, '
+        'upload_path TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, '
+        'created_at REAL NOT NULL, started_at REAL, finished_at REAL)'
+    )
+    conn.execute("INSERT INTO jobs VALUES ('old', 1, 'running', 'x', NULL, NULL, 1, 0, 0, NULL)")
+    conn.commit()
+    conn.close()
+
+    store = JobStore(str(directory))
+    # Job running dari versi lama (tanpa heartbeat) memakai started_at
+    job = store.claim(stale_after=60, max_attempts=2)
+    assert (job.id, job.attempts) == ('old', 2) and job.heartbeat_at is not None
+
+
+def test_pool_keeps_slow_job_alive(store):
+    started = threading.Event()
+
+    def process(job, data):
+        started.set()
+        time.sleep(0.5)
+        return {'attempts': job.attempts}
+
+    pool = JobPool(store, process_fn=process, workers=1, stale_after=0.1, poll_interval=0.05)
+    try:
+        job_id = pool.submit(1, b'data')
+        assert started.wait(5)
+        time.sleep(0.3)
+        # Worker lain tidak boleh mengambil ulang job yang masih dikerjakan
+        assert store.claim(stale_after=0.1, max_attempts=2) is None
+        deadline = time.monotonic() + 5
+        while not store.get(job_id).finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        pool.stop()
+
+    job = store.get(job_id)
+    assert (job.status, job.result, job.attempts) == (DONE, {'attempts': 1}, 1)
+
+
+def test_purge_removes_finished_jobs_and_uploads(store):
+    upload = store.spool(b'data')
+    job_id = store.enqueue(1, upload)
+    store.fail(job_id, 'error')
+    queued = store.enqueue(1, store.spool(b'other'))
+
+    assert store.purge(older_than=-1) == 1
+    assert store.get(job_id) is None and not os.path.exists(upload)
+    assert store.get(queued).status == QUEUED
+
+
+def test_pool_runs_jobs(store):
+    pool = JobPool(store, process_fn=lambda job, data: {'size': len(data)}, workers=1, poll_interval=0.05)
+    try:
+        job_id = pool.submit(1, b'12345')
+        deadline = time.monotonic() + 5
+        while not store.get(job_id).finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        pool.stop()
+
+    job = store.get(job_id)
+    assert (job.status, job.result) == (DONE, {'size': 5})
+    assert not os.path.exists(job.upload_path)
+
+
+def test_pool_rejects_when_full(store):
+    pool = JobPool(store, max_pending=1)
+    pool.start = lambda: None  # tanpa worker, job tetap queued
+    assert pool.submit(1, b'a') is not None
+    assert pool.submit(1, b'b') is None
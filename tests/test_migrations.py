@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from sqlalchemy import inspect, text
+
+import probabilities as prob_codec
+import rollups
+from migrations import MIGRATIONS, create_db_app, current_version, upgrade
+from models import db, PredictionHistory
+
+# Schema sebelum migrasi berversi: tanpa users.role, image_hash, probabilities
+LEGACY_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL UNIQUE, email VARCHAR(120) NOT NULL UNIQUE,
+        password_hash VARCHAR(255) NOT NULL, full_name VARCHAR(100), phone VARCHAR(20),
+        created_at DATETIME, updated_at DATETIME)""",
+    """CREATE TABLE prediction_history (
+        id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users(id),
+        predicted_class VARCHAR(100) NOT NULL, confidence FLOAT NOT NULL, image_path VARCHAR(255),
+        image_base64 TEXT, all_probabilities TEXT, created_at DATETIME)""",
+]
+
+
+@pytest.fixture
+def empty_app(tmp_path):
+    app = create_db_app(f"sqlite:///{tmp_path / 'test.db'}")
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_upgrade_runs_every_migration_once(empty_app):
+    assert upgrade() == [name for _, name, _ in MIGRATIONS]
+    assert current_version() == MIGRATIONS[-1][0]
+    assert upgrade() == []
+
+
+def test_migrations_are_idempotent(empty_app):
+    upgrade()
+    for _, _, migrate in MIGRATIONS:
+        migrate()
+    assert current_version() == MIGRATIONS[-1][0]
+
+
+def test_upgrade_legacy_database(empty_app):
+    names = prob_codec.load_class_names()
+    legacy_json = json.dumps({name: i / 100 for i, name in enumerate(names)})
+    with db.engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users (id, username, email, password_hash) VALUES (1, 'old', 'old@x.com', 'x')"))
+        conn.execute(text(
+            "INSERT INTO prediction_history (user_id, predicted_class, confidence, all_probabilities, created_at) "
+            "VALUES (1, 'Melanoma', 0.9, :ok, '2024-01-01 10:00:00'), "
+            "(1, 'Melanoma', 0.9, :bad, '2024-01-02 10:00:00')"
+        ), {'ok': legacy_json, 'bad': json.dumps({'Unknown': 1.0})})
+
+    upgrade()
+
+    assert {'role'} <= {col['name'] for col in inspect(db.engine).get_columns('users')}
+    assert {'image_hash', 'probabilities'} <= {col['name'] for col in inspect(db.engine).get_columns('prediction_history')}
+    converted, skipped = PredictionHistory.query.order_by(PredictionHistory.id).all()
+    assert prob_codec.decode(converted.probabilities).tolist() == pytest.approx([i / 100 for i in range(len(names))])
+    assert skipped.probabilities is None
+    # Rollup diisi dari history yang sudah ada (migration 005)
+    assert rollups.prediction_totals()['total'] == 2
@@ -0,0 +1,153 @@
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import model_server
+from model_server import ModelClient, ModelServer, ModelServerError
+
+IMAGE_SHAPE = (2, 2, 3)
+
+
+class FakeRuntime:
+    def status(self):
+        return {'loaded': True, 'warmed': True}
+
+
+class FakeBatcher:
+    """Probabilitas = rata-rata pixel per channel, jadi hasilnya bisa dicek"""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = 0
+
+    def submit_many(self, arrays, timeout=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [a.reshape(-1, a.shape[-1]).mean(axis=0) for a in arrays]
+
+    def stats(self):
+        return {'calls': self.calls}
+
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def serve(batcher=None, token=None):
+        server = ModelServer(str(tmp_path / 'model.sock'), FakeRuntime(), batcher or FakeBatcher(),
+                             image_shape=IMAGE_SHAPE, token=token)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('/tmp/model.sock', (socket.AF_UNIX, '/tmp/model.sock')),
+    ('127.0.0.1:7000', (socket.AF_INET, ('127.0.0.1', 7000))),
+    (':7000', (socket.AF_INET, ('127.0.0.1', 7000))),
+    ('./run/model:7000', (socket.AF_UNIX, './run/model:7000')),
+])
+def test_parse_address(address, expected):
+    assert model_server.parse_address(address) == expected
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('/tmp/model.sock', True), ('127.0.0.1:7000', True), ('localhost:7000', True),
+    ('0.0.0.0:7000', False), ('10.0.0.5:7000', False), ('model-host:7000', False),
+])
+def test_is_loopback(address, expected):
+    assert model_server.is_loopback(address) is expected
+
+
+def test_header_round_trip():
+    header = model_server._REQUEST.pack(model_server.MAGIC, model_server.OP_PREDICT, 3, 224, 224, 3)
+    assert len(header) == model_server._REQUEST.size
+    assert model_server._REQUEST.unpack(header) == (model_server.MAGIC, model_server.OP_PREDICT, 3, 224, 224, 3)
+
+
+def test_recv_exact_reads_across_partial_sends():
+    left, right = socket.socketpair()
+    with left, right:
+        left.sendall(b'ab')
+        threading.Timer(0.05, left.sendall, args=(b'cd',)).start()
+        assert model_server._recv_exact(right, 4) == b'abcd'
+
+
+def test_recv_exact_raises_on_eof():
+    left, right = socket.socketpair()
+    with right:
+        left.sendall(b'ab')
+        left.close()
+        with pytest.raises(model_server._ConnectionClosed):
+            model_server._recv_exact(right, 4)
+
+
+def test_predict_and_status_round_trip(serve):
+    server = serve()
+    client = ModelClient(server.server_address, timeout=5)
+    batch = np.arange(2 * 12, dtype=np.uint8).reshape((2,) + IMAGE_SHAPE)
+
+    outputs = client.predict(batch)
+    assert outputs.dtype == np.float32
+    np.testing.assert_allclose(outputs, batch.reshape(2, -1, 3).mean(axis=1))
+    np.testing.assert_allclose(client.submit(batch[0]), outputs[0])
+
+    status = client.status()
+    assert status['loaded'] and status['warmed']
+    assert client.stats()['calls'] == 2
+
+
+def test_invalid_shape_returns_error(serve):
+    client = ModelClient(serve().server_address, timeout=5)
+    with pytest.raises(ModelServerError, match='Request tidak valid'):
+        client.predict(np.zeros((1, 4, 4, 3), dtype=np.uint8))
+    # Koneksi ditutup server, request berikutnya memakai koneksi baru
+    assert client.predict(np.zeros((1,) + IMAGE_SHAPE, dtype=np.uint8)).shape == (1, 3)
+
+
+def test_token_is_required(serve):
+    address = serve(token='s3cret').server_address
+    assert 'error' not in ModelClient(address, timeout=5, token='s3cret').status()
+    assert 'Autentikasi diperlukan' in ModelClient(address, timeout=5).status()['error']
+    assert 'Token model server salah' in ModelClient(address, timeout=5, token='wrong').status()['error']
+
+
+def test_public_bind_without_token_is_refused():
+    with pytest.raises(ValueError, match='MODEL_SERVER_TOKEN'):
+        ModelServer('0.0.0.0:0', FakeRuntime(), FakeBatcher())
+
+
+def test_timeout_is_not_retried(serve):
+    batcher = FakeBatcher(delay=0.5)
+    client = ModelClient(serve(batcher).server_address, timeout=0.1)
+    with pytest.raises(ModelServerError, match='tidak merespons'):
+        client.predict(np.zeros((1,) + IMAGE_SHAPE, dtype=np.uint8))
+    time.sleep(0.6)
+    assert batcher.calls == 1
+
+
+def test_stale_connection_is_retried(serve):
+    client = ModelClient(serve().server_address, timeout=5)
+    client.status()
+
+    # Koneksi yang sudah diputus pihak server (mis. model server restart)
+    stale, peer = socket.socketpair()
+    peer.close()
+    client._local.sock.close()
+    client._local.sock = stale
+    assert 'error' not in client.status()
+    assert client._local.sock is not stale
+
+
+def test_fresh_connection_failure_is_not_retried(tmp_path):
+    client = ModelClient(str(tmp_path / 'missing.sock'), timeout=1)
+    with pytest.raises(ModelServerError, match='tidak bisa dihubungi'):
+        client.server_status()
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from models import db, PredictionHistory, User
+from pagination import NumberedPage, decode_cursor, encode_cursor, keyset_paginate, rows_since
+
+
+def _paginated(page, pages, items=(), total=0):
+    return SimpleNamespace(items=list(items), total=total, page=page, pages=pages)
+
+
+def test_numbered_page_empty_result_has_one_page():
+    page = NumberedPage(_paginated(page=1, pages=0))
+    assert page.pages == 1
+    assert not page.has_prev and not page.has_next
+    assert page.prev_num is None and page.next_num is None
+
+
+def test_numbered_page_middle_page():
+    page = NumberedPage(_paginated(page=2, pages=3, items=['x'], total=25))
+    assert (page.has_prev, page.has_next) == (True, True)
+    assert (page.prev_num, page.next_num) == (1, 3)
+    assert page.items == ['x'] and page.total == 25
+
+
+def test_numbered_page_last_page():
+    page = NumberedPage(_paginated(page=3, pages=3))
+    assert page.has_prev and not page.has_next
+    assert page.next_num is None
+
+
+def test_numbered_page_wraps_flask_sqlalchemy_paginate(app):
+    page = NumberedPage(User.query.order_by(User.id).paginate(page=1, per_page=10, error_out=False))
+    assert page.items == []
+    assert page.pages == 1
+
+
+# ============================================
+# Keyset (cursor) pagination
+# ============================================
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 8, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', [
+    None,
+    '',
+    'not-base64!!',
+    'bm9zZXBhcmF0b3I',  # "noseparator"
+    encode_cursor(datetime(2024, 1, 1), 1)[:-3],
+])
+def test_decode_invalid_cursor_returns_none(cursor):
+    assert decode_cursor(cursor) is None
+
+
+@pytest.fixture
+def history(make_user, make_prediction):
+    """Tujuh prediksi; tiga di antaranya dengan created_at yang sama (tie dipecah oleh id)"""
+    user = make_user()
+    base = datetime(2024, 1, 1)
+    times = [base + timedelta(minutes=i) for i in range(4)] + [base + timedelta(minutes=10)] * 3
+    rows = [make_prediction(user, created_at=t) for t in times]
+    # Urutan halaman: created_at DESC, id DESC
+    expected = sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)
+    return PredictionHistory.query.filter_by(user_id=user.id), [row.id for row in expected]
+
+
+def test_keyset_walks_forward_without_gaps(history):
+    query, expected = history
+    seen, after = [], None
+    while True:
+        page = keyset_paginate(query, PredictionHistory, 3, after=after)
+        seen.extend(row.id for row in page.items)
+        if not page.has_next:
+            break
+        after = page.next_cursor
+    assert seen == expected
+
+
+def test_keyset_before_returns_previous_page(history):
+    query, expected = history
+    first = keyset_paginate(query, PredictionHistory, 3)
+    second = keyset_paginate(query, PredictionHistory, 3, after=first.next_cursor)
+    assert second.has_prev
+
+    back = keyset_paginate(query, PredictionHistory, 3, before=second.prev_cursor)
+    assert [row.id for row in back.items] == expected[:3]
+    assert not back.has_prev and back.has_next
+
+
+def test_rows_since_returns_rows_right_after_cursor(history):
+    query, expected = history
+    oldest = db.session.get(PredictionHistory, expected[-1])
+    items, has_more = rows_since(query, PredictionHistory, encode_cursor(oldest.created_at, oldest.id), 2)
+    assert [row.id for row in items] == expected[-3:-1]
+    assert has_more
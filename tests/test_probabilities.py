@@ -0,0 +1,64 @@
+import struct
+
+import numpy as np
+import pytest
+
+import probabilities as prob_codec
+
+NAMES = ['a', 'b', 'c']
+
+
+def test_load_class_names_sorted_by_index(tmp_path):
+    path = tmp_path / 'class_indices.json'
+    path.write_text('{"b": 1, "c": 2, "a": 0}')
+    assert prob_codec.load_class_names(str(path)) == NAMES
+
+
+def test_encode_is_float32_little_endian():
+    assert prob_codec.encode([0.5, 0.25, 0.25]) == struct.pack('<3f', 0.5, 0.25, 0.25)
+
+
+def test_encode_dict_round_trip_uses_class_order():
+    blob = prob_codec.encode_dict({'c': 0.1, 'a': 0.7, 'b': 0.2}, NAMES)
+    vector = prob_codec.decode_page([blob], num_classes=3)[0]
+    assert vector.dtype == np.float32
+    assert vector.tolist() == pytest.approx([0.7, 0.2, 0.1])
+
+
+def test_encode_dict_missing_class_raises():
+    with pytest.raises(KeyError):
+        prob_codec.encode_dict({'a': 1.0}, NAMES)
+
+
+def test_decode_page_marks_missing_and_wrong_size_rows_nan():
+    good = prob_codec.encode([0.1, 0.2, 0.7])
+    out = prob_codec.decode_page([good, None, good[:8], good], num_classes=3)
+    assert out.shape == (4, 3)
+    assert np.isnan(out[1]).all() and np.isnan(out[2]).all()
+    assert out[0].tolist() == out[3].tolist() == pytest.approx([0.1, 0.2, 0.7])
+
+
+def test_decode_uses_class_indices_width():
+    width = len(prob_codec.class_names())
+    vector = np.linspace(0, 1, width, dtype=np.float32)
+    assert prob_codec.decode(prob_codec.encode(vector)).tolist() == vector.tolist()
+    assert prob_codec.decode(prob_codec.encode(vector[:-1])) is None
+    assert prob_codec.decode_rows([None, prob_codec.encode(vector)])[0] is None
+
+
+def test_decode_page_empty():
+    assert prob_codec.decode_page([], num_classes=3).shape == (0, 3)
+
+
+def test_named_probabilities_sorted_descending():
+    vector = np.array([0.1, 0.7, 0.2], dtype=np.float32)
+    named = prob_codec.named_probabilities(vector, NAMES)
+    assert [name for name, _ in named] == ['b', 'c', 'a']
+    assert named[0][1] == pytest.approx(0.7)
+    assert prob_codec.named_probabilities(None, NAMES) == []
+
+
+def test_named_probabilities_ignores_indices_without_name():
+    # Vektor lama dengan kelas lebih banyak dari class_indices.json sekarang
+    vector = np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32)
+    assert [name for name, _ in prob_codec.named_probabilities(vector, NAMES)] == ['c', 'b', 'a']
@@ -0,0 +1,71 @@
+from datetime import date, datetime
+
+import rollups
+from models import db, DailyClassStat, DailyUserStat
+
+
+def _class_counts():
+    return {(row.day, row.predicted_class): row.count for row in DailyClassStat.query.all()}
+
+
+def _user_counts():
+    return {(row.day, row.user_id): row.count for row in DailyUserStat.query.all()}
+
+
+def test_count_deltas_groups_by_day():
+    rows = [
+        (datetime(2024, 1, 1, 9), 'Melanoma', 1),
+        (datetime(2024, 1, 1, 23, 59), 'Melanoma', 2),
+        (datetime(2024, 1, 2, 0, 1), 'Dermatofibroma', 1),
+    ]
+    class_deltas, user_deltas = rollups.count_deltas(rows)
+    assert class_deltas == {(date(2024, 1, 1), 'Melanoma'): 2, (date(2024, 1, 2), 'Dermatofibroma'): 1}
+    assert user_deltas == {(date(2024, 1, 1), 1): 1, (date(2024, 1, 1), 2): 1, (date(2024, 1, 2), 1): 1}
+
+
+def test_count_deltas_negative_sign():
+    class_deltas, user_deltas = rollups.count_deltas([(datetime(2024, 1, 1), 'Melanoma', 7)], sign=-1)
+    assert class_deltas == {(date(2024, 1, 1), 'Melanoma'): -1}
+    assert user_deltas == {(date(2024, 1, 1), 7): -1}
+
+
+def test_apply_deltas_upserts_and_accumulates(app):
+    day = date(2024, 1, 1)
+    with db.engine.begin() as conn:
+        rollups.apply_deltas(conn, {(day, 'Melanoma'): 2}, {(day, 1): 2})
+    with db.engine.begin() as conn:
+        # Delta 0 dilewati, delta negatif mengurangi baris yang sudah ada
+        rollups.apply_deltas(conn, {(day, 'Melanoma'): -1, (day, 'Dermatofibroma'): 0}, {(day, 1): -1})
+    assert _class_counts() == {(day, 'Melanoma'): 1}
+    assert _user_counts() == {(day, 1): 1}
+
+
+def test_session_listener_tracks_insert_and_delete(make_user, make_prediction):
+    user = make_user()
+    first = make_prediction(user, 'Melanoma', created_at=datetime(2024, 3, 5, 12))
+    make_prediction(user, 'Melanoma', created_at=datetime(2024, 3, 5, 13))
+    assert _class_counts() == {(date(2024, 3, 5), 'Melanoma'): 2}
+
+    db.session.delete(first)
+    db.session.commit()
+    assert _class_counts() == {(date(2024, 3, 5), 'Melanoma'): 1}
+    assert _user_counts() == {(date(2024, 3, 5), user.id): 1}
+
+
+def test_init_app_registers_listener_once(app, make_user, make_prediction):
+    rollups.init_app(app)
+    rollups.init_app(app)
+    make_prediction(make_user(), 'Melanoma', created_at=datetime(2024, 3, 5))
+    assert _class_counts() == {(date(2024, 3, 5), 'Melanoma'): 1}
+
+
+def test_rebuild_matches_listener(make_user, make_prediction):
+    user = make_user()
+    for hour in range(3):
+        make_prediction(user, 'Melanoma', created_at=datetime(2024, 3, 5, hour))
+    make_prediction(user, 'Dermatofibroma', created_at=datetime(2024, 3, 6))
+    before = (_class_counts(), _user_counts())
+
+    assert rollups.rebuild() == (2, 2)
+    db.session.expire_all()
+    assert (_class_counts(), _user_counts()) == before
@@ -0,0 +1 @@
+"""Tools untuk benchmark dan pengecekan (jalankan dari root project: python -m tools.<nama>)"""
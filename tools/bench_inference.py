@@ -0,0 +1,77 @@
+"""
+Micro-benchmark latency per pemanggilan model.
+
+Membandingkan beberapa cara memanggil model Keras yang sama:
+- model.predict(x)          : API generik (data adapter + callback per call)
+- model(x)                  : pemanggilan langsung (eager)
+- compiled                  : tf.function dengan signature tetap (None, H, W, C)
+- compiled+xla (opsional)   : sama, dengan jit_compile=True
+
+Jalankan: python -m tools.bench_inference [--batch-size 1] [--iterations 200] [--xla]
+"""
+import argparse
+import time
+
+import numpy as np
+
+
+def bench(fn, x, iterations, warmup=10):
+    for _ in range(warmup):
+        fn(x)
+    timings = []
+    for _ in range(iterations):
+        t = time.perf_counter()
+        fn(x)
+        timings.append((time.perf_counter() - t) * 1000.0)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark latency model.predict vs model(x) vs compiled')
+    parser.add_argument('--model', default='skin_disease_mobilenetv2_stage1.h5')
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--intra-op-threads', type=int, default=0, help='0 = otomatis')
+    parser.add_argument('--inter-op-threads', type=int, default=0, help='0 = otomatis')
+    parser.add_argument('--xla', action='store_true', help='Ikut ukur compiled function dengan XLA JIT')
+    args = parser.parse_args()
+
+    from inference import compile_serving_fn, configure_threads, default_thread_counts
+
+    intra, inter = default_thread_counts()
+    intra = args.intra_op_threads or intra
+    inter = args.inter_op_threads or inter
+    configure_threads(intra, inter)
+
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+
+    model = load_model(args.model)
+    input_shape = model.input_shape[1:]
+    x = np.random.rand(args.batch_size, *input_shape).astype(np.float32)
+
+    compiled = compile_serving_fn(lambda image: model(image, training=False), input_shape)
+    candidates = [
+        ('model.predict', lambda batch: model.predict(batch, verbose=0)),
+        ('model(x)', lambda batch: model(batch, training=False).numpy()),
+        ('compiled', lambda batch: compiled(tf.constant(batch)).numpy()),
+    ]
+    if args.xla:
+        compiled_xla = compile_serving_fn(lambda image: model(image, training=False), input_shape, jit_compile=True)
+        candidates.append(('compiled+xla', lambda batch: compiled_xla(tf.constant(batch)).numpy()))
+
+    print(f"🔄 batch={args.batch_size}, iterations={args.iterations}, threads intra={intra} inter={inter}")
+    header = f"{'path':<15} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    baseline = None
+    for name, fn in candidates:
+        timings = bench(fn, x, args.iterations)
+        mean = timings.mean()
+        baseline = baseline or mean
+        print(f"{name:<15} {mean:>9.2f} {np.percentile(timings, 50):>9.2f} "
+              f"{np.percentile(timings, 95):>9.2f} {baseline / mean:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
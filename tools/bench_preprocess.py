@@ -0,0 +1,75 @@
+"""
+Benchmark alokasi memori preprocessing per request.
+
+Membandingkan:
+- lama : np.array(img) / 255.0 (float64) + expand_dims + astype(float32)
+- baru : pixel uint8 dinormalisasi langsung ke slot batch buffer float32
+         yang dipakai ulang (image_pipeline.assemble_batch)
+
+Alokasi diukur dengan tracemalloc (numpy melaporkan alokasinya ke tracemalloc).
+
+Jalankan: python -m tools.bench_preprocess [--requests 200] [--batch-size 1]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from image_pipeline import MODEL_INPUT_SIZE, assemble_batch
+
+
+def old_preprocess(img):
+    img_array = np.array(img) / 255.0
+    img_array = np.expand_dims(img_array, axis=0)
+    return img_array.astype(np.float32)  # konversi yang sebelumnya dilakukan TF
+
+
+def new_preprocess(pixels_list):
+    return assemble_batch(pixels_list)
+
+
+def measure(fn, arg, requests):
+    fn(arg)  # alokasi buffer pertama tidak dihitung (sekali per thread)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    allocated = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        snapshot_before, _ = tracemalloc.get_traced_memory()
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - snapshot_before
+        tracemalloc.reset_peak()
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+    return allocated / requests, elapsed / requests * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark alokasi preprocessing lama vs batch buffer')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Jumlah gambar per batch untuk jalur baru')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=MODEL_INPUT_SIZE[::-1] + (3,), dtype=np.uint8)
+    img = Image.fromarray(pixels)
+
+    old_bytes, old_ms = measure(old_preprocess, img, args.requests)
+    new_bytes, new_ms = measure(new_preprocess, [pixels] * args.batch_size, args.requests)
+    new_bytes /= args.batch_size
+    new_ms /= args.batch_size
+
+    print("=" * 60)
+    print(f"Preprocessing {MODEL_INPUT_SIZE[0]}x{MODEL_INPUT_SIZE[1]}, {args.requests} request")
+    print("=" * 60)
+    print(f"{'path':<10} {'peak alloc/request':>22} {'ms/request':>12}")
+    print(f"{'lama':<10} {old_bytes / 1024:>19.1f} KB {old_ms:>12.3f}")
+    print(f"{'baru':<10} {new_bytes / 1024:>19.1f} KB {new_ms:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark search admin users: LIKE '%x%' vs index full-text.
+
+Membuat database SQLite baru berisi sejumlah user (default 200.000),
+menjalankan migrasi (termasuk index pencarian, jadi insert ikut melewati
+trigger sinkronisasi), lalu mengukur query halaman pertama + COUNT seperti
+di /admin/users dengan kedua jalur untuk beberapa kata pencarian.
+
+Dengan --database-uri, benchmark dijalankan di database yang sudah ada
+(tanpa seeding), mis. salinan database MySQL production.
+
+Jalankan: python -m tools.bench_search [--users 200000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+import search_index
+from migrations import create_db_app, upgrade
+from models import db, User
+
+FIRST_NAMES = ['budi', 'siti', 'agus', 'dewi', 'rina', 'andi', 'putri', 'joko', 'wati', 'yusuf',
+               'maria', 'kevin', 'nadia', 'fajar', 'intan', 'rizky', 'ayu', 'dimas', 'laras', 'hendra']
+LAST_NAMES = ['santoso', 'wijaya', 'pratama', 'saputra', 'lestari', 'hidayat', 'kusuma', 'nugroho',
+              'siregar', 'halim', 'susanto', 'permata', 'gunawan', 'utami', 'setiawan']
+DOMAINS = ['gmail.com', 'yahoo.co.id', 'outlook.com', 'ugm.ac.id', 'klinik.id']
+
+DEFAULT_TERMS = ['budi', 'wijaya', 'klinik', 'a.sus', 'xyz123', 'ri']
+
+
+def seed_users(count, batch_size=5000):
+    """Insert `count` user acak (bulk insert Core, trigger index tetap jalan)"""
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    table = User.__table__
+    inserted = 0
+    while inserted < count:
+        rows = []
+        for i in range(inserted, min(count, inserted + batch_size)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            rows.append({
+                'username': f"{first}{last[:3]}{i}",
+                'email': f"{first}.{last}{i}@{rng.choice(DOMAINS)}",
+                'password_hash': 'x',
+                'full_name': f"{first.title()} {last.title()}",
+                'role': 'user',
+                'created_at': now - timedelta(minutes=i),
+                'updated_at': now,
+            })
+        with db.engine.begin() as conn:
+            conn.execute(table.insert(), rows)
+        inserted += len(rows)
+
+
+def run_search(condition, per_page=20):
+    """Query seperti admin_users(): satu halaman terbaru + total (untuk pagination)"""
+    query = User.query.filter(condition)
+    items = query.order_by(User.created_at.desc()).limit(per_page).all()
+    total = query.with_entities(func.count(User.id)).scalar()
+    db.session.rollback()
+    return total, len(items)
+
+
+def measure(condition_fn, term, repeat):
+    run_search(condition_fn(term))  # warm-up (cache halaman SQLite)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        total, _ = run_search(condition_fn(term))
+        timings.append(time.perf_counter() - started)
+    return total, min(timings) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark search admin: LIKE vs index full-text')
+    parser.add_argument('--users', type=int, default=200000, help='Jumlah user yang di-seed')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--terms', nargs='+', default=DEFAULT_TERMS)
+    parser.add_argument('--database-uri', help='Pakai database yang sudah ada (tanpa seeding)')
+    args = parser.parse_args()
+
+    db_path = None
+    database_uri = args.database_uri
+    if not database_uri:
+        fd, db_path = tempfile.mkstemp(suffix='.db', prefix='bench_search_')
+        os.close(fd)
+        database_uri = f"sqlite:///{db_path}"
+
+    try:
+        with create_db_app(database_uri).app_context():
+            if db_path:
+                upgrade()
+                started = time.perf_counter()
+                seed_users(args.users)
+                print(f"✅ {args.users} user di-seed dalam {time.perf_counter() - started:.1f} detik "
+                      f"(termasuk update index)")
+
+            if not search_index.is_available():
+                print("⚠️  Index pencarian tidak tersedia di database ini; kedua jalur memakai LIKE")
+
+            print("=" * 64)
+            print(f"Search users ({db.engine.dialect.name}), waktu terbaik dari {args.repeat}x")
+            print("=" * 64)
+            print(f"{'search':<12} {'hasil':>8} {'LIKE ms':>10} {'index ms':>10} {'speedup':>9}")
+            for term in args.terms:
+                like_total, like_ms = measure(search_index.like_condition, term, args.repeat)
+                index_total, index_ms = measure(search_index.user_condition, term, args.repeat)
+                mismatch = '' if like_total == index_total else f"  ❌ hasil berbeda ({index_total})"
+                speedup = like_ms / index_ms if index_ms else float('inf')
+                print(f"{term:<12} {like_total:>8} {like_ms:>10.2f} {index_ms:>10.2f} {speedup:>8.1f}x{mismatch}")
+    finally:
+        if db_path:
+            os.remove(db_path)
+
+
+if __name__ == '__main__':
+    main()
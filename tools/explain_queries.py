@@ -0,0 +1,146 @@
+"""
+Laporan query plan untuk query utama setiap route.
+
+Menjalankan query yang sama dengan route (history, dashboard, admin) dengan
+prefix `EXPLAIN QUERY PLAN` (SQLite) atau `EXPLAIN` (MySQL) dan menandai
+query yang melakukan full table scan.
+
+Planner MySQL bisa memilih full scan untuk tabel yang hampir kosong; jalankan
+di database dengan data nyata (atau setelah ANALYZE TABLE) untuk hasil yang
+representatif.
+
+Jalankan: python -m tools.explain_queries [--user-id 1]
+"""
+import argparse
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, desc, event, func, or_
+from sqlalchemy.orm import joinedload
+
+from migrations import create_db_app
+from models import db, User, PredictionHistory
+
+
+def route_queries(user_id):
+    """(nama route/query, Query) yang dicek"""
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    some_class = 'Eczema'
+    history = PredictionHistory.query.filter_by(user_id=user_id)
+    newest_first = (PredictionHistory.created_at.desc(), PredictionHistory.id.desc())
+
+    row_number = func.row_number().over(
+        partition_by=PredictionHistory.user_id, order_by=newest_first
+    ).label('row_number')
+    ranked = db.session.query(PredictionHistory.id, row_number)\
+        .filter(PredictionHistory.user_id.in_([user_id]))\
+        .subquery()
+
+    return [
+        ('profile: 10 prediksi terbaru',
+         history.order_by(PredictionHistory.created_at.desc()).limit(10)),
+        ('prediction_history: halaman pertama',
+         history.order_by(*newest_first).limit(21)),
+        ('prediction_history: ?after=cursor',
+         history.filter(or_(PredictionHistory.created_at < now,
+                            and_(PredictionHistory.created_at == now, PredictionHistory.id < 1000)))
+         .order_by(*newest_first).limit(21)),
+        ('api history: ?since=cursor',
+         history.filter(or_(PredictionHistory.created_at > week_ago,
+                            and_(PredictionHistory.created_at == week_ago, PredictionHistory.id > 1)))
+         .order_by(PredictionHistory.created_at.asc(), PredictionHistory.id.asc()).limit(11)),
+        ('admin_user_detail: total prediksi user',
+         db.session.query(func.count(PredictionHistory.id)).filter_by(user_id=user_id)),
+        ('admin_user_detail: prediksi user minggu ini',
+         db.session.query(func.count(PredictionHistory.id))
+         .filter_by(user_id=user_id).filter(PredictionHistory.created_at >= week_ago)),
+        ('admin_dashboard: admin count',
+         db.session.query(func.count(User.id)).filter_by(role='admin')),
+        ('admin_dashboard: prediksi minggu ini',
+         db.session.query(func.count(PredictionHistory.id)).filter(PredictionHistory.created_at >= week_ago)),
+        ('admin_dashboard: prediksi hari ini',
+         db.session.query(func.count(PredictionHistory.id)).filter(PredictionHistory.created_at >= today_start)),
+        ('admin_dashboard: top kelas',
+         db.session.query(PredictionHistory.predicted_class, func.count(PredictionHistory.id).label('count'))
+         .group_by(PredictionHistory.predicted_class).order_by(desc('count')).limit(5)),
+        ('admin_dashboard: prediksi terbaru',
+         PredictionHistory.query.options(joinedload(PredictionHistory.user))
+         .order_by(PredictionHistory.created_at.desc()).limit(10)),
+        ('admin_dashboard: user baru minggu ini',
+         db.session.query(func.count(User.id)).filter(User.created_at >= week_ago)),
+        ('admin_predictions: user dengan prediksi kelas X',
+         User.query.filter(
+             db.session.query(PredictionHistory.id)
+             .filter(PredictionHistory.user_id == User.id, PredictionHistory.predicted_class == some_class)
+             .exists()
+         ).order_by(User.username).limit(10)),
+        ('admin_predictions: 50 prediksi per user (window)',
+         PredictionHistory.query.join(ranked, ranked.c.id == PredictionHistory.id)
+         .filter(ranked.c.row_number <= 50).order_by(ranked.c.row_number)),
+        ('prediction_image: cek pemilik gambar',
+         db.session.query(PredictionHistory.id).filter_by(image_hash='0' * 64, user_id=user_id).limit(1)),
+    ]
+
+
+@contextmanager
+def explained(conn, prefix):
+    """Semua statement di `conn` dijalankan dengan prefix EXPLAIN"""
+    def add_prefix(_conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    event.listen(conn, 'before_cursor_execute', add_prefix, retval=True)
+    try:
+        yield
+    finally:
+        event.remove(conn, 'before_cursor_execute', add_prefix)
+
+
+def full_scans(dialect, rows):
+    """Baris plan yang berupa full table scan"""
+    if dialect == 'sqlite':
+        # detail: "SCAN prediction_history" vs "SEARCH ... USING INDEX" / "SCAN ... USING COVERING INDEX".
+        # SCAN atas subquery / alias anon_N (hasil materialize) bukan scan tabel.
+        scans = []
+        for row in rows:
+            match = re.match(r'SCAN (\w+)', row[-1])
+            if match and 'INDEX' not in row[-1] and re.sub(r'_\d+$', '', match.group(1)) in db.metadata.tables:
+                scans.append(row[-1])
+        return scans
+    # MySQL: kolom `type` = ALL berarti full scan
+    return [f"{row._mapping['table']}: type=ALL" for row in rows if row._mapping.get('type') == 'ALL']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN query utama setiap route')
+    parser.add_argument('--user-id', type=int, default=1)
+    args = parser.parse_args()
+
+    app = create_db_app()
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+        problems = 0
+
+        with db.engine.connect() as conn:
+            for name, query in route_queries(args.user_id):
+                with explained(conn, prefix):
+                    rows = conn.execute(query.statement).fetchall()
+                scans = full_scans(dialect, rows)
+                problems += bool(scans)
+                print(f"{'⚠️ ' if scans else '✅'} {name}")
+                for row in rows:
+                    print(f"      {row[-1] if dialect == 'sqlite' else dict(row._mapping)}")
+                for scan in scans:
+                    print(f"      ⚠️  full scan: {scan}")
+
+        print("=" * 60)
+        print(f"{problems} query dengan full table scan ({dialect})")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
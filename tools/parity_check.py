@@ -0,0 +1,164 @@
+"""
+Parity check untuk semua backend inference.
+
+Menjalankan setiap backend (keras, savedmodel, tflite-fp32/fp16/int8) pada semua gambar
+di static/dataset lalu melaporkan:
+- top-1 agreement terhadap backend referensi (backend pertama)
+- akurasi terhadap label folder dataset
+- drift probabilitas (max dan rata-rata selisih absolut)
+- latency per gambar (batch 1) dan throughput batch
+- RSS proses sebelum/sesudah model di-load
+
+Setiap backend dijalankan di proses terpisah supaya angka RSS tidak saling
+tercampur.
+
+Jalankan: python -m tools.parity_check [--backends keras,tflite-int8] [--batch-size 16]
+
+Sebelum memakai INFERENCE_BACKEND=tflite-fp32 TFLITE_XNNPACK=0 (bobot di-share
+antar worker, lihat gunicorn.conf.py), bandingkan dengan backend produksi:
+    python -m tools.parity_check --backends savedmodel,tflite-fp32 --no-xnnpack
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+import numpy as np
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+def current_rss_mb():
+    from process_stats import memory_usage
+    return memory_usage()['rss']
+
+
+def collect_images(dataset_dir):
+    """List (path, label) dari folder dataset, label = nama subfolder"""
+    images = []
+    for path in sorted(Path(dataset_dir).rglob('*')):
+        if path.suffix.lower() in IMAGE_EXTENSIONS:
+            images.append((str(path), path.parent.name))
+    return images
+
+
+def _run_backend(name, model_path, image_paths, batch_size, xnnpack):
+    """Dijalankan di proses anak: load backend, ukur latency dan RSS"""
+    from image_pipeline import decode_upload
+    from inference import load_backend
+
+    pixels = []
+    for path in image_paths:
+        with open(path, 'rb') as f:
+            pixels.append(decode_upload(f).pixels)
+    inputs = np.stack(pixels).astype(np.float32) / np.float32(255.0)
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    backend = load_backend(name, model_path, xnnpack=xnnpack)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = current_rss_mb()
+
+    # Warm-up supaya tracing/allocate pertama tidak ikut dihitung
+    backend.predict(inputs[:1])
+
+    latencies = []
+    probs = []
+    for i in range(len(inputs)):
+        t = time.perf_counter()
+        probs.append(np.asarray(backend.predict(inputs[i:i + 1]))[0])
+        latencies.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    for start in range(0, len(inputs), batch_size):
+        backend.predict(inputs[start:start + batch_size])
+    batch_seconds = time.perf_counter() - t
+
+    return {
+        'name': name,
+        'probs': np.stack(probs),
+        'load_seconds': load_seconds,
+        'latency_ms_p50': float(np.percentile(latencies, 50) * 1000),
+        'latency_ms_p95': float(np.percentile(latencies, 95) * 1000),
+        'throughput_ips': len(inputs) / batch_seconds if batch_seconds else 0.0,
+        'rss_before_mb': rss_before,
+        'rss_loaded_mb': rss_loaded,
+        'rss_after_mb': current_rss_mb(),
+    }
+
+
+def main():
+    from inference import BACKENDS
+
+    parser = argparse.ArgumentParser(description='Parity check backend inference')
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help='Daftar backend dipisah koma; backend pertama jadi referensi')
+    parser.add_argument('--model', default='skin_disease_mobilenetv2_stage1.h5')
+    parser.add_argument('--class-indices', default='class_indices.json')
+    parser.add_argument('--dataset', default='static/dataset')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--no-xnnpack', dest='xnnpack', action='store_false',
+                        help='Backend TFLite tanpa XNNPACK (konfigurasi TFLITE_XNNPACK=0, bobot di-share)')
+    parser.add_argument('--json', dest='json_out', help='Simpan laporan ke file JSON')
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    with open(args.class_indices) as f:
+        class_indices = json.load(f)
+
+    images = collect_images(args.dataset)
+    if not images:
+        print(f"❌ Tidak ada gambar di {args.dataset}")
+        return
+    paths = [p for p, _ in images]
+    labels = np.array([class_indices.get(label, -1) for _, label in images])
+    print(f"🔄 {len(images)} gambar, backend: {', '.join(backends)}")
+
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for name in backends:
+        print(f"   ... {name}")
+        with ctx.Pool(1) as pool:
+            results.append(pool.apply(_run_backend, (name, args.model, paths, args.batch_size, args.xnnpack)))
+
+    reference = results[0]
+    ref_top1 = reference['probs'].argmax(axis=1)
+    has_label = labels >= 0
+
+    report = []
+    for res in results:
+        top1 = res['probs'].argmax(axis=1)
+        drift = np.abs(res['probs'] - reference['probs'])
+        report.append({
+            'backend': res['name'],
+            'top1_agreement': float((top1 == ref_top1).mean()),
+            'accuracy': float((top1[has_label] == labels[has_label]).mean()) if has_label.any() else None,
+            'max_prob_drift': float(drift.max()),
+            'mean_prob_drift': float(drift.mean()),
+            'load_seconds': res['load_seconds'],
+            'latency_ms_p50': res['latency_ms_p50'],
+            'latency_ms_p95': res['latency_ms_p95'],
+            'throughput_ips': res['throughput_ips'],
+            'rss_model_mb': res['rss_loaded_mb'] - res['rss_before_mb'],
+            'rss_after_mb': res['rss_after_mb'],
+        })
+
+    header = f"{'backend':<13} {'agree':>6} {'acc':>6} {'maxdrift':>9} {'p50 ms':>8} {'p95 ms':>8} {'img/s':>7} {'load s':>7} {'+RSS MB':>8} {'RSS MB':>7}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in report:
+        acc = f"{r['accuracy']:.3f}" if r['accuracy'] is not None else '-'
+        print(f"{r['backend']:<13} {r['top1_agreement']:>6.3f} {acc:>6} {r['max_prob_drift']:>9.5f} "
+              f"{r['latency_ms_p50']:>8.2f} {r['latency_ms_p95']:>8.2f} {r['throughput_ips']:>7.1f} "
+              f"{r['load_seconds']:>7.2f} {r['rss_model_mb']:>8.1f} {r['rss_after_mb']:>7.1f}")
+    print(f"\nReferensi: {reference['name']} | {len(images)} gambar dari {args.dataset}")
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({'images': len(images), 'reference': reference['name'], 'backends': report}, f, indent=2)
+        print(f"✅ Laporan disimpan ke {args.json_out}")
+
+
+if __name__ == '__main__':
+    main()
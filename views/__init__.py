@@ -0,0 +1,19 @@
+"""
+Blueprint aplikasi (didaftarkan oleh create_app() di app.py):
+
+- catalog   : beranda, artikel dan informasi penyakit
+- auth      : login, register, logout
+- profile   : profil dan history prediksi user, gambar prediksi
+- inference : prediksi (langsung, batch, job asynchronous) dan health check
+- admin     : panel admin
+
+Hanya blueprint inference yang memakai model (lewat `predictor`, di-load lazy).
+"""
+
+
+def register_blueprints(app):
+    from views import admin, auth, catalog, inference, profile
+
+    for module in (catalog, auth, profile, inference, admin):
+        app.register_blueprint(module.bp)
+    inference.init_app(app)
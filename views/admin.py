@@ -0,0 +1,654 @@
+"""
+Panel admin: dashboard, manajemen user dan prediksi, export, operasi bulk.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Blueprint, Response, current_app, flash, jsonify, redirect, render_template, request, \
+    stream_with_context, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+import bulk_ops
+from extensions import history_writer, predictor
+from models import db, User, PredictionHistory, listing_options
+from pagination import NumberedPage, keyset_paginate
+from views.inference import prediction_jobs
+import probabilities as prob_codec
+import rollups
+import search_index
+
+bp = Blueprint('admin', __name__)
+
+
+# Admin decorator
+def admin_required(f):
+    @wraps(f)
+    @login_required
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or not current_user.is_admin():
+            flash('Akses ditolak. Hanya admin yang dapat mengakses halaman ini.', 'error')
+            return redirect(url_for('catalog.index'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+@bp.route('/admin')
+@admin_required
+def dashboard():
+    """Admin dashboard dengan statistik"""
+    # Total users
+    total_users = User.query.count()
+    total_admins = User.query.filter_by(role='admin').count()
+    total_regular_users = total_users - total_admins
+    
+    # Total predictions (semua, 7 hari terakhir, hari ini) dari tabel rollup harian
+    totals = rollups.prediction_totals()
+    total_predictions = totals['total']
+    predictions_this_week = totals['this_week']
+    predictions_today = totals['today']
+    
+    # Top predicted classes
+    top_predictions = rollups.top_classes(limit=5)
+    
+    # Recent predictions (latest 10) - eager load user to avoid lazy loading
+    recent_predictions = PredictionHistory.query\
+        .options(listing_options(), joinedload(PredictionHistory.user))\
+        .order_by(PredictionHistory.created_at.desc())\
+        .limit(10)\
+        .all()
+    
+    # Users registered this week
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    users_this_week = User.query.filter(
+        User.created_at >= week_ago
+    ).count()
+    
+    # Expunge objects from session to prevent autoflush when accessing attributes
+    # This allows us to safely access user relationship without triggering saves
+    for pred in recent_predictions:
+        # Access user to ensure it's loaded before expunging
+        _ = pred.user
+        db.session.expunge(pred)
+    
+    return render_template('admin/dashboard.html',
+                         total_users=total_users,
+                         total_admins=total_admins,
+                         total_regular_users=total_regular_users,
+                         total_predictions=total_predictions,
+                         predictions_this_week=predictions_this_week,
+                         predictions_today=predictions_today,
+                         top_predictions=top_predictions,
+                         recent_predictions=recent_predictions,
+                         users_this_week=users_this_week)
+
+
+@bp.route('/admin/users')
+@admin_required
+def users():
+    """Admin - User management"""
+    page = request.args.get('page', 1, type=int)
+    per_page = 20
+    search = request.args.get('search', '').strip()
+    role_filter = request.args.get('role', '')
+    
+    query = User.query
+    
+    # Apply filters
+    if search:
+        query = query.filter(search_index.user_condition(search))
+    
+    if role_filter:
+        query = query.filter_by(role=role_filter)
+    
+    users = NumberedPage(query.order_by(User.created_at.desc())
+                         .paginate(page=page, per_page=per_page, error_out=False))
+    
+    return render_template('admin/users.html',
+                         users=users.items,
+                         pagination=users,
+                         search=search,
+                         role_filter=role_filter)
+
+
+@bp.route('/admin/users/<int:user_id>')
+@admin_required
+def user_detail(user_id):
+    """Admin - Detail user dan prediction history"""
+    user = User.query.get_or_404(user_id)
+    
+    per_page = 20
+    
+    predictions = keyset_paginate(
+        PredictionHistory.query.options(listing_options()).filter_by(user_id=user_id),
+        PredictionHistory, per_page,
+        after=request.args.get('after'), before=request.args.get('before')
+    )
+    
+    # User statistics (dari tabel rollup harian)
+    totals = rollups.user_totals(user_id)
+    total_predictions = totals['total']
+    predictions_this_week = totals['this_week']
+    
+    return render_template('admin/user_detail.html',
+                         user=user,
+                         predictions=predictions.items,
+                         pagination=predictions,
+                         total_predictions=total_predictions,
+                         predictions_this_week=predictions_this_week)
+
+
+@bp.route('/admin/users/<int:user_id>/toggle-role', methods=['POST'])
+@admin_required
+def toggle_user_role(user_id):
+    """Toggle user role between admin and user"""
+    if user_id == current_user.id:
+        return jsonify({'error': 'Tidak dapat mengubah role sendiri'}), 400
+    
+    user = User.query.get_or_404(user_id)
+    
+    try:
+        user.role = 'admin' if user.role == 'user' else 'user'
+        db.session.commit()
+        return jsonify({
+            'success': True,
+            'message': f'Role user berhasil diubah menjadi {user.role}',
+            'new_role': user.role
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/admin/users/create', methods=['GET', 'POST'])
+@admin_required
+def create_user():
+    """Admin - Create new user"""
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        email = request.form.get('email', '').strip()
+        password = request.form.get('password', '')
+        password_confirm = request.form.get('password_confirm', '')
+        full_name = request.form.get('full_name', '').strip()
+        phone = request.form.get('phone', '').strip()
+        role = request.form.get('role', 'user').strip()
+        
+        # Validation
+        errors = []
+        if not username or len(username) < 3:
+            errors.append('Username harus minimal 3 karakter.')
+        if not email or '@' not in email:
+            errors.append('Email tidak valid.')
+        if not password or len(password) < 6:
+            errors.append('Password harus minimal 6 karakter.')
+        if password != password_confirm:
+            errors.append('Password konfirmasi tidak cocok.')
+        if role not in ['user', 'admin']:
+            errors.append('Role tidak valid.')
+        
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+            return render_template('admin/create_user.html', 
+                                 username=username, email=email, 
+                                 full_name=full_name, phone=phone, role=role)
+        
+        # Check if username or email already exists
+        if User.query.filter_by(username=username).first():
+            flash('Username sudah digunakan.', 'error')
+            return render_template('admin/create_user.html',
+                                 username=username, email=email,
+                                 full_name=full_name, phone=phone, role=role)
+        
+        if User.query.filter_by(email=email).first():
+            flash('Email sudah terdaftar.', 'error')
+            return render_template('admin/create_user.html',
+                                 username=username, email=email,
+                                 full_name=full_name, phone=phone, role=role)
+        
+        # Create new user
+        try:
+            user = User(
+                username=username,
+                email=email,
+                full_name=full_name if full_name else None,
+                phone=phone if phone else None,
+                role=role
+            )
+            user.set_password(password)
+            db.session.add(user)
+            db.session.commit()
+            
+            flash(f'User "{username}" berhasil dibuat!', 'success')
+            return redirect(url_for('admin.users'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Terjadi kesalahan saat membuat user: {str(e)}', 'error')
+            print(f"Create user error: {e}")
+    
+    return render_template('admin/create_user.html')
+
+
+@bp.route('/admin/users/<int:user_id>/edit', methods=['GET', 'POST'])
+@admin_required
+def edit_user(user_id):
+    """Admin - Edit user"""
+    user = User.query.get_or_404(user_id)
+    
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        email = request.form.get('email', '').strip()
+        full_name = request.form.get('full_name', '').strip()
+        phone = request.form.get('phone', '').strip()
+        role = request.form.get('role', 'user').strip()
+        password = request.form.get('password', '').strip()
+        password_confirm = request.form.get('password_confirm', '').strip()
+        
+        # Validation
+        errors = []
+        if not username or len(username) < 3:
+            errors.append('Username harus minimal 3 karakter.')
+        if not email or '@' not in email:
+            errors.append('Email tidak valid.')
+        if role not in ['user', 'admin']:
+            errors.append('Role tidak valid.')
+        if password and len(password) < 6:
+            errors.append('Password harus minimal 6 karakter.')
+        if password and password != password_confirm:
+            errors.append('Password konfirmasi tidak cocok.')
+        
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+            return render_template('admin/edit_user.html', user=user,
+                                 username=username, email=email,
+                                 full_name=full_name, phone=phone, role=role)
+        
+        # Check if username or email already exists (by other user)
+        existing_user = User.query.filter_by(username=username).first()
+        if existing_user and existing_user.id != user.id:
+            flash('Username sudah digunakan oleh user lain.', 'error')
+            return render_template('admin/edit_user.html', user=user,
+                                 username=user.username, email=email,
+                                 full_name=full_name, phone=phone, role=role)
+        
+        existing_email = User.query.filter_by(email=email).first()
+        if existing_email and existing_email.id != user.id:
+            flash('Email sudah digunakan oleh user lain.', 'error')
+            return render_template('admin/edit_user.html', user=user,
+                                 username=username, email=user.email,
+                                 full_name=full_name, phone=phone, role=role)
+        
+        # Update user
+        try:
+            user.username = username
+            user.email = email
+            user.full_name = full_name if full_name else None
+            user.phone = phone if phone else None
+            user.role = role
+            
+            # Update password if provided
+            if password:
+                user.set_password(password)
+            
+            db.session.commit()
+            flash(f'User "{username}" berhasil diperbarui!', 'success')
+            return redirect(url_for('admin.users'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Terjadi kesalahan saat memperbarui user: {str(e)}', 'error')
+            print(f"Edit user error: {e}")
+    
+    return render_template('admin/edit_user.html', user=user)
+
+
+@bp.route('/admin/users/<int:user_id>/delete', methods=['POST'])
+@admin_required
+def delete_user(user_id):
+    """Delete user"""
+    if user_id == current_user.id:
+        return jsonify({'error': 'Tidak dapat menghapus akun sendiri'}), 400
+    
+    user = User.query.get_or_404(user_id)
+    # Operasi bulk memakai transaksi sendiri per chunk; akhiri transaksi session dulu
+    db.session.rollback()
+    
+    try:
+        # Prediksi user dihapus set-based dulu (user_id NOT NULL), lalu user-nya
+        for _ in bulk_ops.delete_users([user.id]):
+            pass
+        return jsonify({'success': True, 'message': 'User berhasil dihapus'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def _bulk_response(operation, message):
+    """
+    Stream progress operasi bulk sebagai NDJSON
+    
+    Setiap baris berisi progress (done, total, ...); baris terakhir berisi
+    `success` + `message`, atau `error` kalau operasi gagal di tengah jalan.
+    """
+    def generate():
+        progress = {}
+        try:
+            for progress in operation:
+                yield json.dumps(progress) + '\n'
+        except Exception as e:
+            print(f"❌ Bulk operation error: {e}")
+            yield json.dumps({**progress, 'error': str(e)}) + '\n'
+            return
+        yield json.dumps({**progress, 'success': True, 'message': message.format(**progress)}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _bulk_user_ids(payload):
+    """
+    ID user target operasi bulk: `ids`, atau semua user yang cocok dengan
+    `filter` (search / role, sama seperti halaman admin users).
+    Admin yang sedang login selalu dikecualikan.
+    
+    Raises:
+        ValueError: Kalau ids tidak valid atau tidak ada ids maupun filter
+    """
+    ids = bulk_ops.parse_ids(payload.get('ids'))
+    filters = payload.get('filter') or {}
+    conditions = []
+    if ids:
+        conditions.append(User.id.in_(ids))
+    else:
+        search = (filters.get('search') or '').strip()
+        role = (filters.get('role') or '').strip()
+        if search:
+            conditions.append(search_index.user_condition(search))
+        if role:
+            conditions.append(User.role == role)
+        if not conditions:
+            raise ValueError('Pilih user (ids) atau isi minimal satu filter')
+    return bulk_ops.matching_user_ids(conditions, exclude_id=current_user.id)
+
+
+@bp.route('/admin/users/bulk-delete', methods=['POST'])
+@admin_required
+def bulk_delete_users():
+    """
+    Hapus banyak user (beserta prediksinya) sekaligus
+    
+    JSON body: {"ids": [...]} atau {"filter": {"search": "...", "role": "user"}}
+    Response: NDJSON progress (lihat _bulk_response)
+    """
+    try:
+        user_ids = _bulk_user_ids(request.get_json(silent=True) or {})
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.rollback()
+    return _bulk_response(
+        bulk_ops.delete_users(user_ids, chunk_size=current_app.config['BULK_CHUNK_SIZE']),
+        '{done} user dan {predictions_deleted} prediksi berhasil dihapus'
+    )
+
+
+@bp.route('/admin/users/bulk-role', methods=['POST'])
+@admin_required
+def bulk_set_role():
+    """
+    Ubah role banyak user sekaligus
+    
+    JSON body: {"role": "admin"|"user", "ids": [...]} atau {"role": ..., "filter": {...}}
+    Response: NDJSON progress (lihat _bulk_response)
+    """
+    payload = request.get_json(silent=True) or {}
+    role = payload.get('role')
+    if role not in bulk_ops.ROLES:
+        return jsonify({'error': 'Role tidak valid.'}), 400
+    try:
+        user_ids = _bulk_user_ids(payload)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.rollback()
+    return _bulk_response(
+        bulk_ops.set_role(user_ids, role, chunk_size=current_app.config['BULK_CHUNK_SIZE']),
+        '{done} user berhasil diubah menjadi ' + role
+    )
+
+
+def _admin_prediction_filters(search, class_filter):
+    """
+    Filter prediksi untuk halaman admin predictions dan export
+    
+    Prediksi ikut kalau sesuai filter kelas, dan (kalau ada search) user-nya
+    cocok ATAU kelas prediksinya cocok. Query harus join ke User.
+    """
+    pred_filters = []
+    if class_filter:
+        pred_filters.append(PredictionHistory.predicted_class == class_filter)
+    if search:
+        # Kelas dicocokkan di Python, lalu IN (memakai index predicted_class)
+        search_filter = search_index.user_condition(search)
+        classes = search_index.matching_classes(search)
+        if classes:
+            search_filter = search_filter | PredictionHistory.predicted_class.in_(classes)
+        pred_filters.append(search_filter)
+    return pred_filters
+
+
+@bp.route('/admin/predictions')
+@admin_required
+def predictions():
+    """Admin - All predictions grouped by user"""
+    page = request.args.get('page', 1, type=int)
+    per_page = 10  # Number of users per page
+    per_user = 50  # Predictions shown per user
+    search = request.args.get('search', '').strip()
+    class_filter = request.args.get('class', '').strip()
+    pred_filters = _admin_prediction_filters(search, class_filter)
+    
+    # User yang punya minimal satu prediksi tersebut (EXISTS, dipaginasi di database)
+    has_predictions = db.session.query(PredictionHistory.id)\
+        .filter(PredictionHistory.user_id == User.id, *pred_filters)\
+        .exists()
+    pagination = NumberedPage(User.query.filter(has_predictions)
+                              .order_by(User.username)
+                              .paginate(page=page, per_page=per_page, error_out=False))
+    
+    # Maksimal 50 prediksi terbaru per user di halaman ini, dalam satu query
+    users_predictions = {}
+    if pagination.items:
+        row_number = func.row_number().over(
+            partition_by=PredictionHistory.user_id,
+            order_by=(PredictionHistory.created_at.desc(), PredictionHistory.id.desc())
+        ).label('row_number')
+        ranked = db.session.query(PredictionHistory.id, row_number)\
+            .join(User, User.id == PredictionHistory.user_id)\
+            .filter(PredictionHistory.user_id.in_([u.id for u in pagination.items]), *pred_filters)\
+            .subquery()
+        predictions = PredictionHistory.query\
+            .options(listing_options())\
+            .join(ranked, ranked.c.id == PredictionHistory.id)\
+            .filter(ranked.c.row_number <= per_user)\
+            .order_by(ranked.c.row_number)\
+            .all()
+        
+        by_user = {}
+        for pred in predictions:
+            by_user.setdefault(pred.user_id, []).append(pred)
+        for user in pagination.items:
+            users_predictions[user] = by_user.get(user.id, [])
+    
+    # Daftar kelas untuk filter (dari class_indices, tanpa scan tabel)
+    all_classes = sorted(prob_codec.class_names())
+    
+    return render_template('admin/predictions.html',
+                         users_predictions=users_predictions,
+                         pagination=pagination,
+                         search=search,
+                         class_filter=class_filter,
+                         all_classes=all_classes)
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def _export_value(row, name):
+    if name == 'created_at':
+        return row.created_at.isoformat() if row.created_at else None
+    if name == 'image_url':
+        return url_for('profile.prediction_image', image_hash=row.image_hash) if row.image_hash else None
+    return getattr(row, name)
+
+
+def _export_chunks(query, columns, fmt, include_probabilities, chunk_size):
+    """Baris export per chunk (yield_per), diformat sebagai CSV atau NDJSON"""
+    names = prob_codec.class_names() if include_probabilities else []
+    header = list(columns) + names
+    
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        yield buffer.getvalue()
+    
+    result = db.session.execute(query.statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        vectors = prob_codec.decode_rows([row.probabilities for row in rows]) if include_probabilities else None
+        records = []
+        for i, row in enumerate(rows):
+            record = [_export_value(row, name) for name in columns]
+            if include_probabilities:
+                vector = vectors[i]
+                record += [float(p) for p in vector] if vector is not None else [None] * len(names)
+            records.append(record)
+        
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(records)
+            yield buffer.getvalue()
+        else:
+            yield ''.join(json.dumps(dict(zip(header, record))) + '\n' for record in records)
+
+
+def _gzip_stream(chunks):
+    """Kompres stream teks menjadi gzip secara bertahap"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@bp.route('/admin/predictions/export')
+@admin_required
+def export_predictions():
+    """
+    Export prediksi (streaming, memori tetap kecil berapa pun jumlah barisnya)
+    
+    Query params:
+        format: csv (default) atau ndjson
+        search, class: Filter yang sama dengan halaman admin predictions
+        images: 1 untuk menyertakan kolom image_hash dan image_url
+        probabilities: 1 untuk menyertakan probabilitas semua kelas
+        gzip: 1 untuk download terkompresi (.gz)
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Format tidak didukung: {fmt}"}), 400
+    search = request.args.get('search', '').strip()
+    class_filter = request.args.get('class', '').strip()
+    include_images = request.args.get('images') == '1'
+    include_probabilities = request.args.get('probabilities') == '1'
+    compress = request.args.get('gzip') == '1'
+    
+    columns = ['id', 'user_id', 'username', 'email', 'predicted_class', 'confidence', 'created_at']
+    selected = [PredictionHistory.id, PredictionHistory.user_id, User.username, User.email,
+                PredictionHistory.predicted_class, PredictionHistory.confidence, PredictionHistory.created_at]
+    if include_images:
+        columns += ['image_hash', 'image_url']
+        selected.append(PredictionHistory.image_hash)
+    if include_probabilities:
+        selected.append(PredictionHistory.probabilities)
+    
+    query = db.session.query(*selected)\
+        .join(User, User.id == PredictionHistory.user_id)\
+        .filter(*_admin_prediction_filters(search, class_filter))\
+        .order_by(PredictionHistory.id)
+    
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"predictions-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    chunks = _export_chunks(query, columns, fmt, include_probabilities, chunk_size=1000)
+    if compress:
+        chunks = _gzip_stream(chunks)
+        mimetype, filename = 'application/gzip', filename + '.gz'
+    
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@bp.route('/admin/predictions/bulk-delete', methods=['POST'])
+@admin_required
+def bulk_delete_predictions():
+    """
+    Hapus banyak prediksi sekaligus
+    
+    JSON body: {"ids": [...]} atau
+               {"filter": {"class": "Acne", "older_than": "2024-01-01", "user_id": 3}}
+    Response: NDJSON progress (lihat _bulk_response)
+    """
+    payload = request.get_json(silent=True) or {}
+    filters = payload.get('filter') or {}
+    try:
+        ids = bulk_ops.parse_ids(payload.get('ids'))
+        if ids:
+            conditions = bulk_ops.prediction_conditions(ids=ids)
+        else:
+            user_ids = bulk_ops.parse_ids([filters['user_id']] if filters.get('user_id') else [])
+            conditions = bulk_ops.prediction_conditions(
+                predicted_class=(filters.get('class') or '').strip(),
+                older_than=(filters.get('older_than') or '').strip(),
+                user_id=user_ids[0] if user_ids else None
+            )
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.rollback()
+    return _bulk_response(
+        bulk_ops.delete_predictions(conditions, chunk_size=current_app.config['BULK_CHUNK_SIZE']),
+        '{done} prediksi berhasil dihapus'
+    )
+
+
+@bp.route('/admin/predictions/<int:prediction_id>/delete', methods=['POST'])
+@admin_required
+def delete_prediction(prediction_id):
+    """Delete prediction"""
+    prediction = PredictionHistory.query.get_or_404(prediction_id)
+    
+    try:
+        db.session.delete(prediction)
+        db.session.commit()
+        return jsonify({'success': True, 'message': 'Prediksi berhasil dihapus'})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/admin/api/inference-stats')
+@admin_required
+def inference_stats():
+    """Statistik antrian dan batch inference (untuk tuning BATCH_MAX_SIZE / BATCH_MAX_WAIT_MS)"""
+    return jsonify({
+        'success': True,
+        'batching': predictor.stats(),
+        'prediction_cache': predictor.cache.stats(),
+        'history_writer': history_writer.stats(),
+        'prediction_jobs': prediction_jobs.stats()
+    })
@@ -0,0 +1,111 @@
+"""
+Autentikasi: login, register, logout.
+"""
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+
+from extensions import login_manager
+from models import db, User
+
+bp = Blueprint('auth', __name__)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """Login page"""
+    if current_user.is_authenticated:
+        return redirect(url_for('catalog.index'))
+    
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        password = request.form.get('password', '')
+        remember = bool(request.form.get('remember'))
+        
+        if not username or not password:
+            flash('Username dan password harus diisi.', 'error')
+            return render_template('login.html')
+        
+        user = User.query.filter_by(username=username).first()
+        
+        if user and user.check_password(password):
+            login_user(user, remember=remember)
+            next_page = request.args.get('next')
+            flash(f'Selamat datang, {user.username}!', 'success')
+            return redirect(next_page) if next_page else redirect(url_for('catalog.index'))
+        else:
+            flash('Username atau password salah.', 'error')
+    
+    return render_template('login.html')
+
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """Register page"""
+    if current_user.is_authenticated:
+        return redirect(url_for('catalog.index'))
+    
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        email = request.form.get('email', '').strip()
+        password = request.form.get('password', '')
+        password_confirm = request.form.get('password_confirm', '')
+        full_name = request.form.get('full_name', '').strip()
+        
+        # Validation
+        errors = []
+        if not username or len(username) < 3:
+            errors.append('Username harus minimal 3 karakter.')
+        if not email or '@' not in email:
+            errors.append('Email tidak valid.')
+        if not password or len(password) < 6:
+            errors.append('Password harus minimal 6 karakter.')
+        if password != password_confirm:
+            errors.append('Password konfirmasi tidak cocok.')
+        
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+            return render_template('register.html')
+        
+        # Check if username or email already exists
+        if User.query.filter_by(username=username).first():
+            flash('Username sudah digunakan.', 'error')
+            return render_template('register.html')
+        
+        if User.query.filter_by(email=email).first():
+            flash('Email sudah terdaftar.', 'error')
+            return render_template('register.html')
+        
+        # Create new user
+        try:
+            user = User(
+                username=username,
+                email=email,
+                full_name=full_name if full_name else None
+            )
+            user.set_password(password)
+            db.session.add(user)
+            db.session.commit()
+            
+            flash('Registrasi berhasil! Silakan login.', 'success')
+            return redirect(url_for('auth.login'))
+        except Exception as e:
+            db.session.rollback()
+            flash('Terjadi kesalahan saat registrasi. Silakan coba lagi.', 'error')
+            print(f"Registration error: {e}")
+    
+    return render_template('register.html')
+
+
+@bp.route('/logout')
+@login_required
+def logout():
+    """Logout"""
+    logout_user()
+    flash('Anda telah logout.', 'info')
+    return redirect(url_for('catalog.index'))
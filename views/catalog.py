@@ -0,0 +1,280 @@
+"""
+Halaman publik dan informasi penyakit (katalog kelas model + contoh gambar dataset).
+"""
+import os
+import random
+from pathlib import Path
+
+from flask import Blueprint, jsonify, render_template, url_for
+
+import probabilities as prob_codec
+
+bp = Blueprint('catalog', __name__)
+
+DATA_DIR = "static/dataset"
+
+
+@bp.route('/')
+def index():
+    """Home page"""
+    return render_template('index.html')
+
+
+# Data artikel untuk setiap kelas penyakit
+DISEASE_INFO = {
+    "Actinic keratosis": {
+        "display_name": "Actinic Keratosis",
+        "explanation": "Actinic keratosis (AK) adalah lesi kulit pra-kanker yang disebabkan oleh paparan sinar matahari jangka panjang. Kondisi ini muncul sebagai bercak kasar, bersisik, atau kerak pada kulit yang sering terpapar sinar UV, terutama pada wajah, telinga, leher, lengan, dan punggung tangan.",
+        "treatment": [
+            "Krim topikal seperti 5-fluorouracil (5-FU) atau imiquimod",
+            "Terapi cryotherapy (pembekuan dengan nitrogen cair)",
+            "Terapi laser atau photodynamic therapy (PDT)",
+            "Kuretase (pengikisan lesi)",
+            "Konsultasi rutin dengan dokter kulit untuk monitoring",
+            "Proteksi dari sinar matahari dengan sunscreen SPF 30+",
+            "Pemeriksaan kulit secara berkala untuk deteksi dini kanker kulit"
+        ]
+    },
+    "Atopic Dermatitis": {
+        "display_name": "Dermatitis Atopik (Eksim)",
+        "explanation": "Dermatitis atopik adalah kondisi peradangan kulit kronis yang menyebabkan kulit kering, gatal, dan meradang. Kondisi ini sering terjadi pada anak-anak tetapi dapat berlanjut hingga dewasa. Eksim biasanya muncul di lipatan siku, belakang lutut, leher, dan wajah.",
+        "treatment": [
+            "Gunakan pelembab secara teratur untuk menjaga kelembaban kulit",
+            "Krim kortikosteroid topikal untuk mengurangi peradangan",
+            "Antihistamin untuk mengurangi gatal",
+            "Hindari pemicu alergi dan iritan (sabun keras, detergen)",
+            "Gunakan air hangat (bukan panas) saat mandi",
+            "Kompres dingin untuk mengurangi gatal",
+            "Konsultasi dengan dokter untuk pengobatan yang lebih intensif jika diperlukan"
+        ]
+    },
+    "Benign keratosis": {
+        "display_name": "Keratosis Benigna (Seborrheic Keratosis)",
+        "explanation": "Keratosis benigna adalah pertumbuhan kulit non-kanker yang umum terjadi, terutama pada orang dewasa yang lebih tua. Lesi ini muncul sebagai bercak coklat, hitam, atau kuning yang terasa seperti lilin atau kasar saat disentuh. Meskipun tidak berbahaya, beberapa orang memilih untuk menghilangkannya karena alasan kosmetik.",
+        "treatment": [
+            "Tidak memerlukan pengobatan jika tidak mengganggu",
+            "Cryotherapy (pembekuan) untuk menghilangkan lesi",
+            "Kuretase (pengikisan) oleh dokter",
+            "Terapi laser",
+            "Elektrokauter (pembakaran dengan arus listrik)",
+            "Konsultasi dengan dokter kulit untuk evaluasi dan pilihan pengobatan",
+            "Monitoring jika ada perubahan ukuran, warna, atau bentuk"
+        ]
+    },
+    "Dermatofibroma": {
+        "display_name": "Dermatofibroma",
+        "explanation": "Dermatofibroma adalah tumor jinak yang umum terjadi pada kulit, biasanya muncul sebagai benjolan kecil, keras, dan berwarna coklat kemerahan. Lesi ini paling sering muncul di kaki dan lengan. Dermatofibroma tidak berbahaya dan biasanya tidak memerlukan pengobatan kecuali jika mengganggu atau berubah.",
+        "treatment": [
+            "Tidak memerlukan pengobatan jika tidak mengganggu",
+            "Eksisi bedah jika mengganggu atau untuk alasan kosmetik",
+            "Cryotherapy untuk lesi yang lebih kecil",
+            "Monitoring jika ada perubahan ukuran atau warna",
+            "Konsultasi dengan dokter kulit untuk evaluasi",
+            "Hindari trauma berulang pada area lesi"
+        ]
+    },
+    "Melanocytic nevus": {
+        "display_name": "Nevus Melanositik (Tahi Lalat)",
+        "explanation": "Nevus melanositik, atau tahi lalat, adalah pertumbuhan kulit yang umum terjadi. Tahi lalat dapat muncul sejak lahir atau berkembang seiring waktu. Sebagian besar tahi lalat adalah jinak, tetapi beberapa dapat berkembang menjadi melanoma. Penting untuk memantau perubahan pada tahi lalat menggunakan metode ABCDE (Asymmetry, Border, Color, Diameter, Evolution).",
+        "treatment": [
+            "Tidak memerlukan pengobatan jika tidak mengganggu dan tidak berubah",
+            "Eksisi bedah jika ada kecurigaan keganasan",
+            "Biopsi untuk evaluasi jika ada perubahan",
+            "Pemeriksaan kulit rutin oleh dokter (skin check)",
+            "Monitoring sendiri dengan metode ABCDE",
+            "Fotografi untuk dokumentasi perubahan",
+            "Konsultasi segera jika ada perubahan ukuran, warna, atau bentuk"
+        ]
+    },
+    "Melanoma": {
+        "display_name": "Melanoma",
+        "explanation": "Melanoma adalah jenis kanker kulit yang paling serius, berkembang dari sel melanosit yang menghasilkan pigmen. Melanoma dapat muncul di mana saja di tubuh, termasuk area yang tidak terpapar sinar matahari. Deteksi dini sangat penting karena melanoma dapat menyebar ke bagian tubuh lain jika tidak ditangani.",
+        "treatment": [
+            "Eksisi bedah untuk mengangkat melanoma dan margin sekitarnya",
+            "Biopsi kelenjar getah bening sentinel untuk menentukan staging",
+            "Imunoterapi untuk melanoma stadium lanjut",
+            "Terapi target (targeted therapy) untuk mutasi gen tertentu",
+            "Kemoterapi jika diperlukan",
+            "Radioterapi dalam kasus tertentu",
+            "Follow-up rutin dan monitoring untuk deteksi kekambuhan",
+            "Konsultasi dengan onkologi untuk rencana pengobatan komprehensif"
+        ]
+    },
+    "Squamous cell carcinoma": {
+        "display_name": "Karsinoma Sel Skuamosa",
+        "explanation": "Karsinoma sel skuamosa (SCC) adalah jenis kanker kulit yang umum, berkembang dari sel skuamosa di lapisan luar kulit. SCC biasanya muncul sebagai bercak merah, bersisik, atau luka yang tidak sembuh. Meskipun dapat menyebar jika tidak ditangani, sebagian besar SCC dapat disembuhkan jika dideteksi dan diobati sejak dini.",
+        "treatment": [
+            "Eksisi bedah untuk mengangkat kanker dan margin sekitarnya",
+            "Mohs surgery untuk kanker di area wajah atau area kritis",
+            "Kuretase dan elektrokauter untuk lesi kecil",
+            "Cryotherapy untuk lesi superfisial",
+            "Radioterapi untuk kasus yang tidak dapat dioperasi",
+            "Kemoterapi topikal (5-FU) untuk lesi superfisial",
+            "Follow-up rutin untuk monitoring",
+            "Proteksi dari sinar matahari untuk pencegahan"
+        ]
+    },
+    "Tinea Ringworm Candidiasis": {
+        "display_name": "Tinea / Ringworm / Kandidiasis",
+        "explanation": "Tinea adalah infeksi jamur pada kulit yang disebabkan oleh dermatofit. Infeksi ini dapat muncul di berbagai bagian tubuh dan dikenal dengan nama berbeda tergantung lokasinya (tinea corporis, tinea pedis, tinea capitis). Kandidiasis adalah infeksi jamur yang disebabkan oleh Candida, biasanya muncul di area lembab seperti lipatan kulit.",
+        "treatment": [
+            "Krim antijamur topikal (clotrimazole, miconazole, terbinafine)",
+            "Obat antijamur oral untuk infeksi yang lebih parah atau luas",
+            "Jaga area tetap bersih dan kering",
+            "Gunakan krim sesuai petunjuk, biasanya selama 2-4 minggu",
+            "Cuci pakaian, handuk, dan seprai dengan air panas",
+            "Hindari berbagi pakaian atau barang pribadi",
+            "Konsultasi dengan dokter untuk pengobatan yang tepat",
+            "Gunakan sandal di tempat umum yang lembab"
+        ]
+    },
+    "Vascular lesion": {
+        "display_name": "Lesi Vaskular",
+        "explanation": "Lesi vaskular adalah pertumbuhan atau kelainan yang melibatkan pembuluh darah di kulit. Ini termasuk hemangioma, angioma ceri, spider angioma, dan kondisi vaskular lainnya. Sebagian besar lesi vaskular adalah jinak, tetapi beberapa mungkin memerlukan evaluasi medis.",
+        "treatment": [
+            "Tidak memerlukan pengobatan jika tidak mengganggu",
+            "Terapi laser untuk lesi yang mengganggu secara kosmetik",
+            "Sclerotherapy untuk lesi vaskular tertentu",
+            "Eksisi bedah untuk lesi yang besar atau mengganggu",
+            "Monitoring jika ada perubahan ukuran atau gejala",
+            "Konsultasi dengan dokter kulit untuk evaluasi",
+            "Hindari trauma pada area lesi"
+        ]
+    }
+}
+
+
+def get_disease_images(disease_name, num_images=4):
+    """
+    Get sample images from dataset for a specific disease
+    
+    Args:
+        disease_name: Name of the disease class
+        num_images: Number of sample images to return
+    
+    Returns:
+        List of tuples (disease_name, filename)
+    """
+    disease_path = os.path.join(DATA_DIR, disease_name)
+    
+    if not os.path.exists(disease_path):
+        return []
+    
+    # Get all image files
+    image_files = []
+    for ext in ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']:
+        image_files.extend(Path(disease_path).glob(ext))
+    
+    # Randomly select images
+    if len(image_files) > num_images:
+        selected = random.sample(image_files, num_images)
+    else:
+        selected = image_files
+    
+    # Return as (disease_name, filename) tuples
+    return [(disease_name, img.name) for img in selected]
+
+
+@bp.route('/api/diseases')
+def get_diseases():
+    """Get list of all diseases with image counts"""
+    diseases = []
+    
+    for disease_name in prob_codec.class_names():
+        disease_path = os.path.join(DATA_DIR, disease_name)
+        image_count = 0
+        
+        if os.path.exists(disease_path):
+            for ext in ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']:
+                image_count += len(list(Path(disease_path).glob(ext)))
+        
+        diseases.append({
+            'name': disease_name,
+            'display_name': DISEASE_INFO.get(disease_name, {}).get('display_name', disease_name),
+            'image_count': image_count
+        })
+    
+    # Sort by name
+    diseases.sort(key=lambda x: x['display_name'])
+    
+    return jsonify({'diseases': diseases})
+
+
+@bp.route('/api/disease/<disease_name>')
+def get_disease_info(disease_name):
+    """Get information about a specific disease"""
+    if disease_name not in DISEASE_INFO:
+        return jsonify({'error': 'Disease not found'}), 404
+    
+    info = DISEASE_INFO[disease_name].copy()
+    info['name'] = disease_name
+    
+    return jsonify(info)
+
+
+@bp.route('/api/disease/<disease_name>/images')
+def get_disease_images_api(disease_name):
+    """Get sample images for a specific disease"""
+    # Decode URL-encoded disease name
+    disease_name = disease_name.replace('%20', ' ')
+    
+    # Ambil list gambar (tuple: disease_name, filename)
+    image_paths = get_disease_images(disease_name, num_images=4)
+    
+    # Convert to URLs (MENGGUNAKAN STATIC URL)
+    image_urls = []
+    for disease_part, filename in image_paths:
+        # Kita buat path relatif terhadap folder static
+        # Contoh: dataset/Melanoma/gambar1.jpg
+        relative_path = os.path.join('dataset', disease_part, filename)
+        
+        # Generate URL static yang valid
+        # Windows menggunakan backslash (\), kita ganti ke slash (/) untuk URL web
+        relative_path = relative_path.replace('\\', '/')
+        
+        url = url_for('static', filename=relative_path)
+        image_urls.append(url)
+    
+    return jsonify({
+        'images': image_urls,
+        'total_images': len(image_paths)
+    })
+
+# CODE INI SUDAH TIDAK DIPERLUKAN, HAPUS SAJA:
+# @bp.route('/dataset/<disease_name>/<filename>')
+# def serve_image(disease_name, filename):
+#     """Serve images from dataset folder"""
+#     disease_path = os.path.join(DATA_DIR, disease_name)
+#     return send_from_directory(disease_path, filename)
+
+
+@bp.route('/artikel')
+def artikel():
+    """Artikel edukasi"""
+    return render_template('artikel.html')
+
+
+@bp.route('/api/diseases/preview')
+def get_diseases_preview():
+    """Get diseases for preview (all diseases)"""
+    diseases = []
+    
+    for disease_name in prob_codec.class_names():
+        disease_path = os.path.join(DATA_DIR, disease_name)
+        image_count = 0
+        
+        if os.path.exists(disease_path):
+            for ext in ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']:
+                image_count += len(list(Path(disease_path).glob(ext)))
+        
+        info = DISEASE_INFO.get(disease_name, {})
+        diseases.append({
+            'name': disease_name,
+            'display_name': info.get('display_name', disease_name),
+            'explanation': info.get('explanation', ''),
+            'image_count': image_count
+        })
+    
+    # Sort by name
+    diseases.sort(key=lambda x: x['display_name'])
+    return jsonify({'diseases': diseases})
@@ -0,0 +1,450 @@
+"""
+Prediksi: halaman upload, /api/predict, prediksi batch, job asynchronous,
+dan health check.
+
+Model di-load lazy oleh `predictor` (lihat predictor.py) saat prediksi
+pertama atau warm-up worker; blueprint lain tidak pernah menyentuh model.
+"""
+import io
+import json
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, request, \
+    stream_with_context, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import text
+
+from extensions import history_writer, image_store, predictor
+from history_writer import history_row, insert_history_rows
+from image_pipeline import decode_upload
+from jobs import JobPool
+from models import db
+import probabilities as prob_codec
+
+bp = Blueprint('inference', __name__)
+
+
+def allowed_file(filename):
+    # Kita tentukan manual di sini biar pasti jalan
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
+    
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+@bp.route('/predict')
+@login_required
+def predict_page():
+    """Page untuk upload gambar dan prediksi - Hanya untuk user yang sudah login"""
+    return render_template('predict.html')
+
+
+def _predict_upload(image_file, user_id):
+    """
+    Decode, prediksi, simpan preview + history untuk satu upload
+    
+    Dipakai /api/predict (di thread request) dan job asynchronous (di thread
+    worker job).
+    
+    Returns:
+        Dict response JSON prediksi
+    """
+    # Decode sekali: tensor model + preview (max 800px)
+    decoded = decode_upload(image_file)
+    
+    # Prediksi
+    predicted_class, confidence, all_probabilities = predictor.predict_image(decoded.pixels, cache_key=decoded.digest)
+    
+    # Convert preview to base64
+    img_str = decoded.preview_base64
+    
+    # Simpan ke history prediksi (tidak menunggu commit kalau write-behind aktif)
+    try:
+        image_hash = image_store.put(decoded.preview_jpeg)
+        history_writer.write(history_row(
+            user_id=user_id,
+            predicted_class=predicted_class,
+            confidence=confidence,
+            image_hash=image_hash,
+            probabilities=prob_codec.encode_dict(all_probabilities)
+        ))
+    except Exception as e:
+        print(f"Error saving prediction history: {e}")
+        # Continue even if history save fails
+    
+    return {
+        'success': True,
+        'predicted_class': predicted_class,
+        'confidence': confidence,
+        'all_probabilities': all_probabilities,
+        'image_preview': f"data:image/jpeg;base64,{img_str}"
+    }
+
+
+def _validate_upload():
+    """
+    Ambil file upload dari request
+    
+    Returns:
+        Tuple (file, None), atau (None, (response error, status))
+    """
+    # Check if file is in request
+    if 'file' not in request.files:
+        return None, (jsonify({'error': 'No file uploaded'}), 400)
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not allowed_file(file.filename):
+        return None, (jsonify({'error': 'File type not allowed. Please upload JPG, JPEG, or PNG'}), 400)
+    
+    # Reset file pointer
+    file.seek(0)
+    return file, None
+
+
+@bp.route('/api/predict', methods=['POST'])
+@login_required
+def predict():
+    """API endpoint untuk prediksi - Hanya untuk user yang sudah login"""
+    try:
+        file, error = _validate_upload()
+        if error:
+            return error
+        return jsonify(_predict_upload(file, current_user.id))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# BATCH PREDICTION
+# ============================================
+
+class _BatchSourceError(Exception):
+    """Satu file di batch tidak bisa diproses (dilaporkan per gambar)"""
+
+
+def _batch_sources(files):
+    """
+    Daftar gambar dari upload batch: file gambar biasa dan isi arsip .zip
+    
+    Setiap upload disalin ke file sementara milik response, karena gambar
+    baru dibaca saat response di-stream (file upload request bisa sudah ditutup).
+    
+    Returns:
+        Tuple (sources, handles): sources berisi (filename, read_fn) dengan
+        read_fn() mengembalikan byte gambar atau raise _BatchSourceError;
+        handles adalah file sementara yang harus ditutup setelah selesai
+    """
+    max_bytes = current_app.config['BATCH_PREDICT_MAX_IMAGE_BYTES']
+    sources = []
+    handles = []
+    
+    def rejected(message):
+        def read():
+            raise _BatchSourceError(message)
+        return read
+    
+    def spool(file):
+        handle = tempfile.TemporaryFile()
+        shutil.copyfileobj(file.stream, handle)
+        handle.seek(0)
+        handles.append(handle)
+        return handle
+    
+    for file in files:
+        name = file.filename or ''
+        if name.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(spool(file))
+            except zipfile.BadZipFile:
+                sources.append((name, rejected('Arsip zip tidak valid')))
+                continue
+            for info in archive.infolist():
+                if info.is_dir() or not allowed_file(info.filename):
+                    continue
+                member = f"{name}/{info.filename}"
+                if info.file_size > max_bytes:
+                    sources.append((member, rejected('Ukuran file terlalu besar')))
+                else:
+                    sources.append((member, lambda archive=archive, info=info: archive.read(info)))
+        elif allowed_file(name):
+            sources.append((name, spool(file).read))
+        else:
+            sources.append((name, rejected('File type not allowed. Please upload JPG, JPEG, PNG, or ZIP')))
+    return sources, handles
+
+
+def _decode_source(read):
+    return decode_upload(io.BytesIO(read()))
+
+
+def _batch_predict_stream(sources, handles, user_id):
+    """
+    Decode paralel, inference per batch model, satu baris NDJSON per gambar
+    
+    Decode berjalan di thread pool paling banyak dua batch di depan
+    inference. Hasil dikirim setiap satu batch selesai; history semua
+    gambar yang berhasil disimpan dengan satu bulk insert di akhir.
+    """
+    try:
+        yield from _batch_predict_lines(sources, user_id)
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def _batch_predict_lines(sources, user_id):
+    chunk_size = predictor.max_batch_size
+    rows = []
+    succeeded = failed = 0
+    
+    with ThreadPoolExecutor(max_workers=current_app.config['BATCH_DECODE_WORKERS']) as pool:
+        futures = []
+        
+        def schedule(upto):
+            while len(futures) < min(upto, len(sources)):
+                futures.append(pool.submit(_decode_source, sources[len(futures)][1]))
+        
+        for start in range(0, len(sources), chunk_size):
+            schedule(start + 2 * chunk_size)
+            indices = range(start, min(start + chunk_size, len(sources)))
+            lines = {}
+            decoded = {}
+            for i in indices:
+                try:
+                    decoded[i] = futures[i].result()
+                except _BatchSourceError as e:
+                    lines[i] = {'error': str(e)}
+                except Exception as e:
+                    # Pesan exception PIL berisi repr objek/path internal; cukup di log server
+                    print(f"Error decoding batch image {sources[i][0]!r}: {e}")
+                    lines[i] = {'error': 'Gambar tidak bisa dibaca. Pastikan file JPG, JPEG, atau PNG yang valid'}
+                futures[i] = None  # lepas hasil decode setelah dipakai
+            
+            ok = sorted(decoded)
+            try:
+                results = predictor.predict_images([decoded[i].pixels for i in ok], [decoded[i].digest for i in ok])
+            except Exception as e:
+                print(f"Error predicting batch chunk: {e}")
+                results = []
+                for i in ok:
+                    lines[i] = {'error': 'Prediksi gagal, coba lagi nanti'}
+            
+            for i, (predicted_class, confidence, all_probabilities) in zip(ok, results):
+                line = {
+                    'success': True,
+                    'predicted_class': predicted_class,
+                    'confidence': confidence,
+                    'all_probabilities': all_probabilities
+                }
+                try:
+                    image_hash = image_store.put(decoded[i].preview_jpeg)
+                    line['image_url'] = url_for('profile.prediction_image', image_hash=image_hash)
+                    rows.append(history_row(
+                        user_id=user_id,
+                        predicted_class=predicted_class,
+                        confidence=confidence,
+                        image_hash=image_hash,
+                        probabilities=prob_codec.encode_dict(all_probabilities)
+                    ))
+                except Exception as e:
+                    print(f"Error saving prediction preview: {e}")
+                lines[i] = line
+            
+            for i in indices:
+                line = lines[i]
+                if line.get('success'):
+                    succeeded += 1
+                else:
+                    failed += 1
+                    line['success'] = False
+                yield json.dumps({'index': i, 'filename': sources[i][0], **line}) + '\n'
+    
+    summary = {'done': True, 'total': len(sources), 'succeeded': succeeded, 'failed': failed}
+    try:
+        with db.engine.begin() as conn:
+            insert_history_rows(conn, rows)
+        summary['saved'] = len(rows)
+    except Exception as e:
+        print(f"Error saving batch prediction history: {e}")
+        summary['saved'] = 0
+        summary['history_error'] = 'History prediksi gagal disimpan'
+    yield json.dumps(summary) + '\n'
+
+
+@bp.route('/api/predict/batch', methods=['POST'])
+@login_required
+def predict_batch():
+    """
+    Prediksi banyak gambar dalam satu request
+    
+    Form data: satu atau lebih `files` (gambar dan/atau arsip .zip).
+    Response: NDJSON, satu baris per gambar ({index, filename, success,
+    predicted_class, ... | error}) dikirim per batch model, lalu satu baris
+    ringkasan ({done, total, succeeded, failed, saved}).
+    """
+    files = request.files.getlist('files') or request.files.getlist('file')
+    if not files:
+        return jsonify({'error': 'No file uploaded'}), 400
+    
+    if not predictor.available:
+        return jsonify({'error': 'Model belum di-load'}), 503
+    
+    sources, handles = _batch_sources(files)
+    max_images = current_app.config['BATCH_PREDICT_MAX_IMAGES']
+    error = None
+    if not sources:
+        error = (jsonify({'error': 'Tidak ada gambar di upload'}), 400)
+    elif len(sources) > max_images:
+        error = (jsonify({'error': f"Maksimal {max_images} gambar per batch (dikirim {len(sources)})"}), 413)
+    if error:
+        for handle in handles:
+            handle.close()
+        return error
+    
+    return Response(stream_with_context(_batch_predict_stream(sources, handles, current_user.id)),
+                    mimetype='application/x-ndjson')
+
+
+# ============================================
+# ASYNC PREDICTION JOBS
+# ============================================
+
+def _process_prediction_job(job, data):
+    """Dijalankan thread worker job (lihat jobs.JobPool)"""
+    return _predict_upload(io.BytesIO(data), job.user_id)
+
+
+# JobStore dan pengaturan JOB_* diisi oleh init_app()
+prediction_jobs = JobPool(process_fn=_process_prediction_job)
+
+
+def init_app(app):
+    prediction_jobs.init_app(app)
+
+
+def _job_payload(job):
+    """Status job untuk client; job selesai ikut membawa hasil prediksi"""
+    payload = {'job_id': job.id, 'status': job.status}
+    if job.status == 'queued':
+        payload['position'] = prediction_jobs.store.position(job)
+    elif job.status == 'done':
+        payload.update(job.result)
+    elif job.status == 'failed':
+        payload['error'] = job.error
+    return payload
+
+
+def _get_own_job(job_id):
+    """Job milik user yang login (admin boleh melihat semua), atau 404"""
+    job = prediction_jobs.store.get(job_id)
+    if job is None or (job.user_id != current_user.id and not current_user.is_admin()):
+        abort(404)
+    return job
+
+
+@bp.route('/api/predict/jobs', methods=['POST'])
+@login_required
+def submit_prediction_job():
+    """
+    Prediksi asynchronous: simpan upload, langsung return job id (202)
+    
+    Hasil diambil dari status_url (polling), atau events_url (Server-Sent
+    Events) kalau JOB_EVENTS aktif.
+    """
+    file, error = _validate_upload()
+    if error:
+        return error
+    
+    job_id = prediction_jobs.submit(current_user.id, file.read())
+    if job_id is None:
+        response = jsonify({'error': 'Antrian prediksi sedang penuh, coba lagi sebentar'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
+    status_url = url_for('inference.prediction_job_status', job_id=job_id)
+    payload = {'job_id': job_id, 'status': 'queued', 'status_url': status_url}
+    if current_app.config['JOB_EVENTS']:
+        payload['events_url'] = url_for('inference.prediction_job_events', job_id=job_id)
+    response = jsonify(payload)
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+@bp.route('/api/predict/jobs/<job_id>')
+@login_required
+def prediction_job_status(job_id):
+    """Status job (queued + posisi antrian, running, done + hasil, failed + error)"""
+    return jsonify(_job_payload(_get_own_job(job_id)))
+
+
+@bp.route('/api/predict/jobs/<job_id>/events')
+@login_required
+def prediction_job_events(job_id):
+    """
+    Server-Sent Events: event `status` setiap status berubah, lalu `result`
+    (atau `failed`) saat job selesai.
+    
+    Hanya aktif dengan JOB_EVENTS=1: stream menahan worker (atau thread
+    gthread) selama menunggu. Koneksi ditutup setelah JOB_EVENTS_TIMEOUT
+    detik; EventSource di browser otomatis menyambung ulang.
+    """
+    if not current_app.config['JOB_EVENTS']:
+        abort(404)
+    job = _get_own_job(job_id)
+    deadline = time.monotonic() + current_app.config['JOB_EVENTS_TIMEOUT']
+    
+    def generate(job):
+        last_status = None
+        yield 'retry: 1000\n\n'
+        while True:
+            if job.finished:
+                event = 'result' if job.status == 'done' else 'failed'
+                yield f"event: {event}\ndata: {json.dumps(_job_payload(job))}\n\n"
+                return
+            if job.status != last_status:
+                last_status = job.status
+                yield f"event: status\ndata: {json.dumps(_job_payload(job))}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(0.2)
+            job = prediction_jobs.store.get(job_id) or job
+    
+    response = Response(stream_with_context(generate(job)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: jangan buffer stream
+    return response
+
+
+@bp.route('/healthz')
+def healthz():
+    """Liveness probe: proses hidup dan bisa melayani request"""
+    return jsonify({'status': 'ok'})
+
+
+@bp.route('/readyz')
+def readyz():
+    """Readiness probe: model sudah di-load dan di-warm-up, database bisa diakses"""
+    model_status = predictor.status()
+    
+    try:
+        db.session.execute(text('SELECT 1'))
+        database = {'reachable': True}
+    except Exception as e:
+        db.session.rollback()
+        database = {'reachable': False, 'error': str(e)}
+    
+    ready = model_status['loaded'] and model_status['warmed'] and database['reachable']
+    return jsonify({
+        'status': 'ready' if ready else 'not ready',
+        'model': model_status,
+        'database': database
+    }), 200 if ready else 503
@@ -0,0 +1,232 @@
+"""
+Profil user, history prediksi dan gambar prediksi.
+"""
+import json
+import os
+
+from flask import Blueprint, Response, abort, flash, jsonify, redirect, render_template, request, send_file, \
+    stream_with_context, url_for
+from flask_login import current_user, login_required
+
+from extensions import image_store
+from image_store import is_valid_hash
+from models import db, User, PredictionHistory, HISTORY_FIELDS, history_columns, history_dict, listing_options
+from pagination import apply_cursors, keyset_paginate, rows_since, encode_cursor
+import probabilities as prob_codec
+
+bp = Blueprint('profile', __name__)
+
+# Batas atas `limit` untuk format=ndjson (tanpa `limit`, semua baris di-stream)
+NDJSON_MAX_LIMIT = 10000
+
+
+@bp.route('/profile')
+@login_required
+def index():
+    """Profile page"""
+    # Get prediction history (latest 10)
+    predictions = PredictionHistory.query.options(listing_options())\
+        .filter_by(user_id=current_user.id)\
+        .order_by(PredictionHistory.created_at.desc())\
+        .limit(10)\
+        .all()
+    
+    return render_template('profile.html', user=current_user, predictions=predictions)
+
+
+@bp.route('/profile/edit', methods=['GET', 'POST'])
+@login_required
+def edit():
+    """Edit profile page"""
+    if request.method == 'POST':
+        full_name = request.form.get('full_name', '').strip()
+        email = request.form.get('email', '').strip()
+        phone = request.form.get('phone', '').strip()
+        current_password = request.form.get('current_password', '')
+        new_password = request.form.get('new_password', '')
+        new_password_confirm = request.form.get('new_password_confirm', '')
+        
+        # Update basic info
+        if full_name:
+            current_user.full_name = full_name
+        
+        if phone:
+            current_user.phone = phone
+        
+        # Update email if changed
+        if email and email != current_user.email:
+            if User.query.filter_by(email=email).first():
+                flash('Email sudah digunakan oleh user lain.', 'error')
+                return redirect(url_for('profile.edit'))
+            current_user.email = email
+        
+        # Update password if provided
+        if current_password and new_password:
+            if not current_user.check_password(current_password):
+                flash('Password lama salah.', 'error')
+                return redirect(url_for('profile.edit'))
+            
+            if len(new_password) < 6:
+                flash('Password baru harus minimal 6 karakter.', 'error')
+                return redirect(url_for('profile.edit'))
+            
+            if new_password != new_password_confirm:
+                flash('Password konfirmasi tidak cocok.', 'error')
+                return redirect(url_for('profile.edit'))
+            
+            current_user.set_password(new_password)
+            flash('Password berhasil diubah.', 'success')
+        
+        try:
+            db.session.commit()
+            flash('Profil berhasil diperbarui!', 'success')
+            return redirect(url_for('profile.index'))
+        except Exception as e:
+            db.session.rollback()
+            flash('Terjadi kesalahan saat memperbarui profil.', 'error')
+            print(f"Profile update error: {e}")
+    
+    return render_template('edit_profile.html', user=current_user)
+
+
+@bp.route('/profile/history')
+@login_required
+def prediction_history():
+    """Prediction history page - semua history"""
+    per_page = 20
+    
+    predictions = keyset_paginate(
+        PredictionHistory.query.options(listing_options('probabilities')).filter_by(user_id=current_user.id),
+        PredictionHistory, per_page,
+        after=request.args.get('after'), before=request.args.get('before')
+    )
+    
+    # Decode probabilitas satu halaman sekaligus (nama kelas dipasangkan di template)
+    prob_codec.attach_vectors(predictions.items)
+    
+    return render_template('prediction_history.html', 
+                         predictions=predictions.items,
+                         pagination=predictions,
+                         user=current_user)
+
+
+def _page_vectors(rows, fields):
+    """Decode probabilitas satu halaman sekaligus (hanya kalau field-nya diminta)"""
+    if 'all_probabilities' not in fields:
+        return [None] * len(rows)
+    return prob_codec.decode_rows([row.probabilities for row in rows])
+
+
+def _history_ndjson(query, fields, chunk_size=500):
+    """Stream hasil query sebagai NDJSON, dibaca per chunk (yield_per)"""
+    result = db.session.execute(query.statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        vectors = _page_vectors(rows, fields)
+        yield ''.join(json.dumps(history_dict(row, fields, vector)) + '\n' for row, vector in zip(rows, vectors))
+
+
+@bp.route('/api/profile/history')
+@login_required
+def get_prediction_history_api():
+    """
+    API untuk mendapatkan history prediksi (JSON)
+    
+    Query params:
+        limit: Jumlah item (default 10, maks 100)
+        after: Cursor `next_cursor` dari response sebelumnya (halaman lebih lama)
+        since: Cursor `latest_cursor` dari response sebelumnya; hanya
+            prediksi yang lebih baru yang dikirim, 304 kalau tidak ada
+        fields: Daftar field dipisah koma (default: semua), misalnya
+            `fields=predicted_class,confidence,created_at`. Hanya kolom
+            yang dibutuhkan yang di-select.
+        format: `ndjson` untuk streaming semua baris (satu objek JSON per
+            baris, tanpa batas limit kecuali `limit` diisi; `limit` harus
+            >= 1 dan dibatasi NDJSON_MAX_LIMIT)
+    """
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or list(HISTORY_FIELDS)
+    unknown = [f for f in fields if f not in HISTORY_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Field tidak dikenal: {', '.join(unknown)}",
+                        'available_fields': list(HISTORY_FIELDS)}), 400
+    
+    since = request.args.get('since')
+    query = db.session.query(*history_columns(fields))\
+        .filter(PredictionHistory.user_id == current_user.id)
+    
+    if request.args.get('format') == 'ndjson':
+        query = apply_cursors(query, PredictionHistory, after=request.args.get('after'), since=since)\
+            .order_by(PredictionHistory.created_at.desc(), PredictionHistory.id.desc())
+        if 'limit' in request.args:
+            limit = request.args.get('limit', type=int)
+            if limit is None or limit < 1:
+                return jsonify({'error': 'limit harus bilangan bulat >= 1'}), 400
+            query = query.limit(min(limit, NDJSON_MAX_LIMIT))
+        return Response(stream_with_context(_history_ndjson(query, fields)), mimetype='application/x-ndjson')
+    
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    if since:
+        predictions, has_more = rows_since(query, PredictionHistory, since, limit)
+        if not predictions:
+            return '', 304
+        next_cursor = None
+    else:
+        page = keyset_paginate(query, PredictionHistory, limit, after=request.args.get('after'))
+        predictions, has_more = page.items, page.has_next
+        next_cursor = page.next_cursor if page.has_next else None
+    
+    vectors = _page_vectors(predictions, fields)
+    latest = predictions[0] if predictions else None
+    return jsonify({
+        'success': True,
+        'predictions': [history_dict(row, fields, vector) for row, vector in zip(predictions, vectors)],
+        'has_more': has_more,
+        'next_cursor': next_cursor,
+        'latest_cursor': encode_cursor(latest.created_at, latest.id) if latest else since
+    })
+
+
+@bp.route('/api/profile/history/<int:history_id>/delete', methods=['POST'])
+@login_required
+def delete_prediction_history(history_id):
+    """Hapus history prediksi"""
+    prediction = PredictionHistory.query.get_or_404(history_id)
+    
+    # Pastikan prediction milik user yang sedang login
+    if prediction.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    try:
+        db.session.delete(prediction)
+        db.session.commit()
+        return jsonify({'success': True, 'message': 'History berhasil dihapus'})
+    except Exception as e:
+        db.session.rollback()
+        print(f"Delete prediction history error: {e}")
+        return jsonify({'error': 'Terjadi kesalahan saat menghapus history'}), 500
+
+
+@bp.route('/images/<image_hash>.jpg')
+@login_required
+def prediction_image(image_hash):
+    """Serve gambar prediksi dari ImageStore (hanya pemilik atau admin)"""
+    if not is_valid_hash(image_hash):
+        abort(404)
+    
+    if not current_user.is_admin():
+        owned = db.session.query(PredictionHistory.id)\
+            .filter_by(image_hash=image_hash, user_id=current_user.id)\
+            .first()
+        if owned is None:
+            abort(404)
+    
+    path = image_store.path_for(image_hash)
+    if not os.path.exists(path):
+        abort(404)
+    
+    # Isi file tidak pernah berubah untuk hash yang sama
+    response = send_file(path, mimetype='image/jpeg', etag=image_hash,
+                         conditional=True, max_age=31536000)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response